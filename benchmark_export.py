@@ -0,0 +1,146 @@
+"""
+Benchmark the streamed Menu_Data flattening and Excel export on synthetic menus
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from exporter import MENU_DATA_COLUMNS, MenuExcelExporter
+from validate_excel import validate_excel_structure
+
+
+def build_synthetic_menu(item_count, seed=0):
+    """
+    Generate a menu shaped like the converter output
+    :param item_count: Number of items
+    :param seed: Random seed, for repeatable runs
+    :return: Menu JSON with categories, variations and addon groups
+    """
+    rng = random.Random(seed)
+    categories = [
+        {"categoryid": str(i + 1), "categoryname": f"Category {i + 1}", "categoryrank": str(i + 1)}
+        for i in range(max(1, item_count // 50))
+    ]
+    addongroups = [
+        {
+            "addongroupid": str(i + 1),
+            "addongroup_name": f"Add-ons {i + 1}",
+            "addongroupitems": [
+                {"addonitemid": f"{i + 1}-{j + 1}", "addonitem_name": f"Extra {j + 1}", "addonitem_price": str(10 * (j + 1))}
+                for j in range(rng.randint(0, 4))
+            ],
+        }
+        for i in range(max(1, item_count // 100))
+    ]
+
+    items = []
+    for i in range(item_count):
+        item = {
+            "itemid": str(i + 1),
+            "itemname": f"Item {i + 1}",
+            "itemdescription": "Synthetic menu item",
+            "item_categoryid": rng.choice(categories)["categoryid"],
+            "price": str(rng.randint(50, 500)),
+            "instock": "2",
+        }
+        if rng.random() < 0.4:
+            item["variation"] = [
+                {"variationid": str(v + 1), "variation_name": name, "variation_price": str(rng.randint(50, 500))}
+                for v, name in enumerate(["Regular", "Medium", "Large"][:rng.randint(1, 3)])
+            ]
+        if rng.random() < 0.3:
+            item["addon"] = [
+                {"addon_group_id": rng.choice(addongroups)["addongroupid"], "addon_item_selection": "M"}
+                for _ in range(rng.randint(1, 2))
+            ]
+        items.append(item)
+
+    return {
+        "restaurant": {"restaurantname": "Benchmark Restaurant"},
+        "areas": [{"areaid": "1", "displayname": "Dine In"}],
+        "categories": categories,
+        "items": items,
+        "addongroups": addongroups,
+    }
+
+
+def time_call(func, repeat):
+    """
+    Best wall time of several calls
+    :param func: Callable without arguments
+    :param repeat: Number of calls
+    :return: Tuple of (best_seconds, last_result)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def measure_peak_memory(func):
+    """
+    Peak Python memory allocated by a call
+    :param func: Callable without arguments
+    :return: Tuple of (peak_megabytes, result)
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 / 1024, result
+
+
+def benchmark(item_counts, repeat, export):
+    """
+    Time the streamed Menu_Data flattening and measure the memory it holds
+    :param item_counts: Menu sizes to generate
+    :param repeat: Timed runs per measurement (best is reported)
+    :param export: Also time the full single-sheet Excel export
+    """
+    exporter = MenuExcelExporter()
+    header = f"{'Items':>8} {'Rows':>9} {'Flatten s':>10} {'Peak MB':>8}"
+    if export:
+        header += f" {'Export s':>9}"
+    print(header)
+
+    def count_rows(menu):
+        return sum(1 for row in exporter._iter_menu_data_rows(menu) if len(row) == len(MENU_DATA_COLUMNS))
+
+    for item_count in item_counts:
+        menu = build_synthetic_menu(item_count)
+        flatten_time, row_count = time_call(lambda: count_rows(menu), repeat)
+        peak_mb, _ = measure_peak_memory(lambda: count_rows(menu))
+
+        line = f"{item_count:>8} {row_count:>9} {flatten_time:>10.3f} {peak_mb:>8.2f}"
+        if not export:
+            print(line)
+            continue
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            excel_path = os.path.join(tmp_dir, "menu.xlsx")
+            export_time, _ = time_call(lambda: exporter.json_to_excel(menu, excel_path), 1)
+            print(f"{line} {export_time:>9.2f}")
+            if item_count == item_counts[-1]:
+                validate_excel_structure(excel_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Menu_Data flattening on synthetic menus")
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000, 50000], help="Menu sizes in items")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="Timed runs per measurement")
+    parser.add_argument("--export", action="store_true", help="Also time the full Excel export")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    benchmark(args.items, args.repeat, args.export)
@@ -0,0 +1,148 @@
+"""
+Compare the full and compact Gemini output contracts (tokens and latency)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from llm_converter import GeminiConverter, estimate_tokens
+
+
+def to_compact_json(json_data):
+    """
+    Convert full-schema menu JSON to the compact output contract
+    :param json_data: Menu data using the full schema
+    :return: Equivalent compact data (inverse of expand_compact_json)
+    """
+    restaurant_keys = {
+        "restaurantname": "n", "cuisines": "cu", "address": "a", "contact": "ph",
+        "city": "ci", "state": "st", "country": "co",
+    }
+    restaurant = json_data.get("restaurant", {})
+    compact_restaurant = {
+        short_key: restaurant[full_key]
+        for full_key, short_key in restaurant_keys.items()
+        if restaurant.get(full_key) and restaurant.get(full_key) != "Unknown"
+    }
+
+    categories = json_data.get("categories", [])
+    category_index = {cat.get("categoryid"): i for i, cat in enumerate(categories)}
+    groups = json_data.get("addongroups", [])
+    group_index = {group.get("addongroupid"): i for i, group in enumerate(groups)}
+
+    compact = {}
+    if compact_restaurant:
+        compact["r"] = compact_restaurant
+    compact["c"] = [cat.get("categoryname", "") for cat in categories]
+
+    compact_items = []
+    for item in json_data.get("items", []):
+        compact_item = {"n": item.get("itemname", ""), "p": item.get("price", "")}
+        if item.get("item_categoryid") in category_index:
+            compact_item["c"] = category_index[item["item_categoryid"]]
+        if item.get("itemdescription"):
+            compact_item["d"] = item["itemdescription"]
+        if item.get("item_attributeid", "1") != "1":
+            compact_item["a"] = item["item_attributeid"]
+        if item.get("variation"):
+            compact_item["v"] = [[v.get("variation_name"), v.get("variation_price")] for v in item["variation"]]
+        refs = [group_index[ref.get("addon_group_id")] for ref in item.get("addon", [])
+                if ref.get("addon_group_id") in group_index]
+        if refs:
+            compact_item["g"] = refs
+        compact_items.append(compact_item)
+    compact["i"] = compact_items
+
+    compact_groups = []
+    for group in groups:
+        addons = []
+        for addon in group.get("addongroupitems", []):
+            entry = [addon.get("addonitem_name"), addon.get("addonitem_price")]
+            if addon.get("attributes", "1") != "1":
+                entry.append(addon["attributes"])
+            addons.append(entry)
+        compact_groups.append({"n": group.get("addongroup_name", ""), "i": addons})
+    if compact_groups:
+        compact["g"] = compact_groups
+
+    return compact
+
+
+def minified(data):
+    """Serialize JSON the way the model is asked to return it"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def compare_offline(json_files):
+    """
+    Estimate output tokens of both contracts from existing full-schema JSON files
+    :param json_files: Paths to JSON files exported by the convert command
+    """
+    print(f"{'File':<40} {'Full tok':>10} {'Compact tok':>12} {'Saved':>8}")
+    for json_file in json_files:
+        with open(json_file, "r", encoding="utf-8") as f:
+            json_data = json.load(f)
+        full_tokens = estimate_tokens(minified(json_data))
+        compact_tokens = estimate_tokens(minified(to_compact_json(json_data)))
+        saved = 1 - compact_tokens / full_tokens if full_tokens else 0
+        print(f"{Path(json_file).name[:40]:<40} {full_tokens:>10} {compact_tokens:>12} {saved * 100:>7.1f}%")
+
+
+def compare_online(text_files, model_name, repeat):
+    """
+    Convert OCR text files with both contracts and report real token usage and latency
+    :param text_files: Paths to OCR text files
+    :param model_name: Gemini model to use
+    :param repeat: Requests per file and contract
+    """
+    print(f"{'Contract':<10} {'Requests':>9} {'Prompt tok':>11} {'Output tok':>11} {'Median s':>9} {'Mean s':>8}")
+    for compact in (False, True):
+        converter = GeminiConverter(model_name, compact=compact)
+        if not converter.model:
+            print("❌ Gemini model could not be initialized")
+            sys.exit(1)
+
+        usages = []
+        generate_content = converter.model.generate_content
+
+        def generate_and_record(prompt, *args, **kwargs):
+            response = generate_content(prompt, *args, **kwargs)
+            usages.append(getattr(response, "usage_metadata", None))
+            return response
+
+        converter.model.generate_content = generate_and_record
+
+        latencies = []
+        for text_file in text_files:
+            raw_text = Path(text_file).read_text(encoding="utf-8")
+            for _ in range(repeat):
+                start_time = time.time()
+                converter.text_to_json_with_gemini(raw_text, str(text_file))
+                latencies.append(time.time() - start_time)
+
+        prompt_tokens = sum(getattr(u, "prompt_token_count", 0) or 0 for u in usages if u)
+        output_tokens = sum(getattr(u, "candidates_token_count", 0) or 0 for u in usages if u)
+        print(
+            f"{'compact' if compact else 'full':<10} {len(latencies):>9} {prompt_tokens:>11} "
+            f"{output_tokens:>11} {statistics.median(latencies):>9.2f} {statistics.mean(latencies):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare full and compact Gemini output contracts")
+    parser.add_argument("files", nargs="+", help="OCR .txt files (online) or exported .json files (--offline)")
+    parser.add_argument("--offline", action="store_true", help="Estimate output tokens from JSON files, no API calls")
+    parser.add_argument("--model", default="gemini-2.0-flash-exp", help="Gemini model to use")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="Requests per file and contract")
+    args = parser.parse_args()
+
+    files = [os.path.abspath(f) for f in args.files]
+    if args.offline:
+        compare_offline(files)
+    else:
+        compare_online(files, args.model, args.repeat)
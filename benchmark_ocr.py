@@ -0,0 +1,68 @@
+"""
+Benchmark the OCR engines against each other on a directory of images
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from constants import OCR_ENGINES
+from main import (check_pre_requisites_tesseract, get_valid_image_files,
+                  open_ocr_engine, process_images_parallel)
+
+
+def benchmark_engine(engine, image_files, max_workers, repeat):
+    """
+    Time a full OCR pass over the images with the given engine
+    :param engine: One of OCR_ENGINES
+    :param image_files: List of image file paths
+    :param max_workers: Number of parallel workers
+    :param repeat: Number of passes over the image list
+    :return: Tuple of (total_seconds, images_processed, failed_images)
+    """
+    processed = 0
+    failed = 0
+    start_time = time.time()
+
+    # Engine startup is part of the measured time on purpose
+    with open_ocr_engine(engine, workers=max_workers) as ocr_func:
+        for _ in range(repeat):
+            successful_files, failed_files, _ = process_images_parallel(
+                image_files, None, max_workers, ocr_func
+            )
+            processed += successful_files
+            failed += failed_files
+
+    return time.time() - start_time, processed, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark OCR engines")
+    parser.add_argument("-i", "--input", help="Images directory path", required=True)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Number of parallel workers")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="Passes over the images per engine")
+    parser.add_argument(
+        "--engines", nargs="+", default=OCR_ENGINES, choices=OCR_ENGINES,
+        help="Engines to compare (default: all)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s:%(name)s:%(message)s')
+
+    if not check_pre_requisites_tesseract():
+        sys.exit(1)
+
+    image_files, _ = get_valid_image_files(os.path.abspath(args.input))
+    if not image_files:
+        print("❌ No valid image files found")
+        sys.exit(1)
+
+    print(f"🔍 Benchmarking {len(image_files)} images x {args.repeat} passes")
+    print(f"{'Engine':<12} {'Seconds':>10} {'Images':>8} {'Failed':>8} {'Images/sec':>12}")
+
+    for engine in args.engines:
+        total_time, processed, failed = benchmark_engine(engine, image_files, args.workers, args.repeat)
+        rate = processed / total_time if total_time > 0 else 0
+        print(f"{engine:<12} {total_time:>10.2f} {processed:>8} {failed:>8} {rate:>12.2f}")
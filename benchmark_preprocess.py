@@ -0,0 +1,102 @@
+"""
+Benchmark OCR time and text quality with and without image preprocessing
+"""
+
+import argparse
+import difflib
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+from constants import OCR_ENGINE_SUBPROCESS, OCR_ENGINES
+from main import (check_pre_requisites_tesseract, get_valid_image_files,
+                  open_ocr_engine)
+
+
+def text_similarity(text, reference):
+    """
+    Word-level similarity of OCR text to a reference transcription
+    :param text: OCR text
+    :param reference: Expected text
+    :return: Ratio between 0 (nothing in common) and 1 (identical words)
+    """
+    return difflib.SequenceMatcher(None, text.split(), reference.split(), autojunk=False).ratio()
+
+
+def benchmark_images(engine, image_files, preprocess, reference_dir):
+    """
+    OCR every image once and collect time and quality figures
+    :param engine: One of OCR_ENGINES
+    :param image_files: List of image file paths
+    :param preprocess: Whether to preprocess images before OCR
+    :param reference_dir: Directory with `<stem>.txt` reference texts, or None
+    :return: Dictionary of image name to (seconds, words, similarity or None)
+    """
+    results = {}
+    with open_ocr_engine(engine, batch_size=1, preprocess=preprocess) as ocr_func:
+        for image_file in image_files:
+            image_path = Path(image_file)
+            start_time = time.perf_counter()
+            success, text, _ = ocr_func(image_path, None)
+            elapsed = time.perf_counter() - start_time
+            if not success:
+                results[image_path.name] = (elapsed, None, None)
+                continue
+
+            similarity = None
+            reference_file = Path(reference_dir, f"{image_path.stem}.txt") if reference_dir else None
+            if reference_file and reference_file.exists():
+                similarity = text_similarity(text, reference_file.read_text(encoding="utf-8"))
+            results[image_path.name] = (elapsed, len(text.split()), similarity)
+    return results
+
+
+def format_result(result):
+    """Format one (seconds, words, similarity) result as table columns"""
+    seconds, words, similarity = result
+    if words is None:
+        return f"{seconds:>8.2f} {'failed':>6} {'-':>6}"
+    similarity = f"{similarity:.3f}" if similarity is not None else "-"
+    return f"{seconds:>8.2f} {words:>6} {similarity:>6}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare OCR with and without image preprocessing")
+    parser.add_argument("-i", "--input", help="Images directory path", required=True)
+    parser.add_argument(
+        "-r", "--reference",
+        help="Directory with reference texts named <image stem>.txt, used to score OCR quality",
+        default=None
+    )
+    parser.add_argument(
+        "--engine", default=OCR_ENGINE_SUBPROCESS, choices=OCR_ENGINES,
+        help="OCR engine to use (default: subprocess)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s:%(name)s:%(message)s')
+
+    if not check_pre_requisites_tesseract():
+        sys.exit(1)
+
+    image_files, _ = get_valid_image_files(os.path.abspath(args.input))
+    if not image_files:
+        print("❌ No valid image files found")
+        sys.exit(1)
+
+    # Not cached on purpose, both passes run OCR for every image
+    original = benchmark_images(args.engine, image_files, False, args.reference)
+    preprocessed = benchmark_images(args.engine, image_files, True, args.reference)
+
+    print(f"🔍 {len(image_files)} images, engine {args.engine}; seconds, words and similarity to the reference")
+    print(f"{'Image':<30} {'Original':>22} {'Preprocessed':>22}")
+    for name in original:
+        print(f"{name[:30]:<30} {format_result(original[name])} {format_result(preprocessed[name])}")
+
+    for label, results in (("original", original), ("preprocessed", preprocessed)):
+        total_time = sum(seconds for seconds, _, _ in results.values())
+        scores = [similarity for _, _, similarity in results.values() if similarity is not None]
+        quality = f", mean similarity {sum(scores) / len(scores):.3f}" if scores else ""
+        print(f"Total {label}: {total_time:.2f}s{quality}")
@@ -18,3 +18,133 @@ VALID_IMAGE_EXTENSIONS = [
     # Additional supported formats
     ".dib", ".rle", ".ico", ".cur"
 ]
+
+DEFAULT_OCR_LANGUAGE = "eng"
+DEFAULT_OCR_PSM = 3  # Fully automatic page segmentation, tesseract's default
+DEFAULT_OCR_OEM = 3  # Default engine mode, based on what traineddata is available
+
+# OCR engines selectable from the `ocr` and `convert` subcommands
+OCR_ENGINE_SUBPROCESS = "subprocess"
+OCR_ENGINE_POOL = "pool"
+OCR_ENGINE_PROCESS = "process"
+OCR_ENGINES = [OCR_ENGINE_SUBPROCESS, OCR_ENGINE_POOL, OCR_ENGINE_PROCESS]
+
+# OCR worker sizing: workers = cores / threads per worker, bounded by memory
+OCR_THREAD_LIMIT_VAR = "OMP_THREAD_LIMIT"
+DEFAULT_OCR_THREADS_PER_WORKER = 1
+OCR_WORKER_MEMORY_MB = 300  # Peak memory budgeted for one Tesseract worker
+
+# Host calibration written by `main.py tune` and read by `ocr` and `convert`
+OCR_PROFILE_FILENAME = ".menu_ocr_profile.json"  # Stored in the home directory
+OCR_PROFILE_PATH_VAR = "MENU_OCR_PROFILE"  # Overrides the profile location
+DEFAULT_TUNE_SAMPLE_SIZE = 8
+
+# Images OCR'd per tesseract invocation by the subprocess engine (1 = no batching)
+DEFAULT_OCR_BATCH_SIZE = 1
+TESSERACT_PAGE_SEPARATOR = "\f"
+
+# Adaptive OCR timeouts: timeout = safety factor x megapixels x learned seconds per megapixel
+OCR_TIMEOUT_SECONDS = 30  # Used when the image size cannot be read
+OCR_TIMEOUT_MIN_SECONDS = 10
+OCR_TIMEOUT_MAX_SECONDS = 600
+OCR_TIMEOUT_SAFETY_FACTOR = 4.0
+OCR_SECONDS_PER_MEGAPIXEL = 2.0  # Initial estimate, refined while the run progresses
+OCR_THROUGHPUT_SMOOTHING = 0.2  # Weight of the newest image in the moving average
+OCR_MAX_RETRIES = 1  # Retries after a timeout, at a lower resolution each time
+OCR_RETRY_SCALE = 0.5  # Pixels of a retry relative to the attempt before
+
+# Longest-job-first OCR scheduling: expected seconds = seconds per megapixel x megapixels
+# + seconds per megabyte x file size, weighted by the timings of earlier runs (`--timings`)
+OCR_SECONDS_PER_MEGABYTE = 1.0
+OCR_TIMINGS_MAX_FILES = 20000  # Most recent files kept in the timings file
+# Files ordered at a time while a directory is still being scanned: the first window is
+# twice the OCR workers (this default without a worker count) and doubles up to the limit
+OCR_SCHEDULE_FIRST_WINDOW = 8
+OCR_SCHEDULE_WINDOW = 1000
+
+# Multi-page files whose pages are OCR'd as separate jobs (PDFs require poppler's pdfinfo and pdftoppm)
+MULTI_PAGE_EXTENSIONS = [".pdf", ".tif", ".tiff"]
+PDF_RENDER_DPI = 300
+# Threads counting PDF pages (pdfinfo) next to the thread submitting OCR jobs
+PDF_COUNT_WORKERS = 2
+
+# Tiling of oversized images (`--tile`): full-width bands OCR'd in parallel
+TILE_THRESHOLD_MEGAPIXELS = 16.0  # Larger images are split into tiles
+TILE_MEGAPIXELS = 4.0  # Target size of one tile
+TILE_OVERLAP_PIXELS = 160  # Should exceed the height of a text line
+TILE_OVERLAP_MAX_LINES = 8  # Lines compared when removing duplicates between tiles
+
+# Optional image preprocessing before OCR (`--preprocess`)
+DEFAULT_PREPROCESS_MAX_MEGAPIXELS = 4.0  # Photos are downscaled to this pixel budget
+DEFAULT_PREPROCESS_TARGET_DPI = 300  # Scans above this resolution are downscaled to it
+PREPROCESS_THRESHOLD_OFFSET = 0.15  # Ink is this much darker than its neighbourhood
+PREPROCESS_MAX_SKEW_DEGREES = 5.0
+
+# Image formats detected from file headers: format -> Pillow decoder, used to convert
+# formats the installed tesseract cannot read (`--convert-formats`); None = not convertible
+IMAGE_FORMAT_DECODERS = {
+    "png": "PNG", "jpeg": "JPEG", "gif": "GIF", "bmp": "BMP", "tiff": "TIFF", "webp": "WEBP",
+    "jp2": "JPEG2000", "pnm": "PPM", "pfm": "PPM", "pam": None, "pdf": None,
+    "heif": "HEIF", "avif": "AVIF", "psd": "PSD", "pcx": "PCX", "tga": "TGA", "ico": "ICO", "cur": "CUR",
+}
+# Leptonica delegates decoding to these libraries, as listed by `tesseract --version`
+LEPTONICA_FORMAT_LIBRARIES = {
+    "libpng": "png", "libjpeg": "jpeg", "libgif": "gif", "libtiff": "tiff",
+    "libwebp": "webp", "libopenjp2": "jp2",
+}
+# Read by Leptonica itself, and the formats assumed when `tesseract --version` lists no libraries
+LEPTONICA_BUILTIN_FORMATS = ["bmp", "pnm", "pam"]
+LEPTONICA_DEFAULT_FORMATS = ["png", "jpeg", "gif", "tiff", "webp", "jp2"]
+FORMAT_SNIFF_BYTES = 32  # Header bytes read to detect the format
+# Signatures of files that are certainly not images, e.g. a download saved as .jpg
+NON_IMAGE_SIGNATURES = {
+    b"PK\x03\x04": "ZIP archive", b"\x1f\x8b": "gzip archive", b"Rar!\x1a\x07": "RAR archive",
+    b"7z\xbc\xaf\x27\x1c": "7z archive", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1": "Office document",
+    b"{\\rtf": "RTF document", b"\x7fELF": "executable", b"MZ": "executable", b"ID3": "MP3 audio",
+    b"<!doctype html": "HTML page", b"<html": "HTML page", b"<?xml": "XML document",
+}
+
+# Duplicate detection (`--dedup`): identical files only, or near-identical photos too
+DEDUP_EXACT = "exact"
+DEDUP_SIMILAR = "similar"
+DEDUP_MODES = [DEDUP_EXACT, DEDUP_SIMILAR]
+# Difference hash of hash size x hash size bits, and the largest number of differing
+# bits for two photos to count as the same menu
+DEDUP_HASH_SIZE = 8
+DEFAULT_DEDUP_MAX_DISTANCE = 6
+
+# On-disk OCR result cache, stored in the output directory
+OCR_CACHE_FILENAME = ".ocr_cache.sqlite"
+DEFAULT_OCR_CACHE_MAX_MB = 512
+
+# Streaming convert pipeline (OCR -> Gemini -> export)
+DEFAULT_LLM_CONCURRENCY = 1
+DEFAULT_EXPORT_WORKERS = 1
+DEFAULT_PIPELINE_QUEUE_SIZE = 32
+
+# Gemini request limits for concurrent conversion (0 disables a limit)
+DEFAULT_GEMINI_RPM = 60
+DEFAULT_GEMINI_TPM = 1000000
+DEFAULT_GEMINI_MAX_RETRIES = 5
+
+# On-disk Gemini response cache, stored in the output directory
+LLM_CACHE_FILENAME = ".llm_cache.sqlite"
+DEFAULT_LLM_CACHE_MAX_MB = 256
+DEFAULT_LLM_CACHE_TTL_DAYS = 30
+
+# Checkpoint journal of convert runs, stored in the output directory (`--resume`)
+RUN_JOURNAL_FILENAME = ".menu_run_journal.jsonl"
+
+# Watch-folder mode (`watch`): polling interval without watchdog, and how long a
+# file must stay unchanged before it is picked up
+DEFAULT_WATCH_POLL_SECONDS = 5.0
+DEFAULT_WATCH_SETTLE_SECONDS = 2.0
+# Full rescan interval when file system events are used, for events that never arrive
+WATCH_RESCAN_SECONDS = 300
+
+# How convert turns OCR text into structured data
+PARSER_LLM = "llm"  # Always ask Gemini
+PARSER_RULES = "rules"  # Rule-based parser only, no Gemini requests
+PARSER_AUTO = "auto"  # Rule-based parser, Gemini for low-confidence sections
+PARSER_MODES = [PARSER_LLM, PARSER_RULES, PARSER_AUTO]
+DEFAULT_RULES_CONFIDENCE = 0.85
@@ -0,0 +1,208 @@
+"""
+Disk Cache Module providing a size-bounded LRU key/value store backed by SQLite
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+def hash_file(file_path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 content hash of a file
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Number of bytes read at a time
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(content_hash: str, config: Dict) -> str:
+    """
+    Combine a content hash with the settings that produced the cached value
+
+    Args:
+        content_hash: Hash of the input content
+        config: JSON-serializable settings, e.g. engine version and options
+
+    Returns:
+        str: Hex digest usable as a cache key
+    """
+    payload = json.dumps({"content": content_hash, "config": config}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Size-bounded LRU cache of text values stored in a single SQLite file.
+
+    The cache is safe to share between worker threads. When the total size of
+    the stored values exceeds `max_bytes`, the least recently used entries are
+    evicted. Entries older than `ttl_seconds` (if set) are treated as misses
+    and removed.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int, ttl_seconds: Optional[float] = None):
+        """
+        Open (or create) the cache database
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_bytes: Maximum total size of the stored values in bytes
+            ttl_seconds: Optional maximum age of an entry in seconds
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_access REAL NOT NULL, created REAL NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(entries)")]
+        if "created" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN created REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries (last_access)")
+        self._conn.commit()
+
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        self._total_bytes = row[0]
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a value and mark it as recently used
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[str]: The stored value, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, size, created = row
+            if self.ttl_seconds is not None and now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self._total_bytes -= size
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        """
+        Store a value, evicting least recently used entries if over budget
+
+        Args:
+            key: Cache key
+            value: Text value to store
+        """
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            logging.debug(f"Value of {size} bytes exceeds cache size, not caching")
+            return
+
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._total_bytes -= row[0]
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._total_bytes += size
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a value, e.g. one found to be corrupt
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+            self._total_bytes -= row[0]
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits its budget"""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._total_bytes -= size
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        """
+        Describe the cache effectiveness for run summaries
+
+        Returns:
+            str: Hits, misses and hit rate
+        """
+        text = f"{self.hits} hit(s), {self.misses} miss(es), {self.hit_rate * 100:.1f}% hit rate"
+        if self.expired:
+            text += f", {self.expired} expired"
+        return text
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -7,17 +7,53 @@ import logging
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 try:
     import pandas as pd
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Alignment
+    from openpyxl.utils import get_column_letter
     from openpyxl.utils.dataframe import dataframe_to_rows
 except ImportError as e:
     pd = None
     logging.warning(f"Required packages not found: {e}. Please install pandas and openpyxl.")
 
+# Column order of the single-sheet export (matches data_reference.json schema)
+MENU_DATA_COLUMNS = [
+    "restaurant_name",
+    "area_id",
+    "area_display_name",
+    "category_id",
+    "category_name",
+    "category_image_url",
+    "category_timings",
+    "category_rank",
+    "item_id",
+    "item_name",
+    "item_description",
+    "price",
+    "rank",
+    "image_url",
+    "instock",
+    "variation_item_id",
+    "variation_id",
+    "variation_name",
+    "variation_price",
+    "addon_name",
+    "addon_item_selection",
+    "addon_item_selection_min",
+    "addon_item_selection_max",
+    "addon_price",
+    "addon_id",
+    "addon_group_id",
+    "addon_group_name",
+]
+
+# Maximum column width in characters
+MAX_COLUMN_WIDTH = 50
+
 
 class MenuExcelExporter:
     """
@@ -52,31 +88,31 @@ class MenuExcelExporter:
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
-            # Create Excel writer
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+            # Write-only workbook: rows are streamed to disk with their
+            # formatting and the file is saved exactly once
+            writer = Workbook(write_only=True)
+            
+            if single_sheet:
+                # Export all data to a single sheet
+                self._export_single_sheet(json_data, writer)
+            else:
+                # Export Restaurant sheet
+                self._export_restaurant_sheet(json_data, writer)
                 
-                if single_sheet:
-                    # Export all data to a single sheet
-                    self._export_single_sheet(json_data, writer)
-                else:
-                    # Export Restaurant sheet
-                    self._export_restaurant_sheet(json_data, writer)
-                    
-                    # Export Categories sheet
-                    self._export_categories_sheet(json_data, writer)
-                    
-                    # Export Items sheet
-                    self._export_items_sheet(json_data, writer)
-                    
-                    # Export AddOnGroups sheet
-                    self._export_addongroups_sheet(json_data, writer)
-                    
-                    # Export metadata sheet if requested
-                    if include_metadata:
-                        self._export_metadata_sheet(json_data, writer)
+                # Export Categories sheet
+                self._export_categories_sheet(json_data, writer)
+                
+                # Export Items sheet
+                self._export_items_sheet(json_data, writer)
+                
+                # Export AddOnGroups sheet
+                self._export_addongroups_sheet(json_data, writer)
+                
+                # Export metadata sheet if requested
+                if include_metadata:
+                    self._export_metadata_sheet(json_data, writer)
             
-            # Apply formatting
-            self._apply_formatting(output_path)
+            writer.save(output_path)
             
             logging.info(f"Successfully exported menu data to Excel: {output_path}")
             return True
@@ -85,23 +121,83 @@ class MenuExcelExporter:
             logging.error(f"Failed to export to Excel: {e}")
             return False
     
+    def _write_sheet(
+        self,
+        writer,
+        sheet_name: str,
+        columns: List[str],
+        rows: Callable[[], Iterable[Dict]]
+    ) -> None:
+        """
+        Stream rows into a new sheet of a write-only workbook
+        
+        Column widths have to be set before the first row is written, so the
+        rows are generated twice: once to measure them and once to write them.
+        Neither pass keeps more than one row in memory.
+        
+        Args:
+            writer: Write-only openpyxl workbook
+            sheet_name: Name of the sheet to create
+            columns: Header names in column order
+            rows: Callable returning a fresh iterable of row dicts keyed by column
+        """
+        widths = [len(str(column)) for column in columns]
+        for row in rows():
+            for index, column in enumerate(columns):
+                length = len(str(row.get(column)))
+                if length > widths[index]:
+                    widths[index] = length
+        
+        ws = writer.create_sheet(title=sheet_name)
+        for index, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(index)].width = min(width + 2, MAX_COLUMN_WIDTH)
+        
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        center_alignment = Alignment(horizontal="center", vertical="center")
+        header = []
+        for column in columns:
+            cell = WriteOnlyCell(ws, value=column)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = center_alignment
+            header.append(cell)
+        ws.append(header)
+        
+        for row in rows():
+            ws.append([row.get(column) for column in columns])
+    
     def _export_restaurant_sheet(self, json_data: Dict, writer) -> None:
         """Export restaurant information to Excel sheet"""
         restaurant_data = json_data.get("restaurant", {})
         
-        df = pd.DataFrame([{
+        rows = [{
             "Name": restaurant_data.get("name", "Unknown"),
             "Source Image": restaurant_data.get("source_image", "Unknown"),
             "Export Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Total Categories": len(json_data.get("categories", [])),
             "Total Items": len(json_data.get("items", [])),
             "Total Addon Groups": len(json_data.get("addongroups", []))
-        }])
+        }]
         
-        df.to_excel(writer, sheet_name="Restaurant", index=False)
+        self._write_sheet(writer, "Restaurant", list(rows[0]), lambda: rows)
     
     def _export_single_sheet(self, json_data: Dict, writer) -> None:
         """Export all menu data to a single Excel sheet matching data_reference.json schema"""
+        self._write_sheet(
+            writer, "Menu_Data", MENU_DATA_COLUMNS, lambda: self._iter_menu_data_rows(json_data)
+        )
+    
+    def _iter_menu_data_rows(self, json_data: Dict) -> Iterator[Dict]:
+        """
+        Generate the Menu_Data rows, holding the rows of one item at a time
+        
+        Args:
+            json_data: The structured menu JSON data
+        
+        Yields:
+            Dict: Row keyed by MENU_DATA_COLUMNS
+        """
         restaurant_data = json_data.get("restaurant", {})
         restaurant_name = restaurant_data.get("restaurantname", "Unknown")
         
@@ -116,56 +212,21 @@ class MenuExcelExporter:
         # Create addon group lookup
         addon_group_map = {grp.get("addongroupid"): grp for grp in json_data.get("addongroups", [])}
         
-        rows = []
         items = json_data.get("items", [])
-        
         if not items:
             # Create empty row with just restaurant info
-            rows.append(self._create_empty_row_new_schema(restaurant_name, area_id, area_display_name))
-        else:
-            # Process each item
-            for item in items:
-                rows.extend(self._create_item_rows(
-                    item,
-                    restaurant_name,
-                    area_id,
-                    area_display_name,
-                    category_map,
-                    addon_group_map
-                ))
-        
-        # Create DataFrame with exact column order
-        df = pd.DataFrame(rows, columns=[
-            "restaurant_name",
-            "area_id",
-            "area_display_name",
-            "category_id",
-            "category_name",
-            "category_image_url",
-            "category_timings",
-            "category_rank",
-            "item_id",
-            "item_name",
-            "item_description",
-            "price",
-            "rank",
-            "image_url",
-            "instock",
-            "variation_item_id",
-            "variation_id",
-            "variation_name",
-            "variation_price",
-            "addon_name",
-            "addon_item_selection",
-            "addon_item_selection_min",
-            "addon_item_selection_max",
-            "addon_price",
-            "addon_id",
-            "addon_group_id",
-            "addon_group_name",
-        ])
-        
-        df.to_excel(writer, sheet_name="Menu_Data", index=False)
+            yield self._create_empty_row_new_schema(restaurant_name, area_id, area_display_name)
+            return
+        
+        for item in items:
+            yield from self._create_item_rows(
+                item,
+                restaurant_name,
+                area_id,
+                area_display_name,
+                category_map,
+                addon_group_map
+            )
     
     def _create_empty_row_new_schema(self, restaurant_name: str, area_id, area_display_name) -> Dict:
         """Create an empty row with restaurant info for new schema"""
@@ -479,74 +540,69 @@ class MenuExcelExporter:
     def _export_categories_sheet(self, json_data: Dict, writer) -> None:
         """Export categories information to Excel sheet"""
         categories = json_data.get("categories", [])
+        columns = [
+            "Category Name", "Category ID", "Confidence", 
+            "Coordinates", "Rank", "Active"
+        ]
         
-        if not categories:
-            # Create empty dataframe with headers
-            df = pd.DataFrame(columns=[
-                "Category Name", "Category ID", "Confidence", 
-                "Coordinates", "Rank", "Active"
-            ])
-        else:
-            df = pd.DataFrame([{
-                "Category Name": cat.get("categoryname", ""),
-                "Category ID": cat.get("categoryid"),
-                "Confidence": cat.get("confidence", 1.0),
-                "Coordinates": str(cat.get("coordinates")) if cat.get("coordinates") else "",
-                "Rank": cat.get("rank"),
-                "Active": cat.get("active", "1")
-            } for cat in categories])
-        
-        df.to_excel(writer, sheet_name="Categories", index=False)
+        def rows():
+            for cat in categories:
+                yield {
+                    "Category Name": cat.get("categoryname", ""),
+                    "Category ID": cat.get("categoryid"),
+                    "Confidence": cat.get("confidence", 1.0),
+                    "Coordinates": str(cat.get("coordinates")) if cat.get("coordinates") else "",
+                    "Rank": cat.get("rank"),
+                    "Active": cat.get("active", "1")
+                }
+        
+        self._write_sheet(writer, "Categories", columns, rows)
     
     def _export_items_sheet(self, json_data: Dict, writer) -> None:
         """Export menu items information to Excel sheet"""
         items = json_data.get("items", [])
+        columns = [
+            "Item Name", "Item ID", "Category ID", "Description", 
+            "Price", "Price Variants", "Currency", "In Stock", 
+            "Availability", "Tags", "Addon Groups", "Coordinates", "Confidence"
+        ]
         
-        if not items:
-            # Create empty dataframe with headers
-            df = pd.DataFrame(columns=[
-                "Item Name", "Item ID", "Category ID", "Description", 
-                "Price", "Price Variants", "Currency", "In Stock", 
-                "Availability", "Tags", "Addon Groups", "Coordinates", "Confidence"
-            ])
-        else:
-            df = pd.DataFrame([{
-                "Item Name": item.get("itemname", ""),
-                "Item ID": item.get("itemid"),
-                "Category ID": item.get("categoryid"),
-                "Description": item.get("description", ""),
-                "Price": item.get("price"),
-                "Price Variants": ", ".join(map(str, item.get("price_variants", []))),
-                "Currency": item.get("currency", "INR"),
-                "In Stock": item.get("instock", 2),
-                "Availability": item.get("availability", 1),
-                "Tags": ", ".join(item.get("tags", [])),
-                "Addon Groups": ", ".join(map(str, item.get("addongroups", []))),
-                "Coordinates": str(item.get("coordinates")) if item.get("coordinates") else "",
-                "Confidence": item.get("confidence", 1.0)
-            } for item in items])
-        
-        df.to_excel(writer, sheet_name="Items", index=False)
+        def rows():
+            for item in items:
+                yield {
+                    "Item Name": item.get("itemname", ""),
+                    "Item ID": item.get("itemid"),
+                    "Category ID": item.get("categoryid"),
+                    "Description": item.get("description", ""),
+                    "Price": item.get("price"),
+                    "Price Variants": ", ".join(map(str, item.get("price_variants", []))),
+                    "Currency": item.get("currency", "INR"),
+                    "In Stock": item.get("instock", 2),
+                    "Availability": item.get("availability", 1),
+                    "Tags": ", ".join(item.get("tags", [])),
+                    "Addon Groups": ", ".join(map(str, item.get("addongroups", []))),
+                    "Coordinates": str(item.get("coordinates")) if item.get("coordinates") else "",
+                    "Confidence": item.get("confidence", 1.0)
+                }
+        
+        self._write_sheet(writer, "Items", columns, rows)
     
     def _export_addongroups_sheet(self, json_data: Dict, writer) -> None:
         """Export addon groups information to Excel sheet"""
         addongroups = json_data.get("addongroups", [])
+        columns = ["Group Name", "Group ID", "Min Select", "Max Select", "Items"]
         
-        if not addongroups:
-            # Create empty dataframe with headers
-            df = pd.DataFrame(columns=[
-                "Group Name", "Group ID", "Min Select", "Max Select", "Items"
-            ])
-        else:
-            df = pd.DataFrame([{
-                "Group Name": group.get("group_name", ""),
-                "Group ID": group.get("group_id"),
-                "Min Select": group.get("min_select", 0),
-                "Max Select": group.get("max_select", 2),
-                "Items": ", ".join(group.get("items", []))
-            } for group in addongroups])
-        
-        df.to_excel(writer, sheet_name="AddOnGroups", index=False)
+        def rows():
+            for group in addongroups:
+                yield {
+                    "Group Name": group.get("group_name", ""),
+                    "Group ID": group.get("group_id"),
+                    "Min Select": group.get("min_select", 0),
+                    "Max Select": group.get("max_select", 2),
+                    "Items": ", ".join(group.get("items", []))
+                }
+        
+        self._write_sheet(writer, "AddOnGroups", columns, rows)
     
     def _export_metadata_sheet(self, json_data: Dict, writer) -> None:
         """Export metadata and audit log to Excel sheet"""
@@ -569,51 +625,7 @@ class MenuExcelExporter:
                     "Value": str(entry)
                 })
         
-        df = pd.DataFrame(metadata)
-        df.to_excel(writer, sheet_name="Metadata", index=False)
-    
-    def _apply_formatting(self, excel_path: str) -> None:
-        """Apply formatting to the Excel file"""
-        try:
-            from openpyxl import load_workbook
-            
-            wb = load_workbook(excel_path)
-            
-            # Define styles
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            center_alignment = Alignment(horizontal="center", vertical="center")
-            
-            # Format each sheet
-            for sheet_name in wb.sheetnames:
-                ws = wb[sheet_name]
-                
-                # Format header row
-                if ws.max_row > 0:
-                    for cell in ws[1]:
-                        cell.font = header_font
-                        cell.fill = header_fill
-                        cell.alignment = center_alignment
-                
-                # Auto-adjust column widths
-                for column in ws.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    
-                    adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                    ws.column_dimensions[column_letter].width = adjusted_width
-            
-            wb.save(excel_path)
-            
-        except Exception as e:
-            logging.warning(f"Could not apply formatting to Excel file: {e}")
+        self._write_sheet(writer, "Metadata", ["Property", "Value"], lambda: metadata)
     
     def save_json(self, json_data: Dict, output_path: str) -> bool:
         """
@@ -0,0 +1,113 @@
+"""
+File Scanner Module for lazily listing the images below a directory
+"""
+
+import fnmatch
+import logging
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+from constants import VALID_IMAGE_EXTENSIONS
+from image_formats import check_image_format
+
+
+class ImageScanner:
+    """
+    Yields the image files of a directory, and optionally of its subdirectories.
+
+    Built on os.scandir, whose entries carry the file type from the directory
+    listing, so no file is stat'ed to tell files from directories. Images are
+    yielded while the scan is still running, so work can start on the first
+    ones long before a large archive has been listed. Symbolic links to files
+    are followed, links to directories are not (no cycles). Unreadable
+    directories are logged and skipped.
+
+    The header of every image is checked as it is found (see
+    image_formats.check_image_format), so files that are not images, such as
+    an HTML page saved as .jpg, and images tesseract cannot read are rejected
+    during the scan instead of failing in OCR.
+
+    Include and exclude patterns are shell-style (fnmatch, where `*` also
+    matches `/`) and are matched against both the name of an entry and its
+    path relative to the scanned directory, e.g. `*.png`, `paris/*` or
+    `*/drafts`. Excluded directories are not descended into; files must match
+    an include pattern if any are given.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        recursive: bool = False,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        convert_formats: bool = False
+    ):
+        """
+        Initialize the scanner
+
+        Args:
+            root: Directory to scan
+            recursive: Whether to descend into subdirectories
+            include: Patterns files must match (default: every file)
+            exclude: Patterns of files and directories to skip
+            convert_formats: Whether images tesseract cannot read are accepted
+                when they can be converted
+        """
+        self.root = Path(root)
+        self.recursive = recursive
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.convert_formats = convert_formats
+        # Counts of the scan so far
+        self.image_count = 0
+        self.other_count = 0
+        self.rejected_count = 0
+
+    def _matches(self, name: str, relative_path: str, patterns: List[str]) -> bool:
+        """Check if an entry matches any of the patterns"""
+        return any(
+            fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relative_path, pattern)
+            for pattern in patterns
+        )
+
+    def __iter__(self) -> Iterator[Path]:
+        """
+        Scan the directory
+
+        Yields:
+            Path: Image files with a supported extension and format, in directory order
+        """
+        pending = [(str(self.root), "")]
+        while pending:
+            directory, relative_directory = pending.pop()
+            subdirectories = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        relative_path = f"{relative_directory}{entry.name}"
+                        if self.exclude and self._matches(entry.name, relative_path, self.exclude):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive:
+                                subdirectories.append((entry.path, f"{relative_path}/"))
+                            continue
+                        if not entry.is_file():
+                            continue
+                        if self.include and not self._matches(entry.name, relative_path, self.include):
+                            continue
+                        if os.path.splitext(entry.name)[1].lower() not in VALID_IMAGE_EXTENSIONS:
+                            self.other_count += 1
+                            continue
+                        image_path = Path(entry.path)
+                        reason = check_image_format(image_path, self.convert_formats)
+                        if reason:
+                            logging.warning(f"Skipping {relative_path}: {reason}")
+                            self.rejected_count += 1
+                            continue
+                        self.image_count += 1
+                        yield image_path
+            except OSError as e:
+                logging.warning(f"Could not scan {directory}: {e}")
+            # Depth first, in directory order
+            pending.extend(reversed(subdirectories))
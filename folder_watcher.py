@@ -0,0 +1,183 @@
+"""
+Folder Watcher Module for picking up menu images as they are dropped into a folder
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from constants import (DEFAULT_WATCH_POLL_SECONDS, DEFAULT_WATCH_SETTLE_SECONDS,
+                       VALID_IMAGE_EXTENSIONS, WATCH_RESCAN_SECONDS)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+# How often pending files are checked for having settled
+_TICK_SECONDS = 0.5
+
+
+def is_event_watching_available() -> bool:
+    """
+    Check if the watchdog package (inotify and friends) is installed
+
+    Returns:
+        bool: True if file system events can be used, False if the folder must be polled
+    """
+    return Observer is not None
+
+
+class _EventForwarder(FileSystemEventHandler):
+    """Forward the paths of created, modified and moved-in files to a queue"""
+
+    def __init__(self, events: queue.Queue):
+        super().__init__()
+        self.events = events
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        self.events.put(getattr(event, "dest_path", None) or event.src_path)
+
+
+class FolderWatcher:
+    """
+    Yields the image files of a folder once, and again whenever they change.
+
+    Changes are picked up from file system events (inotify on Linux) when
+    watchdog is installed, with a full rescan every few minutes for events
+    that never arrive (e.g. on network shares), and by polling otherwise. A
+    file is only yielded after its size and modification time have stayed
+    the same for `settle_seconds`, so files that are still being copied or
+    scanned are not read half-written. Hidden files are ignored.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        settle_seconds: float = DEFAULT_WATCH_SETTLE_SECONDS,
+        poll_interval: float = DEFAULT_WATCH_POLL_SECONDS,
+        use_events: bool = True
+    ):
+        """
+        Initialize the watcher
+
+        Args:
+            folder: Directory to watch (not recursive)
+            settle_seconds: Time a file must stay unchanged before it is yielded
+            poll_interval: Seconds between scans when polling
+            use_events: Use file system events if watchdog is installed
+        """
+        self.folder = Path(folder)
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.use_events = use_events and is_event_watching_available()
+        self._events: queue.Queue = queue.Queue()
+        # path -> (size, mtime_ns) of the version that was yielded
+        self._yielded: Dict[str, Tuple[int, int]] = {}
+        # path -> ((size, mtime_ns), monotonic time the signature was first seen)
+        self._pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+
+    def _is_image(self, path: Path) -> bool:
+        """Check if a path is a visible file with a supported extension"""
+        return not path.name.startswith(".") and path.suffix.lower() in VALID_IMAGE_EXTENSIONS
+
+    def _consider(self, path: Path) -> None:
+        """Start or restart the settle period of a new or changed file"""
+        try:
+            stat = path.stat()
+        except OSError:
+            self._pending.pop(str(path), None)
+            return
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if self._yielded.get(str(path)) == signature:
+            return
+        pending = self._pending.get(str(path))
+        if pending is None or pending[0] != signature:
+            self._pending[str(path)] = (signature, time.monotonic())
+
+    def _scan(self) -> None:
+        """Consider every image in the folder"""
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    path = Path(entry.path)
+                    if entry.is_file() and self._is_image(path):
+                        self._consider(path)
+        except OSError as e:
+            logging.warning(f"Could not scan {self.folder}: {e}")
+
+    def _settled(self) -> List[Path]:
+        """Pending files that have not changed for the settle period"""
+        now = time.monotonic()
+        settled = []
+        for key, (signature, since) in list(self._pending.items()):
+            self._consider(Path(key))
+            current = self._pending.get(key)
+            if current is None or current[0] != signature:
+                continue
+            # Empty files are usually still being created
+            if signature[0] > 0 and now - since >= self.settle_seconds:
+                del self._pending[key]
+                self._yielded[key] = signature
+                settled.append(Path(key))
+        return sorted(settled)
+
+    def watch(self, stop_event: Optional[threading.Event] = None) -> Iterator[Path]:
+        """
+        Yield images as they arrive until interrupted
+
+        Files already in the folder are yielded first. The iteration ends on
+        Ctrl+C or when `stop_event` is set.
+
+        Args:
+            stop_event: Optional event that stops the watcher
+
+        Yields:
+            Path: Image that is new or changed and has settled
+        """
+        observer = None
+        if self.use_events:
+            observer = Observer()
+            observer.schedule(_EventForwarder(self._events), str(self.folder), recursive=False)
+            observer.start()
+        rescan_interval = WATCH_RESCAN_SECONDS if observer else self.poll_interval
+        logging.info(
+            f"👀 Watching {self.folder} for new menus "
+            f"({'file system events' if observer else f'polling every {self.poll_interval:g}s'}, "
+            "Ctrl+C to stop)"
+        )
+
+        try:
+            self._scan()
+            next_scan = time.monotonic() + rescan_interval
+            while not (stop_event and stop_event.is_set()):
+                for path in self._settled():
+                    logging.info(f"📥 Picked up {path.name}")
+                    yield path
+
+                try:
+                    path = Path(self._events.get(timeout=_TICK_SECONDS))
+                    while True:
+                        if path.parent == self.folder and self._is_image(path):
+                            self._consider(path)
+                        path = Path(self._events.get_nowait())
+                except queue.Empty:
+                    pass
+
+                if time.monotonic() >= next_scan:
+                    self._scan()
+                    next_scan = time.monotonic() + rescan_interval
+        except KeyboardInterrupt:
+            logging.info("Stopping the watch, finishing the files already picked up...")
+        finally:
+            if observer:
+                observer.stop()
+                observer.join()
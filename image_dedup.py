@@ -0,0 +1,154 @@
+"""
+Image Dedup Module for grouping exact and near-identical menu photos so each is processed once
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from constants import (DEDUP_HASH_SIZE, DEFAULT_DEDUP_MAX_DISTANCE,
+                       MULTI_PAGE_EXTENSIONS)
+from disk_cache import hash_file
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def compute_dhash(image_path: Path, hash_size: int = DEDUP_HASH_SIZE) -> Optional[int]:
+    """
+    Difference hash of an image
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale thumbnail
+    and every bit records whether a pixel is brighter than its right neighbour.
+    The hash survives rescaling, recompression, format changes and small shifts
+    in angle or exposure; the Hamming distance between two hashes measures how
+    different the images look. JPEGs are decoded at reduced size, so hashing
+    a large photo costs a fraction of decoding it.
+
+    Args:
+        image_path: Path to image file
+        hash_size: Thumbnail rows; the hash has hash_size * hash_size bits
+
+    Returns:
+        Optional[int]: The hash, or None if Pillow is missing or cannot read the file
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(image_path) as image:
+            image.draft("L", (hash_size * 8, hash_size * 8))
+            thumbnail = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    except Exception as e:
+        logging.debug(f"Could not hash {image_path.name}: {e}")
+        return None
+
+    pixels = list(thumbnail.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            value = (value << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return value
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """Number of bits in which two hashes differ"""
+    return bin(first ^ second).count("1")
+
+
+def _get_bands(value: int, bits: int, band_count: int) -> List[Tuple[int, int]]:
+    """Split a hash into `band_count` (band index, band value) keys"""
+    bands = []
+    start = 0
+    for index in range(band_count):
+        width = bits // band_count + (1 if index < bits % band_count else 0)
+        bands.append((index, (value >> start) & ((1 << width) - 1)))
+        start += width
+    return bands
+
+
+def _fingerprint(image_path: Path, similar: bool) -> Tuple[Optional[str], Optional[int]]:
+    """Content hash and, for single-page images, difference hash of a file (None if unreadable)"""
+    try:
+        content_hash = hash_file(image_path)
+    except OSError as e:
+        # Left to fail in OCR like any other unreadable file
+        logging.debug(f"Could not hash {image_path.name}: {e}")
+        return None, None
+    # A shared first page says nothing about the rest of a PDF or TIFF
+    perceptual = similar and image_path.suffix.lower() not in MULTI_PAGE_EXTENSIONS
+    return content_hash, compute_dhash(image_path) if perceptual else None
+
+
+def find_duplicates(
+    image_files: Sequence[Path],
+    similar: bool = True,
+    max_distance: int = DEFAULT_DEDUP_MAX_DISTANCE,
+    max_workers: Optional[int] = None
+) -> Tuple[List[Path], Dict[Path, List[Path]]]:
+    """
+    Group identical files and near-identical photos
+
+    Files with the same content are always grouped. With `similar`, single-
+    page images are also grouped when their difference hashes are at most
+    `max_distance` bits apart. The hash sees the layout of a page, not its
+    words, so two different menus printed on the same template can match.
+    Candidates are found by locality-sensitive hashing: the hash is cut
+    into max_distance + 1 bands, and two hashes within the distance must agree
+    on at least one whole band, so only images sharing a band are compared.
+    The first file of each group, in input order, represents it; files are
+    compared with representatives only, so groups do not drift.
+
+    Args:
+        image_files: Image file paths
+        similar: Whether to group near-identical photos, not only identical files
+        max_distance: Largest Hamming distance between near-duplicates
+        max_workers: Number of threads reading and hashing files
+
+    Returns:
+        Tuple of (representatives in input order, representative -> its duplicates)
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        fingerprints = list(executor.map(partial(_fingerprint, similar=similar), image_files))
+
+    bits = DEDUP_HASH_SIZE * DEDUP_HASH_SIZE
+    band_count = min(bits, max(1, max_distance + 1))
+    by_content: Dict[str, Path] = {}
+    # (band index, band value) -> representatives with that band
+    buckets: Dict[Tuple[int, int], List[Tuple[Path, int]]] = {}
+    representatives: List[Path] = []
+    duplicates: Dict[Path, List[Path]] = {}
+
+    for image_path, (content_hash, dhash) in zip(image_files, fingerprints):
+        match = by_content.get(content_hash) if content_hash else None
+        if match is None and dhash is not None:
+            bands = _get_bands(dhash, bits, band_count)
+            candidates = {
+                candidate: candidate_hash
+                for band in bands
+                for candidate, candidate_hash in buckets.get(band, [])
+            }
+            nearest = min(
+                candidates.items(), key=lambda item: hamming_distance(dhash, item[1]), default=None
+            )
+            if nearest and hamming_distance(dhash, nearest[1]) <= max_distance:
+                match = nearest[0]
+
+        if match is not None:
+            logging.debug(f"{image_path.name} is a duplicate of {match.name}")
+            duplicates[match].append(image_path)
+            continue
+
+        representatives.append(image_path)
+        duplicates[image_path] = []
+        if content_hash:
+            by_content[content_hash] = image_path
+        if dhash is not None:
+            for band in _get_bands(dhash, bits, band_count):
+                buckets.setdefault(band, []).append((image_path, dhash))
+
+    return representatives, {path: copies for path, copies in duplicates.items() if copies}
@@ -0,0 +1,255 @@
+"""
+Image Formats Module for detecting image formats from file headers and converting the ones tesseract cannot read
+"""
+
+import logging
+import re
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, Optional
+
+from constants import (FORMAT_SNIFF_BYTES, IMAGE_FORMAT_DECODERS,
+                       LEPTONICA_BUILTIN_FORMATS, LEPTONICA_DEFAULT_FORMATS,
+                       LEPTONICA_FORMAT_LIBRARIES, NON_IMAGE_SIGNATURES)
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    # Teaches Pillow to open HEIC/HEIF photos
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
+
+# Brands of the ISO base media file format (HEIC/HEIF and AVIF photos)
+_HEIF_BRANDS = {b"heic", b"heix", b"hevc", b"hevx", b"heim", b"heis", b"mif1", b"msf1"}
+_AVIF_BRANDS = {b"avif", b"avis"}
+
+
+def sniff_image_format(header: bytes, suffix: str = "") -> Optional[str]:
+    """
+    Detect an image format from the first bytes of a file
+
+    Args:
+        header: At least FORMAT_SNIFF_BYTES bytes from the start of the file
+            (fewer if the file is shorter)
+        suffix: Lowercase file extension, only used for TGA, which has no signature
+
+    Returns:
+        Optional[str]: A key of IMAGE_FORMAT_DECODERS, or None if the header
+            matches no known image format
+    """
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if header[:4] in (b"II*\x00", b"MM\x00*", b"II+\x00", b"MM\x00+"):
+        return "tiff"
+    if header.startswith(b"BM"):
+        return "bmp"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header.startswith(b"%PDF-"):
+        return "pdf"
+    if header.startswith(b"\x00\x00\x00\x0cjP  \r\n\x87\n") or header.startswith(b"\xff\x4f\xff\x51"):
+        return "jp2"
+    if header[4:8] == b"ftyp":
+        if header[8:12] in _HEIF_BRANDS:
+            return "heif"
+        if header[8:12] in _AVIF_BRANDS:
+            return "avif"
+    if header.startswith(b"8BPS"):
+        return "psd"
+    # TGA: no color map or a palette, and a known image type
+    if suffix == ".tga" and len(header) >= 3 and header[1] in (0, 1) and header[2] in (1, 2, 3, 9, 10, 11):
+        return "tga"
+    # ICO and CUR: reserved zero, the resource type and at least one image
+    if header[:4] in (b"\x00\x00\x01\x00", b"\x00\x00\x02\x00") and header[4:6] not in (b"", b"\x00\x00"):
+        return "ico" if header[2] == 1 else "cur"
+    if re.match(rb"P[1-6]\s", header):
+        return "pnm"
+    if re.match(rb"P[fF]\s", header):
+        return "pfm"
+    if header.startswith(b"P7\n"):
+        return "pam"
+    # PCX: manufacturer 10, a known version and RLE encoding
+    if len(header) >= 3 and header[0] == 0x0A and header[1] in (0, 2, 3, 4, 5) and header[2] == 1:
+        return "pcx"
+    return None
+
+
+def sniff_non_image(header: bytes) -> Optional[str]:
+    """
+    Detect a file that is certainly not an image from its first bytes
+
+    Args:
+        header: The first bytes of the file
+
+    Returns:
+        Optional[str]: What the file is, or None if it may be an image
+    """
+    if not header:
+        return "empty file"
+    # Markup is matched case-insensitively, after any byte order mark and whitespace
+    start = header.lstrip(b"\xef\xbb\xbf").lstrip().lower()
+    for signature, kind in NON_IMAGE_SIGNATURES.items():
+        if header.startswith(signature) or start.startswith(signature):
+            return kind
+    return None
+
+
+def get_image_format(image_path: Path) -> Optional[str]:
+    """
+    Detect the format of an image file from its header
+
+    Args:
+        image_path: Path to image file
+
+    Returns:
+        Optional[str]: A key of IMAGE_FORMAT_DECODERS, or None if the header is
+            not a known image format
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(image_path, "rb") as f:
+        header = f.read(FORMAT_SNIFF_BYTES)
+    return sniff_image_format(header, image_path.suffix.lower())
+
+
+@lru_cache(maxsize=None)
+def get_tesseract_formats() -> FrozenSet[str]:
+    """
+    Formats the installed tesseract can read
+
+    Leptonica decodes most formats through optional libraries, which
+    `tesseract --version` lists. When it lists none (or tesseract cannot be
+    run), the libraries of common builds are assumed. PDFs are always
+    accepted; they are rendered by poppler or passed on as before (see
+    page_splitter).
+
+    Returns:
+        FrozenSet[str]: Keys of IMAGE_FORMAT_DECODERS
+    """
+    formats = set(LEPTONICA_BUILTIN_FORMATS) | {"pdf"}
+    try:
+        result = subprocess.run(
+            ["tesseract", "--version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=10
+        )
+        libraries = set(re.findall(r"\b(lib[a-z0-9]+)\s", result.stdout + result.stderr))
+    except Exception as e:
+        logging.debug(f"Could not list the image libraries of tesseract: {e}")
+        libraries = set()
+
+    found = {LEPTONICA_FORMAT_LIBRARIES[name] for name in libraries if name in LEPTONICA_FORMAT_LIBRARIES}
+    if not found:
+        found = set(LEPTONICA_DEFAULT_FORMATS)
+    return frozenset(formats | found)
+
+
+def can_convert(image_format: str) -> bool:
+    """
+    Check if Pillow can decode a format (HEIF requires the pillow-heif plugin)
+
+    Args:
+        image_format: A key of IMAGE_FORMAT_DECODERS
+
+    Returns:
+        bool: True if images of this format can be converted to PNG
+    """
+    decoder = IMAGE_FORMAT_DECODERS.get(image_format)
+    if Image is None or decoder is None:
+        return False
+    Image.init()
+    return decoder in Image.OPEN
+
+
+def check_image_format(image_path: Path, convert: bool = False) -> Optional[str]:
+    """
+    Check if a file should be OCR'd, reading only its header
+
+    Files whose header shows they are not images, or that are images in a
+    format this tesseract cannot read (unless it is converted), are rejected.
+    Files whose format is not recognised are passed on to tesseract.
+
+    Args:
+        image_path: Path to image file
+        convert: Whether formats tesseract cannot read are converted first
+
+    Returns:
+        Optional[str]: None if the file can be OCR'd, otherwise why it is rejected
+    """
+    try:
+        with open(image_path, "rb") as f:
+            header = f.read(FORMAT_SNIFF_BYTES)
+    except OSError as e:
+        return f"unreadable ({e.strerror or e})"
+    image_format = sniff_image_format(header, image_path.suffix.lower())
+    if image_format is None:
+        kind = sniff_non_image(header)
+        return f"not an image file ({kind})" if kind else None
+    if image_format in get_tesseract_formats() or (convert and can_convert(image_format)):
+        return None
+
+    if not convert:
+        hint = "use --convert-formats" + (" with pillow-heif installed" if image_format == "heif" else "")
+    elif image_format == "heif":
+        hint = "install pillow-heif to convert it"
+    else:
+        hint = "it cannot be converted"
+    return f"unsupported format {image_format.upper()}, {hint}"
+
+
+def needs_conversion(image_path: Path) -> bool:
+    """
+    Check if an image has to be converted before tesseract can read it
+
+    Args:
+        image_path: Path to image file
+
+    Returns:
+        bool: True for images of a convertible format tesseract cannot read
+    """
+    try:
+        image_format = get_image_format(image_path)
+    except OSError:
+        return False
+    return image_format is not None and image_format not in get_tesseract_formats() and can_convert(image_format)
+
+
+def convert_to_png(image_path: Path, output_dir: str) -> Path:
+    """
+    Write the first frame of an image as a PNG file tesseract can read
+
+    Transparent areas are flattened onto white, as text is usually dark.
+
+    Args:
+        image_path: Path to image file
+        output_dir: Directory to write the PNG file to
+
+    Returns:
+        Path: Path of the PNG file, named after the image
+    """
+    output_path = Path(output_dir, f"{image_path.stem}.png")
+    with Image.open(image_path) as image:
+        image.seek(0)
+        if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+            rgba = image.convert("RGBA")
+            converted = Image.new("RGB", rgba.size, "white")
+            converted.paste(rgba, mask=rgba.getchannel("A"))
+        elif image.mode in ("1", "L", "RGB"):
+            converted = image
+        else:
+            converted = image.convert("RGB")
+        converted.save(output_path, format="PNG", compress_level=1)
+    return output_path
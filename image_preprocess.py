@@ -0,0 +1,203 @@
+"""
+Image Preprocessing Module for shrinking and cleaning up menu photos before OCR
+"""
+
+import io
+import logging
+from typing import Dict, Optional
+
+from constants import (DEFAULT_PREPROCESS_MAX_MEGAPIXELS,
+                       DEFAULT_PREPROCESS_TARGET_DPI, PREPROCESS_MAX_SKEW_DEGREES,
+                       PREPROCESS_THRESHOLD_OFFSET)
+
+try:
+    import numpy as np
+    from PIL import Image, ImageOps
+except ImportError as e:
+    np = None
+    logging.debug(f"Image preprocessing not available: {e}")
+
+
+def is_preprocessing_available() -> bool:
+    """
+    Check if Pillow and numpy are installed
+
+    Returns:
+        bool: True if images can be preprocessed, False otherwise
+    """
+    return np is not None
+
+
+def get_preprocess_config(
+    max_megapixels: float = DEFAULT_PREPROCESS_MAX_MEGAPIXELS,
+    target_dpi: int = DEFAULT_PREPROCESS_TARGET_DPI
+) -> Dict:
+    """
+    Describe the preprocessing settings, used as part of the OCR cache key
+
+    Args:
+        max_megapixels: Pixel budget images are downscaled to
+        target_dpi: Resolution scans are downscaled to
+
+    Returns:
+        Dict: JSON-serializable settings
+    """
+    return {
+        "version": 1,
+        "max_megapixels": max_megapixels,
+        "target_dpi": target_dpi,
+        "threshold_offset": PREPROCESS_THRESHOLD_OFFSET,
+        "max_skew_degrees": PREPROCESS_MAX_SKEW_DEGREES,
+    }
+
+
+def get_scale_factor(
+    image: "Image.Image",
+    max_megapixels: float = DEFAULT_PREPROCESS_MAX_MEGAPIXELS,
+    target_dpi: int = DEFAULT_PREPROCESS_TARGET_DPI
+) -> float:
+    """
+    Downscale factor that keeps text legible while cutting the pixel count
+
+    Scans that record a resolution above `target_dpi` are brought down to it.
+    Photos rarely carry a meaningful resolution, so they are limited to a pixel
+    budget instead. Images are never upscaled.
+
+    Args:
+        image: Source image
+        max_megapixels: Pixel budget in megapixels
+        target_dpi: Resolution scans are downscaled to
+
+    Returns:
+        float: Scale factor in (0, 1]
+    """
+    scale = 1.0
+    dpi = image.info.get("dpi")
+    if dpi and dpi[0] and dpi[0] > target_dpi:
+        scale = target_dpi / float(dpi[0])
+
+    pixels = image.width * image.height * scale * scale
+    max_pixels = max_megapixels * 1_000_000
+    if pixels > max_pixels:
+        scale *= (max_pixels / pixels) ** 0.5
+    return min(1.0, scale)
+
+
+def adaptive_threshold(gray: "np.ndarray", offset: float = PREPROCESS_THRESHOLD_OFFSET) -> "np.ndarray":
+    """
+    Binarize with a local mean threshold (Bradley's method)
+
+    A pixel becomes black when it is darker than the mean of its neighbourhood
+    by more than `offset`, which copes with the uneven lighting and shadows of
+    phone photos far better than one global threshold.
+
+    Args:
+        gray: 2-D uint8 grayscale image
+        offset: Fraction below the local mean that counts as ink
+
+    Returns:
+        np.ndarray: 2-D bool array, True for ink
+    """
+    height, width = gray.shape
+    radius = max(7, min(height, width) // 32)
+
+    # Summed-area table with a zero border so every window sum is four lookups
+    integral = np.zeros((height + 1, width + 1), dtype=np.float64)
+    integral[1:, 1:] = gray.cumsum(axis=0, dtype=np.float64).cumsum(axis=1)
+
+    rows = np.arange(height)
+    cols = np.arange(width)
+    top = np.clip(rows - radius, 0, height)[:, None]
+    bottom = np.clip(rows + radius + 1, 0, height)[:, None]
+    left = np.clip(cols - radius, 0, width)[None, :]
+    right = np.clip(cols + radius + 1, 0, width)[None, :]
+
+    window_sum = integral[bottom, right] - integral[top, right] - integral[bottom, left] + integral[top, left]
+    window_area = (bottom - top) * (right - left)
+    return gray * window_area < window_sum * (1.0 - offset)
+
+
+def estimate_skew(ink: "np.ndarray", max_degrees: float = PREPROCESS_MAX_SKEW_DEGREES) -> float:
+    """
+    Estimate the text skew with a projection profile search
+
+    Text lines produce the sharpest peaks in the per-row ink count when they
+    are horizontal, so the angle with the highest row-profile variance wins.
+    The search runs on a reduced copy, coarse first and then refined.
+
+    Args:
+        ink: 2-D bool array, True for ink
+        max_degrees: Largest skew considered in either direction
+
+    Returns:
+        float: Counter-clockwise rotation in degrees that straightens the text
+    """
+    mask = Image.fromarray((ink * 255).astype(np.uint8))
+    if max(mask.size) > 800:
+        mask.thumbnail((800, 800))
+
+    def score(angle):
+        rotated = np.asarray(mask.rotate(angle, resample=Image.NEAREST, fillcolor=0))
+        return float(np.var(rotated.sum(axis=1, dtype=np.float64)))
+
+    best = max(np.arange(-max_degrees, max_degrees + 0.01, 1.0), key=score)
+    best = max(np.arange(best - 0.8, best + 0.81, 0.2), key=score)
+    return round(float(best), 1)
+
+
+def preprocess_image(
+    image_path,
+    max_megapixels: float = DEFAULT_PREPROCESS_MAX_MEGAPIXELS,
+    target_dpi: int = DEFAULT_PREPROCESS_TARGET_DPI
+) -> "Image.Image":
+    """
+    Prepare an image for OCR: grayscale, downscale, deskew and binarize
+
+    Args:
+        image_path: Path to image file
+        max_megapixels: Pixel budget images are downscaled to
+        target_dpi: Resolution scans are downscaled to
+
+    Returns:
+        Image.Image: 1-bit image ready for Tesseract
+    """
+    if np is None:
+        raise ImportError("Pillow and numpy packages are required for image preprocessing")
+
+    with Image.open(image_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            # Transparent areas would turn black in grayscale, put them on white
+            rgba = image.convert("RGBA")
+            background = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+            image = Image.alpha_composite(background, rgba)
+        gray = image.convert("L")
+        scale = get_scale_factor(image, max_megapixels, target_dpi)
+
+    if scale < 1.0:
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, Image.LANCZOS, reducing_gap=2.0)
+
+    angle = estimate_skew(adaptive_threshold(np.asarray(gray)))
+    if abs(angle) >= 0.2:
+        gray = gray.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+
+    ink = adaptive_threshold(np.asarray(gray))
+    return Image.fromarray(np.where(ink, 0, 255).astype(np.uint8)).convert("1")
+
+
+def encode_image(image: "Image.Image", dpi: Optional[int] = DEFAULT_PREPROCESS_TARGET_DPI) -> bytes:
+    """
+    Encode an image for piping to Tesseract
+
+    Args:
+        image: Image to encode
+        dpi: Resolution to record, so Tesseract does not have to guess it
+
+    Returns:
+        bytes: PNG data
+    """
+    buffer = io.BytesIO()
+    params = {"dpi": (dpi, dpi)} if dpi else {}
+    image.save(buffer, format="PNG", compress_level=1, **params)
+    return buffer.getvalue()
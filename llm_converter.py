@@ -2,31 +2,137 @@
 LLM Converter Module for converting OCR text to structured JSON using Google Gemini
 """
 
+import hashlib
 import json
 import logging
 import os
+import threading
+import time
 from typing import Dict, Optional, Tuple
 
+from constants import DEFAULT_GEMINI_MAX_RETRIES
+
 try:
     import google.generativeai as genai
 except ImportError:
     genai = None
     logging.warning("google-generativeai package not found. Please install it to use LLM features.")
 
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:
+    google_exceptions = None
+
+# genai.configure replaces the process-wide client (and its open connections),
+# so it only runs again when the API key changes
+_configure_lock = threading.Lock()
+_configured_api_key = None
+
+# Converters reused by the module-level convenience function, one per model
+_converters_lock = threading.Lock()
+_converters: Dict = {}
+
+
+def configure_gemini(api_key: str) -> None:
+    """
+    Configure the Gemini client once per process and API key
+    
+    Args:
+        api_key: Gemini API key
+    """
+    global _configured_api_key
+    with _configure_lock:
+        if _configured_api_key != api_key:
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
+            # Create the shared client now, so worker threads never race to create it lazily
+            try:
+                from google.generativeai import client as genai_client
+                genai_client.get_default_generative_client()
+            except Exception as e:
+                logging.debug(f"Could not create the Gemini client eagerly: {e}")
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Check if an API error means a request or token quota was exhausted
+    
+    Args:
+        error: Exception raised by the Gemini client
+    
+    Returns:
+        bool: True for HTTP 429 / RESOURCE_EXHAUSTED errors
+    """
+    if google_exceptions is not None and isinstance(
+        error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+    ):
+        return True
+    message = str(error).upper()
+    return "429" in message or "RESOURCE_EXHAUSTED" in message or "RESOURCE EXHAUSTED" in message
+
+
+def normalize_ocr_text(text: str) -> str:
+    """
+    Normalize OCR text so insignificant whitespace differences share a cache entry
+    
+    Args:
+        text: OCR extracted text
+    
+    Returns:
+        str: Text with collapsed whitespace and without empty lines
+    """
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens in a text (about 4 characters per token)
+    
+    Args:
+        text: Text to estimate
+    
+    Returns:
+        int: Estimated token count
+    """
+    return len(text) // 4 + 1
+
 
 class GeminiConverter:
     """
     Converter class for processing OCR text using Google Gemini LLM
+    
+    A converter is meant to live for a whole batch and can be shared by worker
+    threads: the model and its client are created once, and the client keeps a
+    single gRPC channel that multiplexes concurrent requests.
     """
     
-    def __init__(self, model_name: str = "gemini-2.0-flash-exp"):
+    def __init__(
+        self,
+        model_name: str = "gemini-2.0-flash-exp",
+        rate_limiter=None,
+        max_retries: int = DEFAULT_GEMINI_MAX_RETRIES,
+        cache=None,
+        refresh_cache: bool = False,
+        compact: bool = False
+    ):
         """
         Initialize the Gemini converter
         
         Args:
             model_name: The Gemini model to use (gemini-2.0-flash-exp, gemini-2.5-pro, etc.)
+            rate_limiter: Optional AdaptiveRateLimiter shared by all concurrent requests
+            max_retries: Retries for requests rejected with a rate limit error
+            cache: Optional DiskCache of validated responses
+            refresh_cache: Ignore cached responses and overwrite them
+            compact: Ask for the compact output contract and expand it locally
         """
         self.model_name = model_name
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.cache = cache
+        self.refresh_cache = refresh_cache
+        self.compact = compact
         self.model = None
         self._initialize_model()
     
@@ -50,7 +156,7 @@ class GeminiConverter:
             return False
         
         try:
-            genai.configure(api_key=api_key)
+            configure_gemini(api_key)
             self.model = genai.GenerativeModel(self.model_name)
             logging.info(f"Successfully initialized Gemini model: {self.model_name}")
             return True
@@ -65,6 +171,9 @@ class GeminiConverter:
         Returns:
             str: The system prompt for Gemini
         """
+        if self.compact:
+            return self.get_compact_system_prompt()
+        
         return """You are an expert at parsing restaurant menu text extracted from images using OCR. 
 Convert the given OCR text into a structured JSON format matching a restaurant POS system database schema.
 
@@ -206,11 +315,82 @@ Input: "Add extra cheese 40/-"
 Output: addongroup with addonitem_name="Extra Cheese", addonitem_price="40"
 
 Return ONLY the JSON object, nothing else."""
+    
+    def get_compact_system_prompt(self) -> str:
+        """
+        Get the system prompt asking for the compact output contract
+        
+        Only non-default values are requested, using short keys; the response is
+        expanded to the full schema by `expand_compact_json`.
+        
+        Returns:
+            str: The compact system prompt for Gemini
+        """
+        return """You are an expert at parsing restaurant menu text extracted from images using OCR.
+Convert the given OCR text into the COMPACT JSON format below.
 
+CRITICAL INSTRUCTIONS:
+1. Return ONLY minified valid JSON - no explanations, no markdown, no additional text
+2. Use ONLY the short keys below and OMIT every key whose value would be empty or default
+3. Prices are strings of digits only (remove currency symbols like ₹, -, /)
+4. Handle OCR errors gracefully by making reasonable inferences
+
+COMPACT SCHEMA:
+{
+  "r": {"n": "<restaurant name>", "cu": "<cuisines>", "a": "<address>", "ph": "<contact>", "ci": "<city>", "st": "<state>", "co": "<country>"},
+  "c": ["<category name>", ...],
+  "i": [{"n": "<item name>", "p": "<price>", "c": <index into "c">, "d": "<description>", "a": "<2=non-veg, 24=egg>", "v": [["<variation name>", "<price>"], ...], "g": [<index into "g">, ...]}],
+  "g": [{"n": "<addon group name>", "i": [["<addon name>", "<price>", "<2=non-veg>"], ...]}]
+}
+
+OMIT when default: "a" for veg items, "d" when there is no description, "v" and "g" when empty,
+the third addon element for veg add-ons, and any empty "r" field.
+
+PARSING RULES:
+1. Category Detection: Lines with ALL CAPS or section headers (e.g., "CALZONE MENU", "PIZZAS")
+2. Item Format: "Item Name   Price" or "Item Name   ₹Price/-"
+3. Description: Text in parentheses or lines following item name
+4. Price Variants: "289/349" → "p": "289", "v": [["Regular","289"],["Large","349"]]
+5. Add-ons: Items like "Add extra cheese 40" → goes to "g"
+6. Attributes: Detect veg/non-veg from context (chicken/mutton=non-veg, paneer/veg=veg)
+
+EXAMPLE:
+Input: "PIZZAS\nThree Cheese ₹259/-\n(Mozzarella+Cheddar)\nChicken Teriyaki 289/349\nAdd extra cheese 40/-"
+Output: {"c":["PIZZAS"],"i":[{"n":"Three Cheese","p":"259","c":0,"d":"(Mozzarella+Cheddar)"},{"n":"Chicken Teriyaki","p":"289","c":0,"a":"2","v":[["Regular","289"],["Large","349"]]}],"g":[{"n":"Add-ons","i":[["Extra Cheese","40"]]}]}
+
+Return ONLY the JSON object, nothing else."""
+
+    def get_prompt_version(self) -> str:
+        """
+        Get a short fingerprint of the system prompt
+        
+        Returns:
+            str: Hash of the prompt text, changes whenever the prompt is edited
+        """
+        return hashlib.sha256(self.get_system_prompt().encode("utf-8")).hexdigest()[:16]
+    
+    def get_cache_key(self, raw_text: str) -> str:
+        """
+        Build the response cache key for an OCR text
+        
+        Args:
+            raw_text: The OCR extracted text
+        
+        Returns:
+            str: Hash of the normalized text, prompt version and model name
+        """
+        payload = json.dumps({
+            "text": normalize_ocr_text(raw_text),
+            "prompt_version": self.get_prompt_version(),
+            "model": self.model_name,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
     def text_to_json_with_gemini(
         self, 
         raw_text: str, 
-        source_image_path: Optional[str] = None
+        source_image_path: Optional[str] = None,
+        rate_limiter=None
     ) -> Tuple[bool, Optional[Dict], Optional[str]]:
         """
         Convert OCR text to structured JSON using Gemini LLM
@@ -218,6 +398,7 @@ Return ONLY the JSON object, nothing else."""
         Args:
             raw_text: The OCR extracted text from menu image
             source_image_path: Optional path to the source image
+            rate_limiter: AdaptiveRateLimiter for this call (default: the converter's)
         
         Returns:
             Tuple of (success, json_data, error_message)
@@ -228,6 +409,20 @@ Return ONLY the JSON object, nothing else."""
         if not raw_text or not raw_text.strip():
             return False, None, "Empty or invalid input text"
         
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.get_cache_key(raw_text)
+            cached = None if self.refresh_cache else self.cache.get(cache_key)
+            if cached is not None:
+                try:
+                    json_data = self._validate_and_enhance_json(json.loads(cached), source_image_path)
+                    logging.info("Using cached Gemini response")
+                    return True, json_data, None
+                except Exception as e:
+                    # A corrupt or truncated entry is a miss, Gemini is asked again
+                    logging.warning(f"Discarding unreadable cached Gemini response: {e}")
+                    self.cache.delete(cache_key)
+        
         try:
             # Prepare the prompt
             system_prompt = self.get_system_prompt()
@@ -241,8 +436,9 @@ Convert this to the specified JSON format:"""
             full_prompt = f"{system_prompt}\n\n{user_prompt}"
             
             # Generate response from Gemini
-            logging.info("Sending request to Gemini...")
-            response = self.model.generate_content(full_prompt)
+            # The response is usually a few times larger than the OCR text
+            estimated_tokens = estimate_tokens(full_prompt) + 4 * estimate_tokens(raw_text)
+            response = self._generate_with_retry(full_prompt, estimated_tokens, rate_limiter)
             
             if not response or not response.text:
                 return False, None, "Empty response from Gemini"
@@ -264,9 +460,15 @@ Convert this to the specified JSON format:"""
             try:
                 json_data = json.loads(response_text)
                 
+                if self.compact:
+                    json_data = expand_compact_json(json_data)
+                
                 # Validate and enhance the JSON structure
                 json_data = self._validate_and_enhance_json(json_data, source_image_path)
                 
+                if cache_key is not None:
+                    self.cache.put(cache_key, json.dumps(json_data, ensure_ascii=False))
+                
                 logging.info("Successfully converted text to JSON using Gemini")
                 return True, json_data, None
                 
@@ -279,6 +481,44 @@ Convert this to the specified JSON format:"""
             logging.error(f"Error calling Gemini API: {e}")
             return False, None, f"Gemini API error: {e}"
     
+    def _generate_with_retry(self, prompt: str, estimated_tokens: int, rate_limiter=None):
+        """
+        Send a request within the rate limits, backing off on throttling errors
+        
+        Args:
+            prompt: Full prompt to send
+            estimated_tokens: Estimated prompt + response tokens
+            rate_limiter: AdaptiveRateLimiter for this request (default: the converter's)
+        
+        Returns:
+            The Gemini response
+        """
+        rate_limiter = rate_limiter or self.rate_limiter
+        for attempt in range(self.max_retries + 1):
+            if rate_limiter:
+                rate_limiter.acquire(estimated_tokens)
+            
+            try:
+                logging.info("Sending request to Gemini...")
+                response = self.model.generate_content(prompt)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                if rate_limiter:
+                    delay = rate_limiter.record_throttle(attempt)
+                else:
+                    delay = min(60.0, 2.0 * (2 ** attempt))
+                    logging.warning(f"Gemini rate limit hit, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            
+            if rate_limiter:
+                usage = getattr(response, "usage_metadata", None)
+                actual_tokens = getattr(usage, "total_token_count", None) if usage else None
+                rate_limiter.record_usage(estimated_tokens, actual_tokens)
+                rate_limiter.record_success()
+            return response
+    
     def _validate_and_enhance_json(
         self, 
         json_data: Dict, 
@@ -294,110 +534,240 @@ Convert this to the specified JSON format:"""
         Returns:
             Dict: Enhanced and validated JSON data
         """
-        # Ensure top-level structure
-        if "restaurant" not in json_data:
-            json_data["restaurant"] = {
-                "restaurantname": "Unknown",
-                "source_image": source_image_path or "Unknown",
-                "country": "",
-                "address": "",
-                "contact": "",
-                "cuisines": "",
-                "city": "",
-                "state": ""
-            }
-        else:
-            if source_image_path:
-                json_data["restaurant"]["source_image"] = source_image_path
-            json_data["restaurant"].setdefault("restaurantname", "Unknown")
-            json_data["restaurant"].setdefault("country", "")
-            json_data["restaurant"].setdefault("address", "")
-            json_data["restaurant"].setdefault("contact", "")
-            json_data["restaurant"].setdefault("cuisines", "")
-            json_data["restaurant"].setdefault("city", "")
-            json_data["restaurant"].setdefault("state", "")
-        
-        if "areas" not in json_data:
-            json_data["areas"] = []
-        
-        if "categories" not in json_data:
-            json_data["categories"] = []
-        
-        if "items" not in json_data:
-            json_data["items"] = []
-        
-        if "addongroups" not in json_data:
-            json_data["addongroups"] = []
-        
-        if "audit_log" not in json_data:
-            json_data["audit_log"] = []
-        
-        # Validate and enhance areas
-        for area in json_data["areas"]:
-            area.setdefault("areaid", None)
-            area.setdefault("displayname", "Main Dining")
-            area.setdefault("active", "1")
-            area.setdefault("rank", "1")
-        
-        # Validate and enhance categories
-        for category in json_data["categories"]:
-            category.setdefault("categoryid", None)
-            category.setdefault("active", "1")
-            category.setdefault("categoryrank", "1")
-            category.setdefault("category_image_url", None)
-            category.setdefault("parent_category_id", "0")
-            category.setdefault("categorytimings", "")
+        return validate_and_enhance_menu_json(json_data, source_image_path)
+
+
+def validate_and_enhance_menu_json(
+    json_data: Dict, 
+    source_image_path: Optional[str] = None
+) -> Dict:
+    """
+    Validate and enhance menu JSON with the schema defaults and corrections
+    
+    Args:
+        json_data: Menu data from Gemini or the rule-based parser
+        source_image_path: Optional path to source image
+    
+    Returns:
+        Dict: Enhanced and validated JSON data
+    """
+    # Ensure top-level structure
+    if "restaurant" not in json_data:
+        json_data["restaurant"] = {
+            "restaurantname": "Unknown",
+            "source_image": source_image_path or "Unknown",
+            "country": "",
+            "address": "",
+            "contact": "",
+            "cuisines": "",
+            "city": "",
+            "state": ""
+        }
+    else:
+        if source_image_path:
+            json_data["restaurant"]["source_image"] = source_image_path
+        json_data["restaurant"].setdefault("restaurantname", "Unknown")
+        json_data["restaurant"].setdefault("country", "")
+        json_data["restaurant"].setdefault("address", "")
+        json_data["restaurant"].setdefault("contact", "")
+        json_data["restaurant"].setdefault("cuisines", "")
+        json_data["restaurant"].setdefault("city", "")
+        json_data["restaurant"].setdefault("state", "")
+
+    if "areas" not in json_data:
+        json_data["areas"] = []
+
+    if "categories" not in json_data:
+        json_data["categories"] = []
+
+    if "items" not in json_data:
+        json_data["items"] = []
+
+    if "addongroups" not in json_data:
+        json_data["addongroups"] = []
+
+    if "audit_log" not in json_data:
+        json_data["audit_log"] = []
+
+    # Validate and enhance areas
+    for area in json_data["areas"]:
+        area.setdefault("areaid", None)
+        area.setdefault("displayname", "Main Dining")
+        area.setdefault("active", "1")
+        area.setdefault("rank", "1")
+
+    # Validate and enhance categories
+    for category in json_data["categories"]:
+        category.setdefault("categoryid", None)
+        category.setdefault("active", "1")
+        category.setdefault("categoryrank", "1")
+        category.setdefault("category_image_url", None)
+        category.setdefault("parent_category_id", "0")
+        category.setdefault("categorytimings", "")
+
+    # Validate and enhance items
+    for item in json_data["items"]:
+        item.setdefault("itemid", None)
+        item.setdefault("itemallowvariation", 0)
+        item.setdefault("itemrank", "1")
+        item.setdefault("item_categoryid", None)
+        item.setdefault("active", "1")
+        item.setdefault("item_favorite", "0")
+        item.setdefault("itemallowaddon", "1")
+        item.setdefault("itemaddonbasedon", "0")
+        item.setdefault("instock", "2")
+        item.setdefault("ignore_taxes", "0")
+        item.setdefault("ignore_discounts", "0")
+        item.setdefault("days", "-1")
+        item.setdefault("item_attributeid", "1")
+        item.setdefault("itemdescription", "")
+        item.setdefault("minimumpreparationtime", "")
+        item.setdefault("item_image_url", "")
+        item.setdefault("variation", [])
+        item.setdefault("addon", [])
+        item.setdefault("item_tax", "")
+
+    # Validate and enhance addongroups
+    for group in json_data["addongroups"]:
+        group.setdefault("addongroupid", None)
+        group.setdefault("addongroup_restaurantid", None)
+        group.setdefault("addongroup_rank", "1")
+        group.setdefault("active", "1")
+        group.setdefault("show_in_online", "1")
+        group.setdefault("show_in_pos", "1")
+        group.setdefault("min_qty", "0")
+        group.setdefault("max_qty", "2")
+        group.setdefault("addongroupitems", [])
+
+        # Validate addon group items
+        for addon_item in group.get("addongroupitems", []):
+            addon_item.setdefault("addonitemid", None)
+            addon_item.setdefault("active", "1")
+            addon_item.setdefault("attributes", "1")
+            addon_item.setdefault("addonitem_rank", "1")
+            addon_item.setdefault("parent_addon_id", "0")
+            addon_item.setdefault("status", "1")
+
+    return json_data
+
+
+def _compact_str(value) -> str:
+    """Convert a compact value to the string form used by the full schema"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def expand_compact_json(compact_data: Dict) -> Dict:
+    """
+    Expand a compact Gemini response to the full menu schema
+    
+    Categories and addon groups are referenced by index in the compact format,
+    so they get sequential ids here and items are linked to them by id. All
+    other defaults are filled by `validate_and_enhance_menu_json`.
+    
+    Args:
+        compact_data: Parsed compact response
+    
+    Returns:
+        Dict: Menu data using the full schema keys
+    """
+    restaurant_keys = {
+        "n": "restaurantname", "cu": "cuisines", "a": "address", "ph": "contact",
+        "ci": "city", "st": "state", "co": "country",
+    }
+    compact_restaurant = compact_data.get("r") or {}
+    restaurant = {
+        full_key: _compact_str(compact_restaurant[short_key])
+        for short_key, full_key in restaurant_keys.items()
+        if compact_restaurant.get(short_key)
+    }
+    
+    categories = []
+    for rank, name in enumerate(compact_data.get("c") or [], 1):
+        categories.append({
+            "categoryid": str(rank),
+            "categoryname": _compact_str(name),
+            "categoryrank": str(rank),
+        })
+    
+    addongroups = []
+    for rank, group in enumerate(compact_data.get("g") or [], 1):
+        group_items = []
+        for item_rank, addon in enumerate(group.get("i") or [], 1):
+            addon = list(addon) if isinstance(addon, (list, tuple)) else [addon]
+            group_items.append({
+                "addonitem_name": _compact_str(addon[0]) if addon else "",
+                "addonitem_price": _compact_str(addon[1]) if len(addon) > 1 else "",
+                "attributes": _compact_str(addon[2]) if len(addon) > 2 and addon[2] else "1",
+                "addonitem_rank": str(item_rank),
+            })
+        addongroups.append({
+            "addongroupid": str(rank),
+            "addongroup_name": _compact_str(group.get("n")),
+            "addongroup_rank": str(rank),
+            "addongroupitems": group_items,
+        })
+    
+    items = []
+    for rank, compact_item in enumerate(compact_data.get("i") or [], 1):
+        item = {
+            "itemname": _compact_str(compact_item.get("n")),
+            "price": _compact_str(compact_item.get("p")),
+            "itemrank": str(rank),
+            "itemdescription": _compact_str(compact_item.get("d")),
+            "item_attributeid": _compact_str(compact_item.get("a")) or "1",
+        }
         
-        # Validate and enhance items
-        for item in json_data["items"]:
-            item.setdefault("itemid", None)
-            item.setdefault("itemallowvariation", 0)
-            item.setdefault("itemrank", "1")
-            item.setdefault("item_categoryid", None)
-            item.setdefault("active", "1")
-            item.setdefault("item_favorite", "0")
-            item.setdefault("itemallowaddon", "1")
-            item.setdefault("itemaddonbasedon", "0")
-            item.setdefault("instock", "2")
-            item.setdefault("ignore_taxes", "0")
-            item.setdefault("ignore_discounts", "0")
-            item.setdefault("days", "-1")
-            item.setdefault("item_attributeid", "1")
-            item.setdefault("itemdescription", "")
-            item.setdefault("minimumpreparationtime", "")
-            item.setdefault("item_image_url", "")
-            item.setdefault("variation", [])
-            item.setdefault("addon", [])
-            item.setdefault("item_tax", "")
+        category_index = compact_item.get("c")
+        if isinstance(category_index, int) and 0 <= category_index < len(categories):
+            item["item_categoryid"] = categories[category_index]["categoryid"]
         
-        # Validate and enhance addongroups
-        for group in json_data["addongroups"]:
-            group.setdefault("addongroupid", None)
-            group.setdefault("addongroup_restaurantid", None)
-            group.setdefault("addongroup_rank", "1")
-            group.setdefault("active", "1")
-            group.setdefault("show_in_online", "1")
-            group.setdefault("show_in_pos", "1")
-            group.setdefault("min_qty", "0")
-            group.setdefault("max_qty", "2")
-            group.setdefault("addongroupitems", [])
-            
-            # Validate addon group items
-            for addon_item in group.get("addongroupitems", []):
-                addon_item.setdefault("addonitemid", None)
-                addon_item.setdefault("active", "1")
-                addon_item.setdefault("attributes", "1")
-                addon_item.setdefault("addonitem_rank", "1")
-                addon_item.setdefault("parent_addon_id", "0")
-                addon_item.setdefault("status", "1")
+        variations = []
+        for variation_rank, variation in enumerate(compact_item.get("v") or [], 1):
+            variation = list(variation) if isinstance(variation, (list, tuple)) else [variation]
+            variations.append({
+                "variationitemid": None,
+                "variationid": None,
+                "itemid": None,
+                "variation_name": _compact_str(variation[0]) if variation else "",
+                "variation_price": _compact_str(variation[1]) if len(variation) > 1 else "",
+                "variationrank": str(variation_rank),
+            })
+        item["variation"] = variations
+        item["itemallowvariation"] = 1 if variations else 0
         
-        return json_data
+        addons = []
+        for group_index in compact_item.get("g") or []:
+            if isinstance(group_index, int) and 0 <= group_index < len(addongroups):
+                addons.append({
+                    "addon_group_id": addongroups[group_index]["addongroupid"],
+                    "addon_item_selection": "M",
+                    "addon_item_selection_min": "0",
+                    "addon_item_selection_max": "2",
+                })
+        item["addon"] = addons
+        items.append(item)
+    
+    expanded = {
+        "areas": [{"areaid": None, "displayname": "Main Dining", "active": "1", "rank": "1"}],
+        "categories": categories,
+        "items": items,
+        "addongroups": addongroups,
+        "audit_log": [],
+    }
+    if restaurant:
+        expanded["restaurant"] = restaurant
+    return expanded
 
 
 def text_to_json_with_gemini(
     raw_text: str, 
     source_image_path: Optional[str] = None,
-    model_name: str = "gemini-2.0-flash-exp"
+    model_name: str = "gemini-2.0-flash-exp",
+    rate_limiter=None
 ) -> Tuple[bool, Optional[Dict], Optional[str]]:
     """
     Convenience function to convert text to JSON using Gemini
@@ -406,12 +776,34 @@ def text_to_json_with_gemini(
         raw_text: The OCR extracted text
         source_image_path: Optional path to source image
         model_name: Gemini model to use
+        rate_limiter: Optional AdaptiveRateLimiter shared by concurrent calls
     
     Returns:
         Tuple of (success, json_data, error_message)
     """
-    converter = GeminiConverter(model_name)
-    return converter.text_to_json_with_gemini(raw_text, source_image_path)
+    converter = get_converter(model_name)
+    return converter.text_to_json_with_gemini(raw_text, source_image_path, rate_limiter)
+
+
+def get_converter(model_name: str = "gemini-2.0-flash-exp") -> GeminiConverter:
+    """
+    Get a shared converter for the model, creating it on first use
+    
+    The converter has no rate limiter of its own; callers pass theirs per
+    call, so one converter per model serves every limiter.
+    
+    Args:
+        model_name: Gemini model to use
+    
+    Returns:
+        GeminiConverter: Converter reused across calls and threads
+    """
+    with _converters_lock:
+        converter = _converters.get(model_name)
+        if converter is None or converter.model is None:
+            converter = GeminiConverter(model_name)
+            _converters[model_name] = converter
+        return converter
 
 
 # Example usage and testing
@@ -1,4 +1,5 @@
 import argparse
+import itertools
 import logging
 import os
 import shutil
@@ -6,15 +7,57 @@ import subprocess
 import sys
 import tempfile
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (FIRST_COMPLETED, ThreadPoolExecutor, as_completed,
+                                wait)
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
-from constants import (DEFAULT_CHECK_COMMAND, TESSERACT_DATA_PATH_VAR,
-                       VALID_IMAGE_EXTENSIONS, WINDOWS_CHECK_COMMAND)
+from constants import (DEDUP_MODES, DEDUP_SIMILAR,
+                       DEFAULT_CHECK_COMMAND, DEFAULT_DEDUP_MAX_DISTANCE,
+                       DEFAULT_EXPORT_WORKERS, DEFAULT_OCR_BATCH_SIZE,
+                       DEFAULT_GEMINI_RPM, DEFAULT_GEMINI_TPM,
+                       DEFAULT_LLM_CACHE_MAX_MB, DEFAULT_LLM_CACHE_TTL_DAYS,
+                       DEFAULT_LLM_CONCURRENCY, DEFAULT_OCR_CACHE_MAX_MB,
+                       DEFAULT_OCR_LANGUAGE, DEFAULT_OCR_OEM, DEFAULT_OCR_PSM,
+                       DEFAULT_PIPELINE_QUEUE_SIZE,
+                       DEFAULT_PREPROCESS_MAX_MEGAPIXELS, DEFAULT_RULES_CONFIDENCE,
+                       DEFAULT_TUNE_SAMPLE_SIZE,
+                       DEFAULT_WATCH_POLL_SECONDS, DEFAULT_WATCH_SETTLE_SECONDS,
+                       LLM_CACHE_FILENAME, OCR_CACHE_FILENAME,
+                       OCR_ENGINE_POOL, OCR_ENGINE_PROCESS,
+                       OCR_ENGINE_SUBPROCESS, OCR_ENGINES, OCR_TIMEOUT_SECONDS,
+                       PARSER_LLM, PARSER_MODES, PARSER_RULES,
+                       RUN_JOURNAL_FILENAME,
+                       TESSERACT_DATA_PATH_VAR, TESSERACT_PAGE_SEPARATOR,
+                       TILE_THRESHOLD_MEGAPIXELS,
+                       VALID_IMAGE_EXTENSIONS,
+                       WINDOWS_CHECK_COMMAND)
+from disk_cache import DiskCache, hash_file, make_cache_key
+from file_scanner import ImageScanner
+from image_formats import check_image_format, needs_conversion
+from folder_watcher import FolderWatcher
+from image_dedup import find_duplicates
+from image_preprocess import (encode_image, get_preprocess_config,
+                              is_preprocessing_available, preprocess_image)
+from ocr_engine import (TesseractEnginePool, get_engine_version,
+                        is_engine_pool_available)
+from ocr_timeouts import AdaptiveOcrTimeouts
+from ocr_workers import (OcrProcessPool, get_thread_limit,
+                         get_tuning_candidates, load_ocr_profile,
+                         ocr_thread_limit, plan_ocr_workers, save_ocr_profile)
+from ocr_results import OcrResultWriter, read_ocr_results
+from ocr_scheduler import (OcrTimingHistory, iter_longest_first,
+                           order_longest_first)
+from page_splitter import get_image_bands, get_page_count, is_rendered_pdf, iter_documents
+from pipeline import MenuConversionPipeline
+from rate_limiter import AdaptiveRateLimiter
+from run_journal import RunJournal
 
 # Import new modules for LLM and Excel export (optional imports with error handling)
 try:
-    from llm_converter import text_to_json_with_gemini
+    from llm_converter import GeminiConverter
+    from menu_parser import HybridMenuConverter, merge_menu_json
     from exporter import export_menu_to_excel
     LLM_AVAILABLE = True
 except ImportError as e:
@@ -51,33 +94,255 @@ def get_command():
     return DEFAULT_CHECK_COMMAND
 
 
-def get_valid_image_files(input_path):
+def get_valid_image_files(input_path, recursive=False, include=None, exclude=None):
     """
-    Efficiently get all valid image files from directory using pathlib
+    Get all valid image files from a directory (see file_scanner.ImageScanner)
     :param input_path: Directory path to scan
-    :return: List of valid image file paths
+    :param recursive: Whether to include the images of subdirectories
+    :param include: Glob patterns files must match (default: every file)
+    :param exclude: Glob patterns of files and directories to skip
+    :return: Tuple of (list of valid image file paths, number of other files,
+             including images rejected by their header)
     """
-    valid_files = []
-    other_files = 0
+    scanner = ImageScanner(input_path, recursive, include, exclude)
+    valid_files = list(scanner)
+    return valid_files, scanner.other_count + scanner.rejected_count
 
-    path = Path(input_path)
 
-    # Use pathlib for more efficient file iteration
-    for file_path in path.iterdir():
-        if file_path.is_file():
-            if file_path.suffix.lower() in VALID_IMAGE_EXTENSIONS:
-                valid_files.append(file_path)
-            else:
-                other_files += 1
+@lru_cache(maxsize=None)
+def get_tesseract_version():
+    """
+    Get the version of the installed tesseract binary
+    :return: Version string, e.g. "tesseract 5.3.0"
+    """
+    try:
+        result = subprocess.run(
+            ["tesseract", "--version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=10
+        )
+        # Older releases print the version to stderr
+        output = (result.stdout or result.stderr).decode(errors="replace").strip()
+        return output.splitlines()[0].strip() if output else "unknown"
+    except Exception as e:
+        logging.debug(f"Could not determine tesseract version: {e}")
+        return "unknown"
+
+
+def build_tesseract_command(image_path, output_base):
+    """
+    Build the tesseract command line with the configured language and modes
+    :param image_path: Path to image file, or "stdin" to read the image from stdin
+    :param output_base: Output base name (tesseract appends .txt), or "stdout"
+    :return: Command as a list of arguments
+    """
+    return [
+        "tesseract", str(image_path), str(output_base),
+        "-l", DEFAULT_OCR_LANGUAGE,
+        "--psm", str(DEFAULT_OCR_PSM),
+        "--oem", str(DEFAULT_OCR_OEM),
+    ]
+
+
+def get_ocr_config(engine=OCR_ENGINE_SUBPROCESS, preprocess=False):
+    """
+    Describe the OCR settings that determine the text produced for an image
+    :param engine: One of OCR_ENGINES
+    :param preprocess: Whether images are preprocessed before OCR
+    :return: Dictionary of settings, used as part of the OCR cache key
+    """
+    if engine == OCR_ENGINE_PROCESS:
+        # Worker processes use the in-process engine when it is installed
+        engine = OCR_ENGINE_POOL if is_engine_pool_available() else OCR_ENGINE_SUBPROCESS
+    if engine == OCR_ENGINE_POOL and is_engine_pool_available():
+        version = get_engine_version()
+    else:
+        engine = OCR_ENGINE_SUBPROCESS
+        version = get_tesseract_version()
+    config = {
+        "engine": engine,
+        "tesseract_version": version,
+        "lang": DEFAULT_OCR_LANGUAGE,
+        "psm": DEFAULT_OCR_PSM,
+        "oem": DEFAULT_OCR_OEM,
+    }
+    if preprocess:
+        config["preprocess"] = get_preprocess_config()
+    return config
+
+
+def get_output_directory(output_path, image_path, input_root=None):
+    """
+    Output directory of an image, mirroring the image's directory below the input
+    directory, so images sharing a name in different subdirectories keep their outputs
+    :param output_path: Output directory, or None
+    :param image_path: Path to the source image
+    :param input_root: Input directory the image was found in, or None
+    :return: Directory for the image's outputs (output_path for top-level images)
+    """
+    if not output_path or not input_root:
+        return output_path
+    relative = os.path.relpath(image_path.parent, input_root)
+    if relative == os.curdir or relative.startswith(os.pardir):
+        return output_path
+    return os.path.join(output_path, relative)
+
+
+def write_text_output(output_path, image_path, text):
+    """
+    Write OCR text to the output directory the way tesseract names its output
+    :param output_path: Output directory
+    :param image_path: Path to the source image
+    :param text: OCR text
+    """
+    text_file_path = os.path.join(output_path, f"{image_path.stem}.txt")
+    with open(text_file_path, "w", encoding="utf8") as f:
+        f.write(text)
+
+
+def deliver_ocr_text(output_path, image_path, text):
+    """
+    Return OCR text, or write it to the output directory if one is given
+    :param output_path: Optional output directory
+    :param image_path: Path to the source image
+    :param text: OCR text
+    :return: Tuple of (success, text_content, filename), as run_tesseract_optimized returns it
+    """
+    filename = image_path.name
+    if not output_path:
+        return True, text, filename
+    try:
+        write_text_output(output_path, image_path, text)
+        return True, None, filename
+    except Exception as e:
+        logging.warning(f"Failed to write output for {filename}: {e}")
+        return False, None, filename
+
+
+def split_tesseract_pages(text, page_count):
+    """
+    Split the text of a multi-image tesseract run into one text per image
+    
+    Tesseract 5 writes the page separator between pages, older releases after
+    every page; both layouts are accepted.
+    
+    :param text: Combined tesseract output
+    :param page_count: Number of images that were OCR'd
+    :return: List of page texts, or None if the output does not have page_count pages
+    """
+    pages = text.split(TESSERACT_PAGE_SEPARATOR)
+    if len(pages) == page_count + 1 and pages[-1].strip() == "":
+        pages = pages[:-1]
+    if len(pages) != page_count:
+        return None
+    return pages
+
+
+def run_tesseract_batch(image_paths, output_path=None, timeouts=None):
+    """
+    OCR several images with a single tesseract process
+    
+    The image paths are passed on stdin as a file list, so the engine and its
+    traineddata are loaded once per batch instead of once per image. If the
+    batch fails, or its output cannot be split into exactly one page per image
+    (e.g. a multi-page TIFF), every image is OCR'd on its own instead, so one bad
+    file never fails its neighbours.
+    
+    :param image_paths: List of image file paths
+    :param output_path: Optional output directory
+    :param timeouts: Seconds allowed per image (default: OCR_TIMEOUT_SECONDS each); the
+                     batch gets their sum, so one large page does not time out its batch
+    :return: List of (success, text_content, filename), in the order of image_paths
+    """
+    if timeouts is None:
+        timeouts = [OCR_TIMEOUT_SECONDS] * len(image_paths)
+    if len(image_paths) == 1 or any("\n" in str(path) for path in image_paths):
+        return [
+            run_tesseract_optimized(path, output_path, timeout)
+            for path, timeout in zip(image_paths, timeouts)
+        ]
+
+    pages = None
+    try:
+        file_list = "".join(f"{path}\n" for path in image_paths).encode("utf8")
+        result = subprocess.run(
+            build_tesseract_command("stdin", "stdout"),
+            input=file_list,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=sum(timeouts)
+        )
+        if result.returncode == 0:
+            pages = split_tesseract_pages(result.stdout.decode("utf8"), len(image_paths))
+        else:
+            logging.debug(f"Batched tesseract failed: {result.stderr.decode(errors='replace')}")
+    except subprocess.TimeoutExpired:
+        logging.debug(f"Batched tesseract timed out for {len(image_paths)} images")
+    except Exception as e:
+        logging.debug(f"Batched tesseract failed: {e}")
+
+    if pages is None:
+        logging.warning(
+            f"Batched OCR of {len(image_paths)} images did not succeed, OCR'ing them one by one"
+        )
+        return [
+            run_tesseract_optimized(path, output_path, timeout)
+            for path, timeout in zip(image_paths, timeouts)
+        ]
+
+    return [deliver_ocr_text(output_path, path, text) for path, text in zip(image_paths, pages)]
+
+
+def run_tesseract_stdout(image_source, filename, image_bytes=None, timeout=OCR_TIMEOUT_SECONDS):
+    """
+    Run tesseract with the recognized text written to stdout instead of a file
+    :param image_source: Path to image file, or "stdin" when image_bytes is given
+    :param filename: Name used in log messages and the result
+    :param image_bytes: Encoded image piped to tesseract's stdin
+    :param timeout: Seconds after which tesseract is killed
+    :return: Tuple of (success, text_content, filename)
+    """
+    result = subprocess.run(
+        build_tesseract_command(image_source, "stdout"),
+        input=image_bytes,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=timeout  # Add timeout to prevent hanging
+    )
 
-    return valid_files, other_files
+    if result.returncode != 0:
+        logging.warning(
+            f"Tesseract failed for {filename}: {result.stderr.decode(errors='replace')}"
+        )
+        return False, None, filename
+    return True, result.stdout.decode("utf8"), filename
 
 
-def run_tesseract_optimized(image_path, output_path=None):
+def ocr_image_bytes(image_bytes, filename, timeout=OCR_TIMEOUT_SECONDS):
+    """
+    OCR an in-memory image, e.g. one preprocessed in Python, without touching disk
+    :param image_bytes: Encoded image (PNG, TIFF, JPEG, ...)
+    :param filename: Name of the source image, for logging
+    :param timeout: Seconds after which tesseract is killed
+    :return: Tuple of (success, text_content, filename)
+    """
+    try:
+        return run_tesseract_stdout("stdin", filename, image_bytes, timeout)
+    except subprocess.TimeoutExpired:
+        logging.error(f"Tesseract timeout for {filename}")
+        return False, None, filename
+    except Exception as e:
+        logging.error(f"Unexpected error processing {filename}: {e}")
+        return False, None, filename
+
+
+def run_tesseract_optimized(image_path, output_path=None, timeout=OCR_TIMEOUT_SECONDS):
     """
     Optimized tesseract runner with better error handling and performance
     :param image_path: Path to image file
     :param output_path: Optional output directory
+    :param timeout: Seconds after which tesseract is killed
     :return: Tuple of (success, text_content, filename)
     """
     try:
@@ -86,41 +351,16 @@ def run_tesseract_optimized(image_path, output_path=None):
 
         # If no output path is provided, return text directly
         if not output_path:
-            # Use a single temp directory for the entire batch to reduce overhead
-            temp_dir = tempfile.mkdtemp()
-            temp_file = os.path.join(temp_dir, filename_without_extension)
-
-            result = subprocess.run(
-                ["tesseract", str(image_path), temp_file],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=30  # Add timeout to prevent hanging
-            )
-
-            if result.returncode == 0:
-                try:
-                    with open(f"{temp_file}.txt", "r", encoding="utf8") as f:
-                        text = f.read()
-                    shutil.rmtree(temp_dir)
-                    return True, text, filename
-                except Exception as e:
-                    logging.warning(f"Failed to read output for {filename}: {e}")
-                    shutil.rmtree(temp_dir)
-                    return False, None, filename
-            else:
-                logging.warning(
-                    f"Tesseract failed for {filename}: {result.stderr.decode()}"
-                )
-                shutil.rmtree(temp_dir)
-                return False, None, filename
+            # Read the text from stdout, no temporary files involved
+            return run_tesseract_stdout(image_path, filename, timeout=timeout)
         else:
             # Write directly to output directory
             text_file_path = os.path.join(output_path, filename_without_extension)
             result = subprocess.run(
-                ["tesseract", str(image_path), text_file_path],
+                build_tesseract_command(image_path, text_file_path),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                timeout=30
+                timeout=timeout
             )
 
             if result.returncode == 0:
@@ -139,6 +379,250 @@ def run_tesseract_optimized(image_path, output_path=None):
         return False, None, filename
 
 
+def run_tesseract_preprocessed(
+    image_path,
+    output_path=None,
+    timeout=OCR_TIMEOUT_SECONDS,
+    max_megapixels=DEFAULT_PREPROCESS_MAX_MEGAPIXELS
+):
+    """
+    Preprocess an image (see image_preprocess.preprocess_image) and OCR the result
+    :param image_path: Path to image file
+    :param output_path: Optional output directory
+    :param timeout: Seconds after which tesseract is killed
+    :param max_megapixels: Pixel budget the image is downscaled to
+    :return: Tuple of (success, text_content, filename)
+    """
+    filename = image_path.name
+    try:
+        image_bytes = encode_image(preprocess_image(image_path, max_megapixels))
+    except Exception as e:
+        logging.warning(f"Preprocessing failed for {filename}: {e}")
+        return False, None, filename
+
+    success, text, filename = ocr_image_bytes(image_bytes, filename, timeout)
+    if not success:
+        return success, text, filename
+    return deliver_ocr_text(output_path, image_path, text)
+
+
+def with_ocr_cache(ocr_func, cache, ocr_config, refresh_cache=False, is_degraded=None):
+    """
+    Wrap an OCR function so results are served from and stored in a cache
+    :param ocr_func: OCR function with the signature of run_tesseract_optimized
+    :param cache: DiskCache holding OCR text
+    :param ocr_config: Settings returned by get_ocr_config
+    :param refresh_cache: Ignore stored results and overwrite them
+    :param is_degraded: Optional callable telling, right after ocr_func returned on the
+                        same thread, that its text must not be cached (e.g. the
+                        reduced-resolution retry of AdaptiveOcrTimeouts)
+    :return: Callable with the signature of run_tesseract_optimized
+    """
+    def cached_ocr(image_path, output_path=None):
+        filename = image_path.name
+        try:
+            key = make_cache_key(hash_file(image_path), ocr_config)
+        except OSError as e:
+            logging.warning(f"Could not hash {filename}, skipping OCR cache: {e}")
+            return ocr_func(image_path, output_path)
+
+        text = None if refresh_cache else cache.get(key)
+        if text is None:
+            # Always ask for the text so it can be cached, then write it ourselves
+            success, text, filename = ocr_func(image_path, None)
+            if not success or text is None:
+                return success, text, filename
+            if is_degraded and is_degraded():
+                # Served as a full-resolution result it would never be OCR'd properly again
+                logging.debug(f"Not caching the reduced-resolution text of {filename}")
+            else:
+                cache.put(key, text)
+        else:
+            logging.debug(f"OCR cache hit for {filename}")
+
+        return deliver_ocr_text(output_path, image_path, text)
+
+    return cached_ocr
+
+
+def with_ocr_cache_batch(batch_func, cache, ocr_config, refresh_cache=False):
+    """
+    Wrap a batch OCR function so only images missing from the cache are OCR'd
+    :param batch_func: Batch OCR function with the signature of run_tesseract_batch
+    :param cache: DiskCache holding OCR text
+    :param ocr_config: Settings returned by get_ocr_config
+    :param refresh_cache: Ignore stored results and overwrite them
+    :return: Callable with the signature of run_tesseract_batch
+    """
+    def cached_batch(image_paths, output_path=None):
+        results = [None] * len(image_paths)
+        misses = []
+        for index, image_path in enumerate(image_paths):
+            try:
+                key = make_cache_key(hash_file(image_path), ocr_config)
+            except OSError as e:
+                logging.warning(f"Could not hash {image_path.name}, skipping OCR cache: {e}")
+                key = None
+
+            text = None if refresh_cache or key is None else cache.get(key)
+            if text is None:
+                misses.append((index, image_path, key))
+            else:
+                logging.debug(f"OCR cache hit for {image_path.name}")
+                results[index] = deliver_ocr_text(output_path, image_path, text)
+
+        if misses:
+            batch_results = batch_func([image_path for _, image_path, _ in misses], None)
+            for (index, image_path, key), (success, text, filename) in zip(misses, batch_results):
+                if not success or text is None:
+                    results[index] = (success, text, filename)
+                    continue
+                if key:
+                    cache.put(key, text)
+                results[index] = deliver_ocr_text(output_path, image_path, text)
+        return results
+
+    return cached_batch
+
+
+def make_batched_ocr(ocr_func, batch_func, batch_size):
+    """
+    Attach a batch OCR function to a per-image OCR function
+    
+    Callers that can group work (process_images_parallel, the convert pipeline)
+    look for the `run_batch` and `batch_size` attributes; everything else keeps
+    calling the function one image at a time.
+    
+    :param ocr_func: OCR function with the signature of run_tesseract_optimized
+    :param batch_func: Batch OCR function with the signature of run_tesseract_batch
+    :param batch_size: Number of images per batch
+    :return: Callable with the signature of run_tesseract_optimized
+    """
+    def batched_ocr(image_path, output_path=None):
+        return ocr_func(image_path, output_path)
+
+    batched_ocr.run_batch = batch_func
+    batched_ocr.batch_size = batch_size
+    return batched_ocr
+
+
+@contextmanager
+def open_ocr_engine(
+    engine=OCR_ENGINE_SUBPROCESS,
+    cache_dir=None,
+    refresh_cache=False,
+    cache_max_mb=DEFAULT_OCR_CACHE_MAX_MB,
+    workers=None,
+    threads_per_worker=None,
+    batch_size=DEFAULT_OCR_BATCH_SIZE,
+    preprocess=False,
+    timings=None
+):
+    """
+    Provide the OCR function for the selected engine for the duration of a run
+    :param engine: One of OCR_ENGINES
+    :param cache_dir: Directory holding the OCR result cache (None disables caching)
+    :param refresh_cache: Re-run OCR for every image and overwrite cached results
+    :param cache_max_mb: Maximum size of the OCR result cache in megabytes
+    :param workers: Number of worker processes for the process engine (default: auto-detect)
+    :param threads_per_worker: OpenMP threads per tesseract (default: OMP_THREAD_LIMIT or 1)
+    :param batch_size: Images per tesseract invocation (subprocess engine only)
+    :param preprocess: Downscale, deskew and binarize images before OCR
+    :param timings: Optional OcrTimingHistory recording the time of every OCR run
+    :return: Callable with the signature of run_tesseract_optimized, with `run_batch`
+             and `batch_size` attributes when batching is enabled
+
+    Tesseract subprocesses get timeouts sized to the image and the throughput
+    observed so far, and an image that times out is retried once at a lower
+    resolution (see ocr_timeouts.AdaptiveOcrTimeouts).
+    """
+    if engine == OCR_ENGINE_POOL and not is_engine_pool_available():
+        logging.warning(
+            "OCR engine pool requires `tesserocr` (pip install tesserocr), "
+            "falling back to one tesseract subprocess per image"
+        )
+        engine = OCR_ENGINE_SUBPROCESS
+    if preprocess and not is_preprocessing_available():
+        logging.warning("Image preprocessing requires Pillow and numpy, OCR'ing the original images")
+        preprocess = False
+    fallback_ocr_func = run_tesseract_preprocessed if preprocess else run_tesseract_optimized
+
+    engine_pool = None
+    process_pool = None
+    timeouts = None
+    cache = None
+    # Exported for the whole run so every tesseract and worker process inherits it
+    with ocr_thread_limit(threads_per_worker):
+        try:
+            if engine == OCR_ENGINE_POOL:
+                engine_pool = TesseractEnginePool(preprocess=preprocess)
+                logging.debug("Using warm in-process Tesseract engine pool")
+                ocr_func = engine_pool.run
+            elif engine == OCR_ENGINE_PROCESS:
+                process_pool = OcrProcessPool(
+                    fallback_ocr_func,
+                    workers or get_default_workers(threads_per_worker),
+                    threads_per_worker,
+                    preprocess
+                )
+                ocr_func = process_pool.run
+            else:
+                ocr_func = fallback_ocr_func
+
+            # In-process engines cannot be interrupted, timeouts only apply to tesseract subprocesses
+            if engine == OCR_ENGINE_SUBPROCESS or (engine == OCR_ENGINE_PROCESS and not is_engine_pool_available()):
+                timeouts = AdaptiveOcrTimeouts()
+                ocr_func = timeouts.wrap(
+                    ocr_func,
+                    run_tesseract_preprocessed if is_preprocessing_available() else None,
+                    DEFAULT_PREPROCESS_MAX_MEGAPIXELS if preprocess else None
+                )
+
+            # Beneath the cache, so only OCR that really ran is timed
+            if timings:
+                ocr_func = timings.wrap(ocr_func)
+
+            batch_func = None
+            if batch_size and batch_size > 1:
+                if preprocess:
+                    logging.warning("Batching reads images from disk, it is disabled with --preprocess")
+                elif engine == OCR_ENGINE_SUBPROCESS:
+                    batch_func = timeouts.wrap_batch(run_tesseract_batch)
+                    if timings:
+                        batch_func = timings.wrap(batch_func)
+                else:
+                    logging.warning(
+                        f"Batching only applies to the subprocess engine, the {engine} "
+                        "engine keeps its engines warm already"
+                    )
+
+            if cache_dir:
+                cache = DiskCache(os.path.join(cache_dir, OCR_CACHE_FILENAME), cache_max_mb * 1024 * 1024)
+                ocr_config = get_ocr_config(engine, preprocess)
+                ocr_func = with_ocr_cache(
+                    ocr_func, cache, ocr_config, refresh_cache, timeouts.last_result_retried if timeouts else None
+                )
+                if batch_func:
+                    batch_func = with_ocr_cache_batch(batch_func, cache, ocr_config, refresh_cache)
+
+            if batch_func:
+                ocr_func = make_batched_ocr(ocr_func, batch_func, batch_size)
+
+            yield ocr_func
+        finally:
+            if timeouts:
+                logging.info(f"OCR timeouts: {timeouts.summary()}")
+                for line in timeouts.file_report():
+                    logging.warning(f"  {line}")
+            if cache:
+                logging.info(f"OCR cache: {cache.summary()}")
+                cache.close()
+            if engine_pool:
+                engine_pool.close()
+            if process_pool:
+                process_pool.close()
+
+
 def run_tesseract(filename, output_path, image_file_name):
     """
     Legacy function for backward compatibility
@@ -201,65 +685,299 @@ def check_pre_requisites_tesseract():
         return True
 
 
-def process_images_parallel(image_files, output_path, max_workers=None):
+def get_default_workers(threads_per_worker=None):
+    """
+    Default number of parallel OCR workers
+    :param threads_per_worker: OpenMP threads per tesseract (default: OMP_THREAD_LIMIT or 1)
+    :return: Available cores divided by the threads per worker, bounded by available memory
+    """
+    return plan_ocr_workers(threads_per_worker)
+
+
+def resolve_ocr_workers(engine, max_workers=None, threads_per_worker=None, use_profile=True):
+    """
+    Decide how many OCR workers and threads to run and log the resulting plan
+    
+    Settings saved by the `tune` command are used when neither value is given.
+    
+    :param engine: One of OCR_ENGINES
+    :param max_workers: Requested number of workers (None = auto-detect)
+    :param threads_per_worker: OpenMP threads per tesseract (default: OMP_THREAD_LIMIT or 1)
+    :param use_profile: Whether to use the tuned profile of this host
+    :return: Tuple of (workers, threads_per_worker)
+    """
+    source = "auto-detected"
+    profile = None
+    if use_profile and max_workers is None and threads_per_worker is None:
+        profile = load_ocr_profile(engine)
+    if profile:
+        max_workers = profile["workers"]
+        threads_per_worker = profile["threads_per_worker"]
+        source = "tuned profile"
+    elif max_workers:
+        source = "requested"
+
+    workers = max_workers or get_default_workers(threads_per_worker)
+    threads_per_worker = get_thread_limit(threads_per_worker)
+    logging.info(f"OCR plan: {workers} {engine} worker(s) x {threads_per_worker} thread(s) ({source})")
+    return workers, threads_per_worker
+
+
+def ocr_document_page(ocr_func, document, page_number, output_path):
+    """
+    OCR one page of a multi-page document or one tile of a tiled image, delivering
+    the document's text with its last part
+    :param ocr_func: OCR function to run on the page image
+    :param document: page_splitter.MultiPageDocument or TiledImage
+    :param page_number: Page to OCR, starting at 1
+    :param output_path: Optional output directory
+    :return: List with the document's (success, text_content, filename) once all
+             pages are done, otherwise an empty list
+    """
+    finished = document.ocr_page(ocr_func, page_number)
+    if finished is None:
+        return []
+    success, text = finished
+    if not success:
+        return [(False, None, document.path.name)]
+    return [deliver_ocr_text(output_path, document.path, text)]
+
+
+def process_images_parallel(
+    image_files,
+    output_path,
+    max_workers=None,
+    ocr_func=None,
+    tile=False,
+    results_writer=None,
+    convert_formats=False,
+    input_root=None
+):
     """
     Process images in parallel using ThreadPoolExecutor
-    :param image_files: List of image file paths
+
+    The pages of multi-page PDF and TIFF files are OCR'd as separate tasks and
+    reassembled in page order, separated by form feeds. With `tile`, oversized
+    images are likewise split into overlapping tiles whose texts are merged.
+    Tasks are submitted in the order of `image_files` (see order_longest_first).
+    :param image_files: List or iterable of image file paths, consumed lazily
     :param output_path: Output directory path
     :param max_workers: Maximum number of worker threads
-    :return: Tuple of (successful_files, failed_files, results)
+    :param ocr_func: OCR function to run per image (default: run_tesseract_optimized)
+    :param tile: Whether to OCR oversized images in tiles
+    :param results_writer: Optional OcrResultWriter that receives the texts as they
+                           complete when there is no output directory, instead of
+                           the returned list
+    :param convert_formats: Whether to convert images tesseract cannot read to PNG
+    :param input_root: Input directory whose subdirectories are mirrored in the output
+                       directory (see get_output_directory)
+    :return: Tuple of (successful_files, failed_files, results), results being
+             (filename, text) tuples if texts are neither written to the output
+             directory nor to results_writer
     """
+    if ocr_func is None:
+        ocr_func = run_tesseract_optimized
+
     if max_workers is None:
-        # Use number of CPU cores, but cap at 8 to avoid overwhelming tesseract
-        max_workers = min(8, os.cpu_count() or 4)
+        max_workers = get_default_workers()
 
     successful_files = 0
     failed_files = 0
     results = []
 
-    logging.info(f"Processing {len(image_files)} images using {max_workers} parallel workers...")
+    # Batching OCR functions take several images per call (see make_batched_ocr)
+    batch_size = getattr(ocr_func, "batch_size", 1)
+    batch_info = f" in batches of {batch_size}" if batch_size > 1 else ""
+    # Lists report progress against their length, scans as they go
+    total = len(image_files) if hasattr(image_files, "__len__") else None
+    logging.info(
+        f"Processing {f'{total} images' if total is not None else 'images as they are found'} "
+        f"using {max_workers} parallel workers{batch_info}..."
+    )
 
     start_time = time.time()
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_image = {
-            executor.submit(run_tesseract_optimized, image_path, output_path): image_path
-            for image_path in image_files
-        }
-
-        # Process completed tasks
-        for i, future in enumerate(as_completed(future_to_image), 1):
-            image_path = future_to_image[future]
-
+    done = 0
+    documents = []
+
+    with tempfile.TemporaryDirectory(prefix="menu-ocr-pages-") as work_dir, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def ocr_chunk(chunk, chunk_output_path):
+            task_start = time.perf_counter()
+            if batch_size > 1:
+                outcomes = ocr_func.run_batch(chunk, chunk_output_path)
+            else:
+                outcomes = [ocr_func(chunk[0], chunk_output_path)]
+            # A batch's time is shared evenly by its images
+            return outcomes, (time.perf_counter() - task_start) / len(chunk)
+
+        def handle_result(future, images):
+            nonlocal successful_files, failed_files, done
+            document = None if isinstance(images, list) else images
+            if document:
+                images = [document.path]
             try:
-                success, text, filename = future.result()
+                if document:
+                    outcomes, seconds = future.result(), document.seconds
+                else:
+                    outcomes, seconds = future.result()
+            except Exception as e:
+                logging.error(f"Error processing {', '.join(image.name for image in images)}: {e}")
+                # A failed page leaves its document to the last page task
+                outcomes = [] if document else [(False, None, image.name) for image in images]
+
+            for image_path, (success, text, filename) in zip(images, outcomes):
                 if success:
                     successful_files += 1
-                    if text:  # Only store text if we're not writing to files
+                    # Only texts that were not written to files are handed back
+                    if text and results_writer:
+                        results_writer.write(image_path, text, seconds)
+                    elif text:
                         results.append((filename, text))
                 else:
                     failed_files += 1
 
-            except Exception as e:
-                logging.error(f"Error processing {image_path.name}: {e}")
-                failed_files += 1
-
             # Progress indicator
-            if i % 10 == 0 or i == len(image_files):
+            if not outcomes:
+                return
+            previous, done = done, done + len(outcomes)
+            if done // 10 > previous // 10 or done == total:
                 elapsed = time.time() - start_time
-                rate = i / elapsed if elapsed > 0 else 0
-                logging.info(
-                    f"Progress: {i}/{len(image_files)} "
-                    f"({i/len(image_files)*100:.1f}%) - {rate:.1f} files/sec"
-                )
+                rate = done / elapsed if elapsed > 0 else 0
+                progress = f"{done}/{total} ({done/total*100:.1f}%)" if total else f"{done}"
+                logging.info(f"Progress: {progress} - {rate:.1f} files/sec")
+
+        # future -> image paths, or the document of a page task
+        future_to_images = {}
+        # Tasks are submitted in order, the executor starts them first come first served.
+        # Only a few are queued ahead of the workers, so a scan feeds the workers while
+        # it runs and results are handled as they complete.
+        max_pending = max_workers * 4
+
+        def submit(images, *task):
+            while len(future_to_images) >= max_pending:
+                finished, _ = wait(future_to_images, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    handle_result(future, future_to_images.pop(future))
+            future_to_images[executor.submit(*task)] = images
+
+        created_directories = set()
+
+        def get_image_output_path(image_path):
+            directory = get_output_directory(output_path, image_path, input_root)
+            if directory and directory not in created_directories:
+                os.makedirs(directory, exist_ok=True)
+                created_directories.add(directory)
+            return directory
+
+        chunk = []
+        chunk_output_path = None
+        for image_path, document in iter_documents(image_files, work_dir, tile, convert_formats):
+            image_output_path = get_image_output_path(image_path)
+            if document and not document.page_count:
+                # Reported by open_document, there is no page to OCR
+                failed_files += 1
+                continue
+            if document:
+                # Page tasks report their document only once its last page is done
+                documents.append(document)
+                for page_number in range(1, document.page_count + 1):
+                    submit(document, ocr_document_page, ocr_func, document, page_number, image_output_path)
+                continue
+            # A batch writes all its texts to one directory
+            if chunk and image_output_path != chunk_output_path:
+                submit(chunk, ocr_chunk, chunk, chunk_output_path)
+                chunk = []
+            chunk.append(image_path)
+            chunk_output_path = image_output_path
+            if len(chunk) >= batch_size:
+                submit(chunk, ocr_chunk, chunk, chunk_output_path)
+                chunk = []
+        if chunk:
+            submit(chunk, ocr_chunk, chunk, chunk_output_path)
+        if documents:
+            logging.info(
+                f"Split {len(documents)} multi-page or oversized file(s) into "
+                f"{sum(document.page_count for document in documents)} page and tile tasks"
+            )
+
+        # Process the remaining tasks
+        for future in as_completed(list(future_to_images)):
+            handle_result(future, future_to_images.pop(future))
 
     total_time = time.time() - start_time
-    logging.info(f"Parallel processing completed in {total_time:.2f} seconds")
+    rate = done / total_time if total_time > 0 else 0
+    logging.info(f"Parallel processing completed in {total_time:.2f} seconds ({rate:.2f} images/sec)")
 
     return successful_files, failed_files, results
 
 
+def deduplicate_images(image_files, dedup, max_distance=DEFAULT_DEDUP_MAX_DISTANCE, max_workers=None):
+    """
+    Keep one image of every group of identical or near-identical images
+    :param image_files: List of image file paths
+    :param dedup: One of DEDUP_MODES, or None to keep every image
+    :param max_distance: Largest difference hash distance between near-duplicates
+    :param max_workers: Number of threads hashing the images
+    :return: Tuple of (images to process, representative -> its duplicates)
+    """
+    if not dedup:
+        return image_files, {}
+
+    start_time = time.time()
+    representatives, duplicates = find_duplicates(
+        image_files, dedup == DEDUP_SIMILAR, max_distance, max_workers
+    )
+    if duplicates:
+        logging.info(
+            f"🔁 {len(image_files) - len(representatives)} duplicate image(s) of "
+            f"{len(duplicates)} other(s) will reuse their results "
+            f"(hashed in {time.time() - start_time:.2f}s)"
+        )
+    return representatives, duplicates
+
+
+def link_duplicate_texts(duplicates, output_path, results_writer=None, input_root=None):
+    """
+    Give duplicate images the OCR text of the image that represents them
+    :param duplicates: Representative -> its duplicate image paths
+    :param output_path: Output directory the texts were written to, or None
+    :param results_writer: OcrResultWriter the texts were written to when there is
+                           no output directory; the duplicates' texts are added to it
+    :param input_root: Input directory mirrored in the output directory (see
+                       get_output_directory)
+    :return: Number of duplicates that received a text
+    """
+    linked = 0
+    if not output_path:
+        # Only the texts of images with duplicates are loaded
+        wanted = {str(representative): copies for representative, copies in duplicates.items()}
+        texts = {
+            record["path"]: record["text"]
+            for record in read_ocr_results(results_writer.results_path)
+            if record["path"] in wanted
+        }
+        for path, text in texts.items():
+            for copy in wanted[path]:
+                results_writer.write(copy, text)
+                linked += 1
+        return linked
+
+    for representative, copies in duplicates.items():
+        source = os.path.join(
+            get_output_directory(output_path, representative, input_root), f"{representative.stem}.txt"
+        )
+        if not os.path.exists(source):
+            continue
+        for copy in copies:
+            target_directory = get_output_directory(output_path, copy, input_root)
+            target = os.path.join(target_directory, f"{copy.stem}.txt")
+            if target != source:
+                os.makedirs(target_directory, exist_ok=True)
+                shutil.copyfile(source, target)
+            linked += 1
+    return linked
+
+
 def validate_and_setup(input_path, output_path):
     """
     Validate prerequisites and setup output directory
@@ -284,65 +1002,159 @@ def validate_and_setup(input_path, output_path):
     return True
 
 
-def process_directory(input_path, output_path, max_workers):
+def process_directory(
+    input_path,
+    output_path,
+    max_workers,
+    ocr_func=None,
+    tile=False,
+    dedup=None,
+    dedup_distance=DEFAULT_DEDUP_MAX_DISTANCE,
+    timings=None,
+    results_writer=None,
+    recursive=False,
+    include=None,
+    exclude=None,
+    convert_formats=False
+):
     """
     Process all images in a directory
+
+    The directory is scanned while the first images are already being OCR'd,
+    unless deduplication needs the complete list first.
     :param input_path: Directory containing images
     :param output_path: Output directory for text files
     :param max_workers: Number of parallel workers
+    :param ocr_func: OCR function to run per image
+    :param tile: Whether to OCR oversized images in tiles
+    :param dedup: One of DEDUP_MODES to OCR duplicate images once, or None
+    :param dedup_distance: Largest difference hash distance between near-duplicates
+    :param timings: Optional OcrTimingHistory of earlier runs to order the images by
+    :param results_writer: Optional OcrResultWriter for the texts, used instead of
+                           printing them when there is no output directory
+    :param recursive: Whether to include the images of subdirectories
+    :param include: Glob patterns files must match (default: every file)
+    :param exclude: Glob patterns of files and directories to skip
+    :param convert_formats: Whether to convert images tesseract cannot read to PNG
     """
     logging.debug("The Input Path is a directory.")
 
-    # Get valid image files efficiently
-    image_files, other_files = get_valid_image_files(input_path)
-
-    if len(image_files) == 0:
+    scanner = ImageScanner(input_path, recursive, include, exclude, convert_formats)
+    image_files = iter(scanner)
+    first_image = next(image_files, None)
+    if first_image is None:
         logging.error("No valid image files found at your input location")
         logging.error(
             "Supported formats: [{}]".format(", ".join(VALID_IMAGE_EXTENSIONS))
         )
         return
+    image_files = itertools.chain([first_image], image_files)
+
+    duplicates = {}
+    if dedup:
+        # Groups of duplicates are only known once every file has been listed
+        image_files, duplicates = deduplicate_images(list(image_files), dedup, dedup_distance, max_workers)
+        image_files = order_longest_first(image_files, timings)
+    else:
+        image_files = iter_longest_first(image_files, timings, first_window=2 * max_workers)
+
+    spill_dir = None
+    if not output_path and not results_writer:
+        # Texts to print are spilled to disk rather than held in memory until the end
+        spill_dir = tempfile.mkdtemp(prefix="menu-ocr-results-")
+        results_writer = OcrResultWriter(os.path.join(spill_dir, "results.jsonl"))
+
+    try:
+        # Process images in parallel
+        successful_files, failed_files, _ = process_images_parallel(
+            image_files, output_path, max_workers, ocr_func, tile, results_writer, convert_formats,
+            input_root=input_path
+        )
+        if duplicates:
+            linked = link_duplicate_texts(duplicates, output_path, results_writer, input_root=input_path)
+            successful_files += linked
+            saved = sum(len(copies) for copies in duplicates.values())
+            logging.info(f"🔁 Saved {saved} OCR run(s) on duplicates, {linked} got the text of their original")
+
+        # Print results if not writing to files
+        if spill_dir:
+            for record in read_ocr_results(results_writer.results_path):
+                print(f"\n=== {os.path.relpath(record['path'], input_path)} ===")
+                print(record["text"])
+    finally:
+        if spill_dir:
+            results_writer.close()
+            shutil.rmtree(spill_dir, ignore_errors=True)
 
-    total_file_count = len(image_files) + other_files
     logging.info(
         "Found total {} file(s) ({} valid images, {} other files)\n".format(
-            total_file_count, len(image_files), other_files
+            scanner.image_count + scanner.other_count + scanner.rejected_count,
+            scanner.image_count,
+            scanner.other_count + scanner.rejected_count
         )
     )
 
-    # Process images in parallel
-    successful_files, failed_files, results = process_images_parallel(image_files, output_path, max_workers)
-
-    # Print results if not writing to files
-    if not output_path:
-        for filename, text in results:
-            print(f"\n=== {filename} ===")
-            print(text)
-
     # Log final results
-    log_processing_results(successful_files, failed_files, other_files)
+    log_processing_results(successful_files, failed_files, scanner.other_count, scanner.rejected_count)
 
 
-def process_single_file(input_path, output_path):
+def process_single_file(
+    input_path,
+    output_path,
+    ocr_func=None,
+    max_workers=None,
+    tile=False,
+    results_writer=None,
+    convert_formats=False
+):
     """
     Process a single image file
     :param input_path: Path to the image file
     :param output_path: Output directory for text file
+    :param ocr_func: OCR function to run on the image
+    :param max_workers: Number of parallel workers for the pages or tiles of the file
+    :param tile: Whether to OCR the image in tiles if it is oversized
+    :param results_writer: Optional OcrResultWriter for the text, used instead of
+                           printing it when there is no output directory
+    :param convert_formats: Whether to convert an image tesseract cannot read to PNG
     """
     filename = os.path.basename(input_path)
     logging.debug("The Input Path is a file {}".format(filename))
     image_path = Path(input_path)
-    success, text, _ = run_tesseract_optimized(image_path, output_path)
-    if success and text:
+    reason = check_image_format(image_path, convert_formats)
+    if reason:
+        logging.error(f"Cannot OCR {filename}: {reason}")
+        return
+    ocr_func = ocr_func or run_tesseract_optimized
+    if (
+        is_rendered_pdf(image_path)
+        or get_page_count(image_path) > 1
+        or (tile and get_image_bands(image_path))
+        or (convert_formats and needs_conversion(image_path))
+    ):
+        # OCR the pages or tiles in parallel instead of one after another
+        _, _, results = process_images_parallel(
+            [image_path], output_path, max_workers, ocr_func, tile, results_writer, convert_formats
+        )
+        for _, text in results:
+            print(text)
+        return
+    start_time = time.perf_counter()
+    success, text, _ = ocr_func(image_path, output_path)
+    if success and text and results_writer:
+        results_writer.write(image_path, text, time.perf_counter() - start_time)
+    elif success and text:
         print(text)
 
 
-def log_processing_results(successful_files, failed_files, other_files):
+def log_processing_results(successful_files, failed_files, other_files, rejected_files=0):
     """
     Log the results of image processing
     :param successful_files: Number of successfully processed files
     :param failed_files: Number of failed files
     :param other_files: Number of non-image files
+    :param rejected_files: Number of files whose header shows they are not images or
+                           are in a format tesseract cannot read
     """
     logging.info("Parsing Completed!\n")
     logging.info("Successfully parsed images: {}".format(successful_files))
@@ -350,6 +1162,8 @@ def log_processing_results(successful_files, failed_files, other_files):
         logging.warning("Failed to parse images: {}".format(failed_files))
     if other_files > 0:
         logging.info("Files with unsupported file extensions: {}".format(other_files))
+    if rejected_files > 0:
+        logging.warning("Files rejected by their header: {}".format(rejected_files))
 
 
 def convert_menu_to_structured_data(
@@ -359,17 +1173,82 @@ def convert_menu_to_structured_data(
     gemini_model="gemini-2.0-flash-exp",
     export_json=True,
     export_excel=True,
-    single_sheet=True
+    single_sheet=True,
+    engine=OCR_ENGINE_SUBPROCESS,
+    use_cache=True,
+    refresh_cache=False,
+    cache_max_mb=DEFAULT_OCR_CACHE_MAX_MB,
+    llm_concurrency=DEFAULT_LLM_CONCURRENCY,
+    export_workers=DEFAULT_EXPORT_WORKERS,
+    queue_size=DEFAULT_PIPELINE_QUEUE_SIZE,
+    requests_per_minute=DEFAULT_GEMINI_RPM,
+    tokens_per_minute=DEFAULT_GEMINI_TPM,
+    use_llm_cache=True,
+    refresh_llm_cache=False,
+    llm_cache_max_mb=DEFAULT_LLM_CACHE_MAX_MB,
+    llm_cache_ttl_days=DEFAULT_LLM_CACHE_TTL_DAYS,
+    compact_llm_output=False,
+    parser_mode=PARSER_LLM,
+    rules_confidence=DEFAULT_RULES_CONFIDENCE,
+    ocr_threads=None,
+    use_profile=True,
+    ocr_batch_size=DEFAULT_OCR_BATCH_SIZE,
+    preprocess=False,
+    tile=False,
+    resume=False,
+    image_files=None,
+    dedup=None,
+    dedup_distance=DEFAULT_DEDUP_MAX_DISTANCE,
+    timings_path=None,
+    recursive=False,
+    include=None,
+    exclude=None,
+    convert_formats=False
 ):
     """
     Convert menu images to structured JSON and Excel using OCR + Gemini LLM
     
+    OCR, LLM conversion and export run as overlapping pipeline stages, so the
+    first Gemini request starts as soon as the first image has been OCR'd.
+    
     :param input_path: Path to input file or directory
     :param output_path: Path to output directory
     :param max_workers: Number of parallel workers for OCR
     :param gemini_model: Gemini model to use
     :param export_json: Whether to export JSON files
     :param export_excel: Whether to export Excel files
+    :param engine: OCR engine to use (one of OCR_ENGINES)
+    :param use_cache: Whether to cache OCR results in the output directory
+    :param refresh_cache: Re-run OCR and overwrite cached results
+    :param cache_max_mb: Maximum OCR cache size in megabytes
+    :param llm_concurrency: Number of concurrent Gemini requests
+    :param export_workers: Number of parallel export workers
+    :param queue_size: Capacity of the queues between pipeline stages
+    :param requests_per_minute: Gemini request limit shared by all LLM workers (0 = unlimited)
+    :param tokens_per_minute: Gemini token limit shared by all LLM workers (0 = unlimited)
+    :param use_llm_cache: Whether to cache Gemini responses in the output directory
+    :param refresh_llm_cache: Call Gemini for every file and overwrite cached responses
+    :param llm_cache_max_mb: Maximum Gemini response cache size in megabytes
+    :param llm_cache_ttl_days: Maximum age of a cached Gemini response in days (0 = no expiry)
+    :param compact_llm_output: Ask Gemini for only non-default fields and expand them locally
+    :param parser_mode: One of PARSER_MODES: Gemini only, rule-based parser only, or
+                        rule-based parser with Gemini for low-confidence sections
+    :param rules_confidence: Minimum section confidence to skip Gemini in auto mode
+    :param ocr_threads: OpenMP threads per tesseract (default: OMP_THREAD_LIMIT or 1)
+    :param use_profile: Use the OCR settings saved by the `tune` command for this host
+    :param ocr_batch_size: Images per tesseract invocation (subprocess engine only)
+    :param preprocess: Downscale, deskew and binarize images before OCR
+    :param tile: OCR images above TILE_THRESHOLD_MEGAPIXELS in parallel tiles
+    :param resume: Skip the files an interrupted run already exported (see run_journal)
+    :param image_files: Iterable of image paths to convert instead of the files at
+                        input_path, consumed lazily (used by watch mode)
+    :param dedup: One of DEDUP_MODES to convert duplicate images once, or None
+    :param dedup_distance: Largest difference hash distance between near-duplicates
+    :param timings_path: JSON file of OCR times that orders this run and is updated by it
+    :param recursive: Whether to include the images of subdirectories
+    :param include: Glob patterns files must match (default: every file)
+    :param exclude: Glob patterns of files and directories to skip
+    :param convert_formats: Convert images tesseract cannot read to PNG instead of skipping them
     """
     if not LLM_AVAILABLE:
         logging.error("LLM conversion features not available. Please install required dependencies:")
@@ -382,154 +1261,700 @@ def convert_menu_to_structured_data(
     
     logging.info("🚀 Starting menu conversion with OCR + Gemini LLM...")
     
-    # Process images and get OCR results
-    if os.path.isdir(input_path):
-        ocr_results = process_directory_for_conversion(input_path, max_workers)
+    duplicates = {}
+    order_stream = False
+    timings = OcrTimingHistory(timings_path) if timings_path else None
+    if image_files is None and os.path.isdir(input_path):
+        # The pipeline starts on the first images while the directory is still scanned
+        image_files = iter(ImageScanner(input_path, recursive, include, exclude, convert_formats))
+        first_image = next(image_files, None)
+        if first_image is None:
+            logging.error("No valid image files found at your input location")
+            return False
+        image_files = itertools.chain([first_image], image_files)
+        if dedup:
+            image_files = list(image_files)
+            logging.info(f"Found {len(image_files)} valid image files")
+            image_files, duplicates = deduplicate_images(image_files, dedup, dedup_distance, max_workers)
+            image_files = order_longest_first(image_files, timings)
+        else:
+            # Ordered in windows once the worker count is known
+            order_stream = True
+    elif image_files is None:
+        reason = check_image_format(Path(input_path), convert_formats)
+        if reason:
+            logging.error(f"Cannot OCR {os.path.basename(input_path)}: {reason}")
+            return False
+        image_files = [Path(input_path)]
+    
+    rate_limiter = None
+    llm_cache = None
+    converter = None
+    if parser_mode != PARSER_RULES:
+        if requests_per_minute:
+            rate_limiter = AdaptiveRateLimiter(requests_per_minute, tokens_per_minute or None)
+        
+        if use_llm_cache:
+            llm_cache = DiskCache(
+                os.path.join(output_path, LLM_CACHE_FILENAME),
+                llm_cache_max_mb * 1024 * 1024,
+                ttl_seconds=llm_cache_ttl_days * 86400 if llm_cache_ttl_days else None
+            )
+        
+        # One converter (and Gemini client) shared by every LLM worker for the whole run
+        converter = GeminiConverter(
+            gemini_model,
+            rate_limiter=rate_limiter,
+            cache=llm_cache,
+            refresh_cache=refresh_llm_cache,
+            compact=compact_llm_output
+        )
+        if not converter.model:
+            logging.error("❌ Gemini model could not be initialized")
+            if llm_cache:
+                llm_cache.close()
+            return False
+    
+    if parser_mode == PARSER_LLM:
+        def convert_page(ocr_text, image_path):
+            # Convert OCR text to structured JSON using Gemini
+            return converter.text_to_json_with_gemini(ocr_text, str(image_path))
     else:
-        ocr_results = process_single_file_for_conversion(input_path)
+        hybrid_converter = HybridMenuConverter(converter, rules_confidence)
+        
+        def convert_page(ocr_text, image_path):
+            # Parse locally, Gemini only sees low-confidence sections (never in rules mode)
+            return hybrid_converter.convert(ocr_text, str(image_path))
     
-    if not ocr_results:
-        logging.error("No OCR results to process")
-        return False
+    def convert_func(ocr_text, image_path):
+        # Multi-page documents are converted one page at a time
+        return convert_document_pages(convert_page, ocr_text, image_path)
     
-    # Process each OCR result with Gemini
-    total_files = len(ocr_results)
-    successful_conversions = 0
-    failed_conversions = 0
+    # Subdirectories of the input directory are mirrored in the output directory
+    input_root = input_path if os.path.isdir(input_path) else None
     
-    for i, (filename, ocr_text, image_path) in enumerate(ocr_results, 1):
-        logging.info(f"Processing {i}/{total_files}: {filename}")
-        
-        try:
-            # Convert OCR text to structured JSON using Gemini
-            success, json_data, error = text_to_json_with_gemini(
-                ocr_text, 
-                str(image_path),
-                gemini_model
+    def export_func(image_path, json_data):
+        return export_converted_menu(
+            image_path.name,
+            json_data,
+            get_output_directory(output_path, image_path, input_root),
+            export_json,
+            export_excel,
+            single_sheet
+        )
+    
+    if resume and (not use_cache or (parser_mode != PARSER_RULES and not use_llm_cache)):
+        logging.warning(
+            "Resuming without the OCR or Gemini cache, files the interrupted run left "
+            "unfinished are processed from scratch"
+        )
+    # Settings that change the output; resuming with others is reported
+    journal_settings = {
+        "model": gemini_model,
+        "parser": parser_mode,
+        "compact_llm_output": compact_llm_output,
+        "export_json": export_json,
+        "export_excel": export_excel,
+        "single_sheet": single_sheet,
+        "preprocess": preprocess,
+        "tile": tile,
+    }
+    journal = RunJournal(os.path.join(output_path, RUN_JOURNAL_FILENAME), resume, journal_settings)
+    
+    cache_dir = output_path if use_cache else None
+    ocr_workers, ocr_threads = resolve_ocr_workers(engine, max_workers, ocr_threads, use_profile)
+    if order_stream:
+        image_files = iter_longest_first(image_files, timings, first_window=2 * ocr_workers)
+    try:
+        with open_ocr_engine(
+            engine, cache_dir, refresh_cache, cache_max_mb, ocr_workers, ocr_threads, ocr_batch_size,
+            preprocess, timings
+        ) as ocr_func:
+            pipeline = MenuConversionPipeline(
+                ocr_func,
+                convert_func,
+                export_func,
+                ocr_workers=ocr_workers,
+                llm_workers=llm_concurrency,
+                export_workers=export_workers,
+                queue_size=queue_size,
+                tile=tile,
+                convert_formats=convert_formats,
+                journal=journal,
+                duplicates=duplicates
             )
-            
-            if success and json_data:
-                # Generate output filename base
-                base_filename = Path(filename).stem
-                
-                # Export files
-                excel_path = None
-                json_path = None
-                
-                if export_excel or export_json:
-                    try:
-                        excel_path, json_path = export_menu_to_excel(
-                            json_data,
-                            output_path,
-                            f"menu_{base_filename}",
-                            include_json=export_json,
-                            include_metadata=True,
-                            single_sheet=single_sheet
-                        )
-                        
-                        if export_excel and excel_path:
-                            logging.info(f"✅ Excel exported: {excel_path}")
-                        if export_json and json_path:
-                            logging.info(f"✅ JSON exported: {json_path}")
-                        
-                        successful_conversions += 1
-                        
-                    except Exception as export_error:
-                        logging.error(f"❌ Export failed for {filename}: {export_error}")
-                        failed_conversions += 1
-                else:
-                    # Just log the JSON structure
-                    logging.info(f"✅ Successfully converted {filename} to structured data")
-                    successful_conversions += 1
-            else:
-                logging.error(f"❌ Gemini conversion failed for {filename}: {error}")
-                failed_conversions += 1
-                
-        except Exception as e:
-            logging.error(f"❌ Error processing {filename}: {e}")
-            failed_conversions += 1
+            stats = pipeline.run(image_files)
+    finally:
+        journal.close()
+        if timings:
+            timings.save()
+        if llm_cache:
+            logging.info(f"Gemini response cache: {llm_cache.summary()}")
+            llm_cache.close()
+    
+    if not stats["images"]:
+        logging.info("No menu images arrived")
+        return True
+    
+    if stats["skipped"]:
+        logging.info(f"⏭️  Skipped {stats['skipped']} file(s) exported by the interrupted run")
+        if stats["skipped"] == stats["images"]:
+            logging.info("Nothing left to convert")
+            return True
+    
+    if stats["ocr_succeeded"] == 0:
+        logging.error("No OCR results to process")
+        return False
+    
+    successful_conversions = stats["export_succeeded"]
+    failed_conversions = stats["llm_failed"] + stats["export_failed"] + stats["duplicates_failed"]
     
     # Log final results
     logging.info("\n📊 Conversion Summary:")
-    logging.info(f"Total files processed: {total_files}")
+    logging.info(f"Total files processed: {stats['ocr_succeeded']}")
+    if stats["ocr_failed"] > 0:
+        logging.warning(f"Failed OCR: {stats['ocr_failed']}")
     logging.info(f"Successful conversions: {successful_conversions}")
     if failed_conversions > 0:
         logging.warning(f"Failed conversions: {failed_conversions}")
+    if duplicates:
+        saved = sum(len(copies) for copies in duplicates.values())
+        logging.info(
+            f"🔁 Duplicates saved {saved} OCR run(s) and {stats['duplicates_exported']} LLM "
+            f"conversion(s); {stats['duplicates_exported']} of {saved} exported with the data "
+            "of their original"
+        )
+        if stats["duplicates_failed"] > 0:
+            logging.warning(
+                f"Failed duplicates: {stats['duplicates_failed']} (their original failed, "
+                "included in the failed conversions)"
+            )
+    if rate_limiter and rate_limiter.throttled > 0:
+        logging.warning(f"Gemini rate limit responses: {rate_limiter.throttled}")
     
-    return successful_conversions > 0
-
-
-def process_directory_for_conversion(input_path, max_workers):
-    """
-    Process all images in a directory and return OCR results for conversion
-    :param input_path: Directory containing images
-    :param max_workers: Number of parallel workers
-    :return: List of (filename, ocr_text, image_path) tuples
+    # A resumed run may only have duplicates left to export
+    return successful_conversions + stats["duplicates_exported"] > 0
+
+
+def watch_menu_folder(
+    input_path,
+    output_path,
+    poll_interval=DEFAULT_WATCH_POLL_SECONDS,
+    settle_seconds=DEFAULT_WATCH_SETTLE_SECONDS,
+    use_events=True,
+    stop_event=None,
+    **convert_options
+):
     """
-    # Get valid image files efficiently
-    image_files, other_files = get_valid_image_files(input_path)
+    Convert menu images as they are dropped into a folder, until interrupted
     
-    if len(image_files) == 0:
-        logging.error("No valid image files found at your input location")
-        return []
+    Runs a single conversion whose input never ends, so the OCR engines, the
+    Gemini client and the caches stay warm between arrivals. Files already in
+    the folder are converted first; files exported before, by this or an
+    earlier watch, are skipped through the run journal unless they changed.
     
-    logging.info(f"Found {len(image_files)} valid image files")
+    :param input_path: Directory to watch
+    :param output_path: Path to output directory
+    :param poll_interval: Seconds between scans when watchdog is not installed
+    :param settle_seconds: Time a file must stay unchanged before it is converted
+    :param use_events: Use file system events (inotify) if watchdog is installed
+    :param stop_event: Optional threading.Event that ends the watch
+    :param convert_options: Keyword arguments of convert_menu_to_structured_data
+    :return: True unless the conversion could not start or every conversion failed
+    """
+    if not os.path.isdir(input_path):
+        logging.error(f"Watch mode needs a directory, got {input_path}")
+        return False
     
-    # Process images in parallel (no output_path = return text directly)
-    successful_files, failed_files, results = process_images_parallel(image_files, None, max_workers)
+    # A partially filled batch would wait for further arrivals
+    if convert_options.get("ocr_batch_size", DEFAULT_OCR_BATCH_SIZE) > 1:
+        logging.warning("Batching is not used in watch mode, every arrival is OCR'd right away")
+    convert_options["ocr_batch_size"] = 1
+    # Groups of duplicates are only known once all files are there
+    if convert_options.pop("dedup", None):
+        logging.warning("Deduplication is not used in watch mode, the run journal skips unchanged files")
+    # Arrivals are OCR'd in the order they settle
+    if convert_options.pop("timings_path", None):
+        logging.warning("OCR timings are not used in watch mode, files are OCR'd as they arrive")
     
-    if successful_files == 0:
-        logging.error("No images were successfully processed by OCR")
-        return []
+    watcher = FolderWatcher(input_path, settle_seconds, poll_interval, use_events)
+    convert_formats = convert_options.get("convert_formats", False)
     
-    # Convert results to include full image paths
-    ocr_results = []
-    for filename, text in results:
-        # Find the corresponding image path
-        image_path = None
-        for img_path in image_files:
-            if img_path.name == filename:
-                image_path = img_path
-                break
-        
-        if image_path and text.strip():
-            ocr_results.append((filename, text, image_path))
+    def readable_arrivals():
+        # Checked once settled, a file still being written has no complete header yet
+        for image_path in watcher.watch(stop_event):
+            reason = check_image_format(image_path, convert_formats)
+            if reason:
+                logging.warning(f"Skipping {image_path.name}: {reason}")
+                continue
+            yield image_path
     
-    return ocr_results
+    return convert_menu_to_structured_data(
+        input_path,
+        output_path,
+        resume=True,
+        image_files=readable_arrivals(),
+        **convert_options
+    )
 
 
-def process_single_file_for_conversion(input_path):
+def convert_document_pages(convert_func, ocr_text, image_path):
     """
-    Process a single image file and return OCR result for conversion
-    :param input_path: Path to the image file
-    :return: List with single (filename, ocr_text, image_path) tuple
+    Convert OCR text page by page and merge the results into one menu
+    :param convert_func: Callable(ocr_text, image_path) -> (success, json_data, error)
+    :param ocr_text: OCR text, pages separated by form feeds
+    :param image_path: Path of the source image
+    :return: Tuple of (success, json_data, error_message)
     """
-    image_path = Path(input_path)
-    success, text, filename = run_tesseract_optimized(image_path, None)
+    pages = [page for page in ocr_text.split(TESSERACT_PAGE_SEPARATOR) if page.strip()]
+    if len(pages) <= 1:
+        return convert_func(ocr_text, image_path)
+
+    merged = None
+    errors = []
+    for page_number, page_text in enumerate(pages, 1):
+        success, json_data, error = convert_func(page_text, image_path)
+        if not success or not json_data:
+            logging.warning(f"Conversion failed for page {page_number} of {image_path.name}: {error}")
+            errors.append(f"page {page_number}: {error}")
+            continue
+        merged = json_data if merged is None else merge_menu_json(merged, json_data)
+
+    if merged is None:
+        return False, None, "; ".join(errors)
+    return True, merged, None
+
+
+def export_converted_menu(filename, json_data, output_path, export_json, export_excel, single_sheet):
+    """
+    Export the structured data converted from one menu image
+    :param filename: Name of the source image
+    :param json_data: Structured menu JSON
+    :param output_path: Output directory
+    :param export_json: Whether to export a JSON file
+    :param export_excel: Whether to export an Excel file
+    :param single_sheet: Whether to create a single-sheet Excel file
+    :return: True if the export succeeded, False otherwise
+    """
+    if not (export_excel or export_json):
+        # Just log the JSON structure
+        logging.info(f"✅ Successfully converted {filename} to structured data")
+        return True
     
-    if success and text and text.strip():
-        return [(filename, text, image_path)]
-    else:
-        logging.error(f"Failed to extract text from {filename}")
-        return []
+    # Generate output filename base
+    base_filename = Path(filename).stem
+    
+    try:
+        excel_path, json_path = export_menu_to_excel(
+            json_data,
+            output_path,
+            f"menu_{base_filename}",
+            include_json=export_json,
+            include_metadata=True,
+            single_sheet=single_sheet
+        )
+        
+        if export_excel and excel_path:
+            logging.info(f"✅ Excel exported: {excel_path}")
+        if export_json and json_path:
+            logging.info(f"✅ JSON exported: {json_path}")
+        return True
+        
+    except Exception as export_error:
+        logging.error(f"❌ Export failed for {filename}: {export_error}")
+        return False
 
 
-def main(input_path, output_path, max_workers=None):
+def main(
+    input_path,
+    output_path,
+    max_workers=None,
+    engine=OCR_ENGINE_SUBPROCESS,
+    use_cache=True,
+    refresh_cache=False,
+    cache_max_mb=DEFAULT_OCR_CACHE_MAX_MB,
+    ocr_threads=None,
+    use_profile=True,
+    ocr_batch_size=DEFAULT_OCR_BATCH_SIZE,
+    preprocess=False,
+    tile=False,
+    dedup=None,
+    dedup_distance=DEFAULT_DEDUP_MAX_DISTANCE,
+    timings_path=None,
+    jsonl_path=None,
+    recursive=False,
+    include=None,
+    exclude=None,
+    convert_formats=False
+):
     """
     Main function to process images and extract text using OCR
     :param input_path: Path to input file or directory
     :param output_path: Path to output directory
     :param max_workers: Number of parallel workers
+    :param engine: OCR engine to use (one of OCR_ENGINES)
+    :param use_cache: Whether to cache OCR results in the output directory
+    :param refresh_cache: Re-run OCR and overwrite cached results
+    :param cache_max_mb: Maximum OCR cache size in megabytes
+    :param ocr_threads: OpenMP threads per tesseract (default: OMP_THREAD_LIMIT or 1)
+    :param use_profile: Use the OCR settings saved by the `tune` command for this host
+    :param ocr_batch_size: Images per tesseract invocation (subprocess engine only)
+    :param preprocess: Downscale, deskew and binarize images before OCR
+    :param tile: OCR images above TILE_THRESHOLD_MEGAPIXELS in parallel tiles
+    :param dedup: One of DEDUP_MODES to OCR duplicate images once, or None
+    :param dedup_distance: Largest difference hash distance between near-duplicates
+    :param timings_path: JSON file of OCR times that orders this run and is updated by it
+    :param jsonl_path: Write all texts to this JSON Lines file (see ocr_results) instead
+                       of a text file per image; output_path then only holds the cache
+    :param recursive: Whether to include the images of subdirectories
+    :param include: Glob patterns files must match (default: every file)
+    :param exclude: Glob patterns of files and directories to skip
+    :param convert_formats: Convert images tesseract cannot read to PNG instead of skipping them
     """
     # Validate prerequisites and setup
     if not validate_and_setup(input_path, output_path):
         return
 
+    # The cache lives in the output directory, so printing to stdout is never cached
+    cache_dir = output_path if use_cache else None
+    max_workers, ocr_threads = resolve_ocr_workers(engine, max_workers, ocr_threads, use_profile)
+    timings = OcrTimingHistory(timings_path) if timings_path else None
+    results_writer = OcrResultWriter(jsonl_path) if jsonl_path else None
+    text_output_path = None if results_writer else output_path
+
     # Process based on input type
+    try:
+        with open_ocr_engine(
+            engine, cache_dir, refresh_cache, cache_max_mb, max_workers, ocr_threads, ocr_batch_size,
+            preprocess, timings
+        ) as ocr_func:
+            if os.path.isdir(input_path):
+                process_directory(
+                    input_path, text_output_path, max_workers, ocr_func, tile, dedup, dedup_distance,
+                    timings, results_writer, recursive, include, exclude, convert_formats
+                )
+            else:
+                process_single_file(
+                    input_path, text_output_path, ocr_func, max_workers, tile, results_writer, convert_formats
+                )
+    finally:
+        if results_writer:
+            results_writer.close()
+            logging.info(f"Wrote {results_writer.count} OCR result(s) to {jsonl_path}")
+    if timings:
+        timings.save()
+
+
+def tune_ocr(
+    input_path,
+    engine=OCR_ENGINE_SUBPROCESS,
+    sample_size=DEFAULT_TUNE_SAMPLE_SIZE,
+    threads_options=None,
+    workers_options=None,
+    save=True
+):
+    """
+    Measure OCR throughput for worker and thread combinations and save the best
+    :param input_path: Image file or directory to take the sample from
+    :param engine: OCR engine to tune (one of OCR_ENGINES)
+    :param sample_size: Number of distinct images to OCR per combination
+    :param threads_options: Threads per worker to try (default: 1, 2 and 4)
+    :param workers_options: Worker counts to try (default: derived from cores and memory)
+    :param save: Whether to write the best settings to the profile
+    :return: Best settings, or None if no combination succeeded
+    """
+    if not validate_and_setup(input_path, None):
+        return None
+
     if os.path.isdir(input_path):
-        process_directory(input_path, output_path, max_workers)
+        image_files, _ = get_valid_image_files(input_path)
     else:
-        process_single_file(input_path, output_path)
+        image_files = [Path(input_path)]
+    if not image_files:
+        logging.error("No valid image files found at your input location")
+        return None
+
+    sample = image_files[:max(1, sample_size)]
+    candidates = get_tuning_candidates(threads_options, workers_options)
+    logging.info(
+        f"Tuning the {engine} engine on {len(sample)} image(s), {len(candidates)} combination(s)"
+    )
+
+    results = []
+    for workers, threads in candidates:
+        # Give every worker at least two images so the pool runs at full width
+        jobs = sample * max(1, -(-2 * workers // len(sample)))
+        with open_ocr_engine(engine, workers=workers, threads_per_worker=threads) as ocr_func:
+            # Untimed warm-up: engine start-up is paid once per run, not per image
+            ocr_func(sample[0], None)
+            start_time = time.time()
+            successful_files, failed_files, _ = process_images_parallel(jobs, None, workers, ocr_func)
+            elapsed = time.time() - start_time
+
+        if successful_files == 0:
+            logging.warning(f"{workers} worker(s) x {threads} thread(s): every image failed")
+            continue
+        rate = successful_files / elapsed if elapsed > 0 else 0
+        results.append({
+            "workers": workers,
+            "threads_per_worker": threads,
+            "images_per_sec": round(rate, 3),
+            "failed": failed_files,
+        })
+
+    if not results:
+        logging.error("OCR failed for every combination, nothing to save")
+        return None
+
+    print(f"\n{'Workers':>8} {'Threads':>8} {'Images/sec':>11} {'Failed':>7}")
+    for result in results:
+        print(
+            f"{result['workers']:>8} {result['threads_per_worker']:>8} "
+            f"{result['images_per_sec']:>11.2f} {result['failed']:>7}"
+        )
+
+    # Highest throughput without failures; fewer cores in use breaks ties
+    best = max(
+        results,
+        key=lambda r: (r["failed"] == 0, r["images_per_sec"], -r["workers"] * r["threads_per_worker"])
+    )
+    best = dict(best, sample_images=len(sample))
+    del best["failed"]
+    print(
+        f"\n✅ Best: {best['workers']} worker(s) x {best['threads_per_worker']} thread(s), "
+        f"{best['images_per_sec']:.2f} images/sec"
+    )
+
+    if save:
+        profile_path = save_ocr_profile(engine, best)
+        print(f"Saved to {profile_path}; `ocr` and `convert` now use it for the {engine} engine")
+    return best
+
+
+def add_input_arguments(subparser):
+    """
+    Add the directory scanning options shared by the `ocr` and `convert` commands
+    :param subparser: argparse parser of the subcommand
+    """
+    subparser.add_argument(
+        "-r", "--recursive",
+        action="store_true",
+        help="Also process the images in subdirectories of the input directory; outputs are "
+             "written to the same subdirectories of the output directory"
+    )
+    subparser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="Only process files whose name or path relative to the input directory matches "
+             "this pattern, e.g. '*.png' or 'paris/*' (repeatable)",
+        default=None
+    )
+    subparser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="Skip files and directories whose name or relative path matches this pattern, "
+             "e.g. 'drafts' or '*_thumb.jpg' (repeatable)",
+        default=None
+    )
+
+
+def add_ocr_engine_arguments(subparser):
+    """
+    Add the OCR engine and cache options shared by the `ocr`, `convert` and `watch` commands
+    :param subparser: argparse parser of the subcommand
+    """
+    subparser.add_argument(
+        "--engine",
+        help="OCR engine: one tesseract subprocess per image, a pool of warm "
+             "in-process engines (requires tesserocr), or a pool of worker processes "
+             "(default: subprocess)",
+        default=OCR_ENGINE_SUBPROCESS,
+        choices=OCR_ENGINES
+    )
+    subparser.add_argument(
+        "--ocr-threads",
+        type=int,
+        help="OpenMP threads per tesseract worker, exported as OMP_THREAD_LIMIT; "
+             "the default worker count is available cores divided by this, bounded "
+             "by available memory (default: OMP_THREAD_LIMIT or 1)",
+        default=None
+    )
+    subparser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Images OCR'd per tesseract invocation by the subprocess engine; larger "
+             f"batches load the engine less often (default: {DEFAULT_OCR_BATCH_SIZE})",
+        default=DEFAULT_OCR_BATCH_SIZE
+    )
+    subparser.add_argument(
+        "--preprocess",
+        action="store_true",
+        help="Convert images to grayscale, downscale, deskew and binarize them before "
+             "OCR; usually faster on large photos (requires Pillow and numpy)"
+    )
+    subparser.add_argument(
+        "--tile",
+        action="store_true",
+        help=f"OCR images above {TILE_THRESHOLD_MEGAPIXELS:g} megapixels (e.g. menu boards) as "
+             "overlapping tiles in parallel instead of as one long tesseract run"
+    )
+    subparser.add_argument(
+        "--convert-formats",
+        action="store_true",
+        help="Convert images in formats the installed tesseract cannot read (e.g. PSD, PCX, "
+             "TGA, or HEIC with pillow-heif) to PNG before OCR instead of skipping them; "
+             "formats are detected from file headers (requires Pillow)"
+    )
+    subparser.add_argument(
+        "--dedup",
+        help="Process one image of every group of duplicates and give the others its "
+             "results: byte-identical files only (exact), or also rescaled, recompressed "
+             "or slightly re-shot photos of the same menu (similar) (default: off)",
+        default=None,
+        choices=DEDUP_MODES
+    )
+    subparser.add_argument(
+        "--dedup-distance",
+        type=int,
+        help="Largest number of differing perceptual hash bits (of 64) for two photos to "
+             f"count as the same menu with --dedup similar (default: {DEFAULT_DEDUP_MAX_DISTANCE})",
+        default=DEFAULT_DEDUP_MAX_DISTANCE
+    )
+    subparser.add_argument(
+        "--timings",
+        help="JSON file of per-image OCR times: images are OCR'd longest first by the "
+             "times of earlier runs instead of estimates from their size alone, and the "
+             "file is updated with this run's times (default: estimates only)",
+        default=None
+    )
+    subparser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the OCR result cache kept in the output directory"
+    )
+    subparser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Re-run OCR for every image and overwrite cached results"
+    )
+    subparser.add_argument(
+        "--cache-size",
+        type=int,
+        help=f"Maximum OCR cache size in MB (default: {DEFAULT_OCR_CACHE_MAX_MB})",
+        default=DEFAULT_OCR_CACHE_MAX_MB
+    )
+    subparser.add_argument(
+        "--no-profile",
+        action="store_true",
+        help="Ignore the worker and thread settings saved by the `tune` command"
+    )
+
+
+def add_conversion_arguments(subparser):
+    """
+    Add the Gemini, parser, pipeline and export options shared by the `convert` and `watch` commands
+    :param subparser: argparse parser of the subcommand
+    """
+    subparser.add_argument(
+        "--model",
+        help="Gemini model to use (default: gemini-2.0-flash-exp)",
+        default="gemini-2.0-flash-exp",
+        choices=["gemini-2.0-flash-exp", "gemini-2.5-pro", "gemini-1.5-pro"]
+    )
+    subparser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        help=f"Number of concurrent Gemini requests (default: {DEFAULT_LLM_CONCURRENCY})",
+        default=DEFAULT_LLM_CONCURRENCY
+    )
+    subparser.add_argument(
+        "--llm-rpm",
+        type=int,
+        help=f"Gemini requests per minute across all LLM workers, 0 = unlimited "
+             f"(default: {DEFAULT_GEMINI_RPM})",
+        default=DEFAULT_GEMINI_RPM
+    )
+    subparser.add_argument(
+        "--llm-tpm",
+        type=int,
+        help=f"Gemini tokens per minute across all LLM workers, 0 = unlimited "
+             f"(default: {DEFAULT_GEMINI_TPM})",
+        default=DEFAULT_GEMINI_TPM
+    )
+    subparser.add_argument(
+        "--parser",
+        help="How OCR text is structured: Gemini only (llm), the local rule-based parser "
+             "only (rules), or the rule-based parser with Gemini for low-confidence "
+             "sections (auto) (default: llm)",
+        default=PARSER_LLM,
+        choices=PARSER_MODES
+    )
+    subparser.add_argument(
+        "--rules-confidence",
+        type=float,
+        help="Minimum rule-based parser confidence (0-1) for a section to skip Gemini "
+             f"in auto mode (default: {DEFAULT_RULES_CONFIDENCE})",
+        default=DEFAULT_RULES_CONFIDENCE
+    )
+    subparser.add_argument(
+        "--compact-llm-output",
+        action="store_true",
+        help="Ask Gemini for only non-default fields using short keys and expand "
+             "them locally (fewer output tokens, lower latency)"
+    )
+    subparser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Disable the Gemini response cache kept in the output directory"
+    )
+    subparser.add_argument(
+        "--refresh-llm-cache",
+        action="store_true",
+        help="Call Gemini for every file and overwrite cached responses"
+    )
+    subparser.add_argument(
+        "--llm-cache-size",
+        type=int,
+        help=f"Maximum Gemini response cache size in MB (default: {DEFAULT_LLM_CACHE_MAX_MB})",
+        default=DEFAULT_LLM_CACHE_MAX_MB
+    )
+    subparser.add_argument(
+        "--llm-cache-ttl",
+        type=int,
+        help="Days before a cached Gemini response expires, 0 = never "
+             f"(default: {DEFAULT_LLM_CACHE_TTL_DAYS})",
+        default=DEFAULT_LLM_CACHE_TTL_DAYS
+    )
+    subparser.add_argument(
+        "--export-workers",
+        type=int,
+        help=f"Number of parallel JSON/Excel export workers (default: {DEFAULT_EXPORT_WORKERS})",
+        default=DEFAULT_EXPORT_WORKERS
+    )
+    subparser.add_argument(
+        "--queue-size",
+        type=int,
+        help="Maximum results buffered between pipeline stages "
+             f"(default: {DEFAULT_PIPELINE_QUEUE_SIZE})",
+        default=DEFAULT_PIPELINE_QUEUE_SIZE
+    )
+    subparser.add_argument(
+        "--no-json", 
+        action="store_true",
+        help="Skip JSON file export (Excel only)"
+    )
+    subparser.add_argument(
+        "--no-excel", 
+        action="store_true",
+        help="Skip Excel file export (JSON only)"
+    )
+    subparser.add_argument(
+        "--multi-sheet", 
+        action="store_true",
+        help="Create multi-sheet Excel format (default: single sheet)"
+    )
 
 
 if __name__ == "__main__":
@@ -548,6 +1973,13 @@ if __name__ == "__main__":
         required=True
     )
     ocr_parser.add_argument("-o", "--output", help="(Optional) Output directory for converted text")
+    ocr_parser.add_argument(
+        "--jsonl",
+        help="Write all OCR results to this JSON Lines file, one line per image with its "
+             "filename, path, content hash, text and OCR time, instead of a text file per "
+             "image (-o then only holds the OCR cache)",
+        default=None
+    )
     ocr_parser.add_argument("-d", "--debug", action="store_true", help="Enable verbose DEBUG logging")
     ocr_parser.add_argument(
         "-w", "--workers",
@@ -555,6 +1987,51 @@ if __name__ == "__main__":
         help="Number of parallel workers (default: auto-detect)",
         default=None
     )
+    add_input_arguments(ocr_parser)
+    add_ocr_engine_arguments(ocr_parser)
+    
+    # Tune command (calibrates OCR workers and threads for this host)
+    tune_parser = subparsers.add_parser(
+        'tune',
+        help='Measure OCR throughput on sample images and save the best worker/thread settings'
+    )
+    tune_parser.add_argument(
+        "-i", "--input",
+        help="Sample image file path or images directory path",
+        required=True
+    )
+    tune_parser.add_argument("-d", "--debug", action="store_true", help="Enable verbose DEBUG logging")
+    tune_parser.add_argument(
+        "--engine",
+        help="OCR engine to tune (default: subprocess)",
+        default=OCR_ENGINE_SUBPROCESS,
+        choices=OCR_ENGINES
+    )
+    tune_parser.add_argument(
+        "--sample",
+        type=int,
+        help=f"Number of images to OCR per combination (default: {DEFAULT_TUNE_SAMPLE_SIZE})",
+        default=DEFAULT_TUNE_SAMPLE_SIZE
+    )
+    tune_parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        help="Threads per worker to try (default: 1 2 4, up to the available cores)",
+        default=None
+    )
+    tune_parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        help="Worker counts to try (default: derived from available cores and memory)",
+        default=None
+    )
+    tune_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report the measurements, do not save the profile"
+    )
     
     # Convert command (new AI-powered functionality)
     convert_parser = subparsers.add_parser(
@@ -578,26 +2055,59 @@ if __name__ == "__main__":
         help="Number of parallel workers for OCR (default: auto-detect)",
         default=None
     )
+    add_input_arguments(convert_parser)
+    add_ocr_engine_arguments(convert_parser)
+    add_conversion_arguments(convert_parser)
     convert_parser.add_argument(
-        "--model",
-        help="Gemini model to use (default: gemini-2.0-flash-exp)",
-        default="gemini-2.0-flash-exp",
-        choices=["gemini-2.0-flash-exp", "gemini-2.5-pro", "gemini-1.5-pro"]
-    )
-    convert_parser.add_argument(
-        "--no-json", 
+        "--resume",
         action="store_true",
-        help="Skip JSON file export (Excel only)"
+        help="Continue an interrupted run: skip files it already exported, as recorded "
+             f"in the run journal ({RUN_JOURNAL_FILENAME}) in the output directory"
     )
-    convert_parser.add_argument(
-        "--no-excel", 
-        action="store_true",
-        help="Skip Excel file export (JSON only)"
+    
+    # Watch command (converts menus as they are dropped into a folder)
+    watch_parser = subparsers.add_parser(
+        'watch',
+        help='Watch a folder and convert menu images to JSON/Excel as they arrive'
     )
-    convert_parser.add_argument(
-        "--multi-sheet", 
+    watch_parser.add_argument(
+        "-i", "--input",
+        help="Directory to watch for new or changed menu images",
+        required=True
+    )
+    watch_parser.add_argument(
+        "-o", "--output",
+        help="Output directory for structured data files (JSON/Excel)",
+        required=True
+    )
+    watch_parser.add_argument("-d", "--debug", action="store_true", help="Enable verbose DEBUG logging")
+    watch_parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        help="Number of parallel workers for OCR (default: auto-detect)",
+        default=None
+    )
+    add_ocr_engine_arguments(watch_parser)
+    add_conversion_arguments(watch_parser)
+    watch_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        help="Seconds between folder scans when watchdog is not installed "
+             f"(default: {DEFAULT_WATCH_POLL_SECONDS:g})",
+        default=DEFAULT_WATCH_POLL_SECONDS
+    )
+    watch_parser.add_argument(
+        "--settle",
+        type=float,
+        help="Seconds a file must stay unchanged before it is converted, so files "
+             f"still being copied are not read (default: {DEFAULT_WATCH_SETTLE_SECONDS:g})",
+        default=DEFAULT_WATCH_SETTLE_SECONDS
+    )
+    watch_parser.add_argument(
+        "--polling",
         action="store_true",
-        help="Create multi-sheet Excel format (default: single sheet)"
+        help="Scan the folder periodically even if watchdog is installed (e.g. for "
+             "network shares that deliver no file system events)"
     )
 
     args = parser.parse_args()
@@ -620,7 +2130,7 @@ if __name__ == "__main__":
     # Handle no command (backward compatibility)
     if not args.command:
         # If no subcommand is provided, try to determine if old-style arguments are used
-        if len(sys.argv) > 1 and not sys.argv[1] in ['ocr', 'convert']:
+        if len(sys.argv) > 1 and not sys.argv[1] in ['ocr', 'convert', 'tune', 'watch']:
             print("⚠️  Warning: Using legacy command format. Consider using 'ocr' command:")
             print("   python main.py ocr -i <input> -o <output>")
             print("   For AI-powered menu conversion, use:")
@@ -656,34 +2166,109 @@ if __name__ == "__main__":
     if args.command == 'ocr':
         # Original OCR functionality
         output_path = os.path.abspath(args.output) if args.output else None
-        main(input_path, output_path, args.workers)
+        main(
+            input_path,
+            output_path,
+            args.workers,
+            engine=args.engine,
+            use_cache=not args.no_cache,
+            refresh_cache=args.refresh_cache,
+            cache_max_mb=args.cache_size,
+            ocr_threads=args.ocr_threads,
+            use_profile=not args.no_profile,
+            ocr_batch_size=args.batch_size,
+            preprocess=args.preprocess,
+            tile=args.tile,
+            dedup=args.dedup,
+            dedup_distance=args.dedup_distance,
+            timings_path=args.timings,
+            jsonl_path=os.path.abspath(args.jsonl) if args.jsonl else None,
+            recursive=args.recursive,
+            include=args.include,
+            exclude=args.exclude,
+            convert_formats=args.convert_formats
+        )
+    
+    elif args.command == 'tune':
+        best = tune_ocr(
+            input_path,
+            engine=args.engine,
+            sample_size=args.sample,
+            threads_options=args.threads,
+            workers_options=args.workers,
+            save=not args.dry_run
+        )
+        if not best:
+            exit(1)
         
-    elif args.command == 'convert':
-        # New AI-powered conversion
+    elif args.command in ('convert', 'watch'):
+        # New AI-powered conversion, of a folder once or of the files arriving in it
         if not LLM_AVAILABLE:
-            logging.error("❌ Convert command requires additional dependencies.")
+            logging.error(f"❌ {args.command.capitalize()} command requires additional dependencies.")
             logging.error("Install them with: pip install -r requirements.txt")
             exit(1)
         
         output_path = os.path.abspath(args.output)
         
-        # Check for API key
+        # Check for API key (the rule-based parser never calls Gemini)
         api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            logging.error("❌ Gemini API key required for convert command.")
+        if not api_key and args.parser != PARSER_RULES:
+            logging.error(f"❌ Gemini API key required for {args.command} command.")
             logging.error("Set environment variable: GOOGLE_API_KEY or GEMINI_API_KEY")
             logging.error("Get your API key from: https://makersuite.google.com/app/apikey")
             exit(1)
         
-        success = convert_menu_to_structured_data(
-            input_path=input_path,
-            output_path=output_path,
+        conversion_options = dict(
             max_workers=args.workers,
             gemini_model=args.model,
             export_json=not args.no_json,
             export_excel=not args.no_excel,
-            single_sheet=not args.multi_sheet
+            single_sheet=not args.multi_sheet,
+            engine=args.engine,
+            use_cache=not args.no_cache,
+            refresh_cache=args.refresh_cache,
+            cache_max_mb=args.cache_size,
+            llm_concurrency=args.llm_concurrency,
+            export_workers=args.export_workers,
+            queue_size=args.queue_size,
+            requests_per_minute=args.llm_rpm,
+            tokens_per_minute=args.llm_tpm,
+            use_llm_cache=not args.no_llm_cache,
+            refresh_llm_cache=args.refresh_llm_cache,
+            llm_cache_max_mb=args.llm_cache_size,
+            llm_cache_ttl_days=args.llm_cache_ttl,
+            compact_llm_output=args.compact_llm_output,
+            parser_mode=args.parser,
+            rules_confidence=args.rules_confidence,
+            ocr_threads=args.ocr_threads,
+            use_profile=not args.no_profile,
+            ocr_batch_size=args.batch_size,
+            preprocess=args.preprocess,
+            tile=args.tile,
+            convert_formats=args.convert_formats,
+            dedup=args.dedup,
+            dedup_distance=args.dedup_distance,
+            timings_path=args.timings
         )
+        if args.command == 'watch':
+            success = watch_menu_folder(
+                input_path,
+                output_path,
+                poll_interval=args.poll_interval,
+                settle_seconds=args.settle,
+                use_events=not args.polling,
+                **conversion_options
+            )
+        else:
+            success = convert_menu_to_structured_data(
+                input_path,
+                output_path,
+                resume=args.resume,
+                recursive=args.recursive,
+                include=args.include,
+                exclude=args.exclude,
+                **conversion_options
+            )
         
         if not success:
             exit(1)
@@ -0,0 +1,509 @@
+"""
+Menu Parser Module for deterministic rule-based parsing of OCR menu text
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from llm_converter import expand_compact_json, validate_and_enhance_menu_json
+
+# Trailing price, e.g. "259", "₹259/-", "Rs. 289/349", "199.00"
+PRICE_PATTERN = re.compile(
+    r"(?:₹|rs\.?|inr)?\s*(\d{1,5}(?:\.\d{1,2})?(?:\s*/\s*\d{1,5}(?:\.\d{1,2})?)*)\s*(?:/-|-|/)?\s*$",
+    re.IGNORECASE
+)
+ADDON_PATTERN = re.compile(r"^(?:add|extra)\s+", re.IGNORECASE)
+ADDON_PREFIX_PATTERN = re.compile(r"^add(?:\s*-?\s*on)?\s+", re.IGNORECASE)
+NON_VEG_KEYWORDS = (
+    "chicken", "mutton", "lamb", "beef", "pork", "ham", "bacon", "pepperoni", "salami",
+    "chorizo", "sausage", "fish", "prawn", "shrimp", "crab", "tuna", "keema", "meat",
+)
+EGG_KEYWORDS = ("egg", "omelette", "omelet")
+VARIATION_NAMES = {
+    2: ["Regular", "Large"],
+    3: ["Small", "Medium", "Large"],
+}
+
+ATTRIBUTE_NON_VEG = "2"
+ATTRIBUTE_EGG = "24"
+
+
+def detect_attribute(text: str) -> Optional[str]:
+    """
+    Detect the veg/non-veg attribute from keywords
+
+    Args:
+        text: Item name and description
+
+    Returns:
+        Optional[str]: "2" for non-veg, "24" for egg, None for veg
+    """
+    words = set(re.findall(r"[a-z]+", text.lower()))
+    if any(keyword in words for keyword in NON_VEG_KEYWORDS):
+        return ATTRIBUTE_NON_VEG
+    if any(keyword in words for keyword in EGG_KEYWORDS):
+        return ATTRIBUTE_EGG
+    return None
+
+
+def split_price(line: str) -> Tuple[str, List[str]]:
+    """
+    Split a trailing price (or price variants) from a line
+
+    Args:
+        line: A line of OCR text
+
+    Returns:
+        Tuple of (text before the price, list of prices)
+    """
+    match = PRICE_PATTERN.search(line)
+    if not match:
+        return line, []
+    text = line[:match.start()].rstrip()
+    # Require whitespace (or nothing) before the price so "Item2" isn't split
+    if text and not line[match.start()].isspace() and not line[match.start()] in "₹Rr":
+        return line, []
+    prices = [_normalize_price(price) for price in match.group(1).split("/")]
+    # A lone digit is usually a veg/non-veg mark read by OCR, not a price
+    if len(prices) == 1 and len(prices[0]) == 1:
+        return line, []
+    return text, prices
+
+
+def _normalize_price(price: str) -> str:
+    """Drop an empty decimal part, e.g. "199.00" -> "199" """
+    price = price.strip()
+    if "." in price and float(price).is_integer():
+        return str(int(float(price)))
+    return price
+
+
+def clean_name(text: str, keep_joiner: bool = False) -> str:
+    """
+    Remove OCR debris such as veg/non-veg symbols read as stray characters
+
+    Args:
+        text: Raw item name (one line)
+        keep_joiner: Keep a trailing "&" or "+" because the name continues on the next line
+
+    Returns:
+        str: Name without trailing single characters
+    """
+    words = text.split()
+    while words and len(words[-1]) == 1:
+        if keep_joiner and words[-1] in "&+":
+            break
+        words.pop()
+    while words and len(words[0]) == 1 and not words[0].isalnum():
+        words.pop(0)
+    return " ".join(words).strip(" -:.")
+
+
+def is_category_header(line: str) -> bool:
+    """
+    Check if a line looks like an ALL-CAPS category header
+
+    Args:
+        line: A line of OCR text
+
+    Returns:
+        bool: True for header lines such as "CALZONE MENU" or "PIZZAS"
+    """
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) < 3 or any(c.isdigit() for c in line):
+        return False
+    return sum(1 for c in letters if c.isupper()) / len(letters) >= 0.9
+
+
+class MenuSection:
+    """Lines of a menu between two category headers and what was parsed from them"""
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self.lines: List[str] = []
+        self.items: List[Dict] = []
+        self.addons: List[List[str]] = []
+        self.explained = 0
+        self.unexplained = 0
+
+    @property
+    def confidence(self) -> float:
+        """Share of the section's significant lines the rules could explain"""
+        total = self.explained + self.unexplained
+        if not self.items and not self.addons:
+            return 0.0
+        return self.explained / total if total else 0.0
+
+    @property
+    def is_empty(self) -> bool:
+        """A section without items, add-ons or unexplained lines carries no menu data"""
+        return not self.items and not self.addons and self.unexplained == 0
+
+
+class MenuTextParser:
+    """
+    Deterministic parser for the simple menu patterns Gemini is prompted with.
+
+    Handles ALL-CAPS category headers, "Item Name  259/-" lines, prices on the
+    line after the name, "289/349" price variations, "Add extra ..." add-ons,
+    parenthesized descriptions and veg/non-veg keywords. Every section gets a
+    confidence score: the share of its lines the rules could explain. Lines
+    without any digits that explain nothing (slogans, prose) are ignored, since
+    they cannot hold a priced item.
+    """
+
+    def parse_sections(self, raw_text: str) -> List[MenuSection]:
+        """
+        Split OCR text into sections and parse each of them
+
+        Args:
+            raw_text: The OCR extracted text
+
+        Returns:
+            List[MenuSection]: Parsed sections in menu order
+        """
+        sections = [MenuSection()]
+        pending = None  # Item whose price has not been seen yet
+        last_item = None  # Finished item that may still receive a description
+        previous_was_header = False
+
+        def drop_pending():
+            nonlocal pending
+            if pending is not None:
+                # Only lines with digits could have been a priced item
+                if pending["has_digits"]:
+                    sections[-1].unexplained += pending["line_count"]
+                pending = None
+
+        for raw_line in raw_text.splitlines():
+            line = " ".join(raw_line.split())
+            if not line:
+                continue
+            section = sections[-1]
+
+            if is_category_header(line) and not (pending and pending["description_open"]):
+                drop_pending()
+                last_item = None
+                if previous_was_header and section.is_empty:
+                    section.name = f"{section.name} {line}" if section.name else line
+                else:
+                    sections.append(MenuSection(line))
+                sections[-1].lines.append(raw_line)
+                sections[-1].explained += 1
+                previous_was_header = True
+                continue
+            previous_was_header = False
+            section.lines.append(raw_line)
+
+            text, prices = split_price(line)
+
+            if prices and ADDON_PATTERN.match(text):
+                drop_pending()
+                last_item = None
+                name = ADDON_PREFIX_PATTERN.sub("", text).strip() or text
+                addon = [clean_name(name).title(), prices[0]]
+                attribute = detect_attribute(name)
+                if attribute:
+                    addon.append(attribute)
+                section.addons.append(addon)
+                section.explained += 1
+                continue
+
+            if prices and pending is not None and (not text or pending["description_open"]
+                                                    or pending["description"]):
+                # Price closing a pending item, possibly after the end of its description
+                if text:
+                    pending["description"].append(text)
+                pending["description_open"] = False
+                pending["line_count"] += 1
+                last_item = self._finish_item(section, pending, prices)
+                pending = None
+                continue
+
+            if prices and text:
+                drop_pending()
+                item = self._new_pending(text)
+                last_item = self._finish_item(section, item, prices)
+                continue
+
+            if prices:
+                # A price with nothing to attach it to
+                section.unexplained += 1
+                continue
+
+            target = pending if pending is not None else last_item
+            if target is not None and (line.startswith("(") or target["description_open"]):
+                target["description"].append(line)
+                target["description_open"] = line.count("(") > line.count(")") or (
+                    target["description_open"] and ")" not in line
+                )
+                if target is pending:
+                    pending["line_count"] += 1
+                else:
+                    self._update_finished(last_item)
+                    section.explained += 1
+                continue
+
+            if pending is not None and not pending["description"] and len(line.split()) <= 3 \
+                    and not any(c.isdigit() for c in line):
+                # Item names wrapped over two lines, e.g. "Chicken &" / "Spinach"
+                pending["name"].append(line)
+                pending["line_count"] += 1
+                continue
+
+            drop_pending()
+            last_item = None
+            pending = self._new_pending(line)
+
+        drop_pending()
+        return [section for section in sections if not section.is_empty]
+
+    def _new_pending(self, text: str) -> Dict:
+        """Start an item from its name line"""
+        return {
+            "name": [text],
+            "description": [],
+            "description_open": False,
+            "line_count": 1,
+            "has_digits": any(c.isdigit() for c in text),
+            "section_item": None,
+        }
+
+    def _finish_item(self, section: MenuSection, pending: Dict, prices: List[str]) -> Dict:
+        """Turn a pending item with its prices into a compact item of the section"""
+        last = len(pending["name"]) - 1
+        name = " ".join(
+            clean_name(part, keep_joiner=i < last) for i, part in enumerate(pending["name"])
+        ).strip()
+        if not name:
+            section.unexplained += pending["line_count"]
+            return None
+        item = {"n": name, "p": prices[0]}
+        if len(prices) > 1:
+            names = VARIATION_NAMES.get(len(prices)) or [f"Option {i}" for i in range(1, len(prices) + 1)]
+            item["v"] = [[variation_name, price] for variation_name, price in zip(names, prices)]
+        section.items.append(item)
+        section.explained += pending["line_count"]
+        pending["section_item"] = item
+        self._update_finished(pending)
+        return pending
+
+    def _update_finished(self, pending: Optional[Dict]) -> None:
+        """Refresh description and attribute of a finished item"""
+        if pending is None or pending["section_item"] is None:
+            return
+        item = pending["section_item"]
+        description = " ".join(pending["description"]).strip()
+        if description:
+            item["d"] = description
+        attribute = detect_attribute(f"{item['n']} {description}")
+        if attribute:
+            item["a"] = attribute
+        else:
+            item.pop("a", None)
+
+    def to_compact_json(self, sections: List[MenuSection]) -> Dict:
+        """
+        Build compact-contract data (see GeminiConverter.get_compact_system_prompt)
+
+        Args:
+            sections: Parsed sections
+
+        Returns:
+            Dict: Compact menu data for `expand_compact_json`
+        """
+        categories = []
+        items = []
+        addons = []
+        for section in sections:
+            category_index = None
+            if section.name:
+                category_index = len(categories)
+                categories.append(section.name)
+            for item in section.items:
+                item = dict(item)
+                if category_index is not None:
+                    item["c"] = category_index
+                items.append(item)
+            addons.extend(section.addons)
+
+        compact = {"c": categories, "i": items}
+        if addons:
+            compact["g"] = [{"n": "Add-ons", "i": addons}]
+        return compact
+
+    def parse(self, raw_text: str, source_image_path: Optional[str] = None) -> Tuple[Dict, float]:
+        """
+        Parse OCR text straight into the validated menu schema
+
+        Args:
+            raw_text: The OCR extracted text
+            source_image_path: Optional path to the source image
+
+        Returns:
+            Tuple of (json_data, confidence)
+        """
+        sections = self.parse_sections(raw_text)
+        json_data = validate_and_enhance_menu_json(
+            expand_compact_json(self.to_compact_json(sections)), source_image_path
+        )
+        return json_data, overall_confidence(sections)
+
+
+def overall_confidence(sections: List[MenuSection]) -> float:
+    """
+    Line-weighted confidence over all sections
+
+    Args:
+        sections: Parsed sections
+
+    Returns:
+        float: Confidence between 0 and 1
+    """
+    explained = sum(section.explained for section in sections)
+    total = explained + sum(section.unexplained for section in sections)
+    if not any(section.items for section in sections):
+        return 0.0
+    return explained / total if total else 0.0
+
+
+def merge_menu_json(base: Dict, extra: Dict) -> Dict:
+    """
+    Append the categories, items and addon groups of one menu to another
+
+    Ids of `extra` are renumbered after the highest numeric id in `base`, and
+    item references are remapped accordingly.
+
+    Args:
+        base: Menu data to extend (modified in place)
+        extra: Menu data to append
+
+    Returns:
+        Dict: The merged menu data
+    """
+    def next_id(records, key):
+        ids = [int(r[key]) for r in records if str(r.get(key) or "").isdigit()]
+        return max(ids, default=0) + 1
+
+    base_restaurant = base.setdefault("restaurant", {})
+    extra_restaurant = extra.get("restaurant", {})
+    if base_restaurant.get("restaurantname", "Unknown") == "Unknown" and extra_restaurant.get("restaurantname"):
+        base_restaurant["restaurantname"] = extra_restaurant["restaurantname"]
+
+    category_ids = {}
+    new_id = next_id(base.get("categories", []), "categoryid")
+    extra_categories = extra.get("categories", [])
+    for category in extra_categories:
+        old_id = category.get("categoryid")
+        category = dict(category, categoryid=str(new_id),
+                        categoryrank=str(len(base.setdefault("categories", [])) + 1))
+        category_ids[old_id] = category["categoryid"]
+        base["categories"].append(category)
+        new_id += 1
+
+    group_ids = {}
+    new_id = next_id(base.get("addongroups", []), "addongroupid")
+    for group in extra.get("addongroups", []):
+        old_id = group.get("addongroupid")
+        group = dict(group, addongroupid=str(new_id))
+        group_ids[old_id] = group["addongroupid"]
+        base.setdefault("addongroups", []).append(group)
+        new_id += 1
+
+    for item in extra.get("items", []):
+        item = dict(item)
+        # Null ids can only be resolved when there is a single candidate
+        old_category = item.get("item_categoryid")
+        if old_category in category_ids and (old_category is not None or len(extra_categories) == 1):
+            item["item_categoryid"] = category_ids[old_category]
+        item["addon"] = [
+            dict(ref, addon_group_id=group_ids.get(ref.get("addon_group_id"), ref.get("addon_group_id")))
+            for ref in item.get("addon", [])
+        ]
+        item["itemrank"] = str(len(base.setdefault("items", [])) + 1)
+        base["items"].append(item)
+
+    return base
+
+
+class HybridMenuConverter:
+    """
+    Rule-based fast path with Gemini fallback for low-confidence sections.
+
+    Sections the rules explain with at least `confidence_threshold` are used
+    as parsed; the OCR lines of the other sections are sent to Gemini in a
+    single request and merged in. If that request fails, the conversion fails
+    rather than returning a partial menu. Without an LLM converter every
+    section is used as parsed and no request is made.
+    """
+
+    def __init__(self, llm_converter=None, confidence_threshold: float = 0.85):
+        """
+        Initialize the hybrid converter
+
+        Args:
+            llm_converter: Optional GeminiConverter for low-confidence sections
+            confidence_threshold: Minimum section confidence to skip Gemini
+        """
+        self.llm_converter = llm_converter
+        self.confidence_threshold = confidence_threshold
+        self.parser = MenuTextParser()
+
+    def convert(
+        self,
+        raw_text: str,
+        source_image_path: Optional[str] = None
+    ) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Convert OCR text to structured JSON, calling Gemini only when needed
+
+        Args:
+            raw_text: The OCR extracted text
+            source_image_path: Optional path to the source image
+
+        Returns:
+            Tuple of (success, json_data, error_message)
+        """
+        if not raw_text or not raw_text.strip():
+            return False, None, "Empty or invalid input text"
+
+        sections = self.parser.parse_sections(raw_text)
+        if self.llm_converter is None:
+            confident, uncertain = sections, []
+        else:
+            confident = [s for s in sections if s.confidence >= self.confidence_threshold]
+            uncertain = [s for s in sections if s.confidence < self.confidence_threshold]
+
+        json_data = validate_and_enhance_menu_json(
+            expand_compact_json(self.parser.to_compact_json(confident)), source_image_path
+        )
+        confidence = overall_confidence(sections)
+        logging.info(
+            f"Rule-based parser: {len(confident)}/{len(sections)} section(s) confident, "
+            f"overall confidence {confidence:.2f}"
+        )
+
+        llm_sections = 0
+        if uncertain:
+            uncertain_text = "\n".join(line for section in uncertain for line in section.lines)
+            success, llm_data, error = self.llm_converter.text_to_json_with_gemini(
+                uncertain_text, source_image_path
+            )
+            if not success or not llm_data:
+                # Keeping only the confident sections would silently drop the others' items,
+                # failing lets the file be converted again (e.g. with --resume)
+                return False, None, f"Gemini failed for {len(uncertain)} low-confidence section(s): {error}"
+            merge_menu_json(json_data, llm_data)
+            llm_sections = len(uncertain)
+
+        if not json_data["items"] and not json_data["addongroups"]:
+            return False, None, "No menu items recognized"
+
+        json_data["audit_log"].append({
+            "parser": "rules" if not llm_sections else "rules+llm",
+            "confidence": round(confidence, 3),
+            "sections": len(sections),
+            "llm_sections": llm_sections,
+        })
+        return True, json_data, None
@@ -0,0 +1,152 @@
+"""
+OCR Engine Module providing a pool of warm in-process Tesseract engines
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from constants import (DEFAULT_OCR_LANGUAGE, DEFAULT_OCR_OEM, DEFAULT_OCR_PSM,
+                       TESSERACT_DATA_PATH_VAR)
+from image_preprocess import preprocess_image
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+
+def is_engine_pool_available() -> bool:
+    """
+    Check if the in-process Tesseract bindings (tesserocr) are installed
+
+    Returns:
+        bool: True if the engine pool can be used, False otherwise
+    """
+    return tesserocr is not None
+
+
+def get_engine_version() -> str:
+    """
+    Get the version of the Tesseract library used by the engine pool
+
+    Returns:
+        str: Version string, e.g. "tesseract 5.3.0"
+    """
+    if tesserocr is None:
+        return "unknown"
+    return tesserocr.tesseract_version().splitlines()[0].strip()
+
+
+class TesseractEnginePool:
+    """
+    Pool of long-lived Tesseract engines, one per worker thread.
+
+    Every engine loads the traineddata once and is then reused for all images
+    processed by its thread, instead of forking a `tesseract` binary per image.
+    tesserocr releases the GIL while recognizing, so the engines run in parallel
+    under the existing ThreadPoolExecutor.
+    """
+
+    def __init__(
+        self,
+        lang: str = DEFAULT_OCR_LANGUAGE,
+        psm: int = DEFAULT_OCR_PSM,
+        oem: int = DEFAULT_OCR_OEM,
+        tessdata_path: Optional[str] = None,
+        preprocess: bool = False
+    ):
+        """
+        Initialize the engine pool
+
+        Args:
+            lang: Tesseract language(s) to load, e.g. "eng" or "eng+hin"
+            psm: Page segmentation mode
+            oem: OCR engine mode
+            tessdata_path: Optional tessdata directory (defaults to TESSDATA_PREFIX)
+            preprocess: Downscale, deskew and binarize images before recognition
+        """
+        if tesserocr is None:
+            raise ImportError("tesserocr package is required for the OCR engine pool")
+
+        self.lang = lang
+        self.psm = psm
+        self.oem = oem
+        self.tessdata_path = tessdata_path or os.environ.get(TESSERACT_DATA_PATH_VAR)
+        self.preprocess = preprocess
+        self._local = threading.local()
+        self._engines: List = []
+        self._lock = threading.Lock()
+
+    def _get_engine(self):
+        """Return the engine owned by the calling thread, creating it on first use"""
+        engine = getattr(self._local, "engine", None)
+        if engine is None:
+            kwargs = {"lang": self.lang, "psm": self.psm, "oem": self.oem}
+            if self.tessdata_path:
+                kwargs["path"] = self.tessdata_path
+            engine = tesserocr.PyTessBaseAPI(**kwargs)
+            self._local.engine = engine
+            with self._lock:
+                self._engines.append(engine)
+            logging.debug(
+                f"Loaded Tesseract engine ({self.lang}) for thread {threading.current_thread().name}"
+            )
+        return engine
+
+    def run(self, image_path: Path, output_path: Optional[str] = None) -> Tuple[bool, Optional[str], str]:
+        """
+        OCR a single image with the calling thread's warm engine
+
+        Mirrors `run_tesseract_optimized`: when an output directory is given the
+        text is written to `<output_path>/<stem>.txt` and not returned.
+
+        Args:
+            image_path: Path to image file
+            output_path: Optional output directory
+
+        Returns:
+            Tuple of (success, text_content, filename)
+        """
+        filename = image_path.name
+        try:
+            engine = self._get_engine()
+            if self.preprocess:
+                engine.SetImage(preprocess_image(image_path))
+            else:
+                engine.SetImageFile(str(image_path))
+            text = engine.GetUTF8Text()
+            engine.Clear()
+        except Exception as e:
+            logging.warning(f"Tesseract failed for {filename}: {e}")
+            return False, None, filename
+
+        if not output_path:
+            return True, text, filename
+
+        try:
+            text_file_path = os.path.join(output_path, f"{image_path.stem}.txt")
+            with open(text_file_path, "w", encoding="utf8") as f:
+                f.write(text)
+            return True, None, filename
+        except Exception as e:
+            logging.warning(f"Failed to write output for {filename}: {e}")
+            return False, None, filename
+
+    def close(self) -> None:
+        """Release every engine created by the pool"""
+        with self._lock:
+            engines, self._engines = self._engines, []
+        for engine in engines:
+            try:
+                engine.End()
+            except Exception as e:
+                logging.debug(f"Failed to release Tesseract engine: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,96 @@
+"""
+OCR Results Module for streaming OCR texts to a JSON Lines file instead of holding them in memory
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from disk_cache import hash_file
+
+
+class OcrResultWriter:
+    """
+    Append-only JSON Lines file of OCR results, one line per image.
+
+    Every line holds the image's filename, path, content hash, OCR text and
+    OCR time, and is flushed right away, so readers can follow the file while
+    it is written and a crash loses at most the line being written. Safe to
+    share between threads.
+    """
+
+    def __init__(self, results_path: str, append: bool = False):
+        """
+        Open the results file
+
+        Args:
+            results_path: Path of the JSON Lines file
+            append: Add to an existing file instead of replacing it
+        """
+        self.results_path = results_path
+        self.count = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(results_path)), exist_ok=True)
+        self._file = open(results_path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, image_path: Path, text: str, ocr_seconds: Optional[float] = None) -> None:
+        """
+        Append the OCR result of one image
+
+        Args:
+            image_path: Path to image file
+            text: OCR text
+            ocr_seconds: Time spent on OCR, if measured
+        """
+        try:
+            content_hash = hash_file(image_path)
+        except OSError as e:
+            logging.debug(f"Could not hash {image_path.name}: {e}")
+            content_hash = None
+        record = {
+            "filename": image_path.name,
+            "path": str(image_path),
+            "hash": content_hash,
+            "text": text,
+            "ocr_seconds": round(ocr_seconds, 3) if ocr_seconds is not None else None,
+            "time": time.time(),
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self) -> None:
+        """Close the results file"""
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "OcrResultWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_ocr_results(results_path: str) -> Iterator[Dict]:
+    """
+    Read OCR results one at a time
+
+    Args:
+        results_path: Path of a file written by OcrResultWriter
+
+    Yields:
+        Dict: Record with "filename", "path", "hash", "text", "ocr_seconds" and "time";
+            lines cut short by a crash are skipped
+    """
+    with open(results_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
@@ -0,0 +1,217 @@
+"""
+OCR Scheduler Module for submitting the most expensive OCR jobs first
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from constants import (OCR_SCHEDULE_FIRST_WINDOW, OCR_SCHEDULE_WINDOW,
+                       OCR_SECONDS_PER_MEGABYTE, OCR_SECONDS_PER_MEGAPIXEL,
+                       OCR_TIMINGS_MAX_FILES)
+from ocr_timeouts import get_megapixels
+
+
+def estimate_ocr_seconds(megapixels: Optional[float], size_bytes: int) -> float:
+    """
+    Expected OCR time of a file before any timing of it is known
+
+    Pixels set the amount of work; at the same resolution, a larger file holds
+    more detail (dense text, photos) and takes longer to recognize. Files
+    without readable dimensions (PDFs) are estimated from their size alone.
+
+    Args:
+        megapixels: Image size from the file header, or None if unknown
+        size_bytes: File size
+
+    Returns:
+        float: Estimated seconds, only meaningful relative to other estimates
+    """
+    return (megapixels or 0) * OCR_SECONDS_PER_MEGAPIXEL + size_bytes / 1_000_000 * OCR_SECONDS_PER_MEGABYTE
+
+
+class OcrTimingHistory:
+    """
+    OCR times of earlier runs, stored as JSON, for ordering the next run.
+
+    A file OCR'd before with the same size and modification time is expected
+    to take as long as it did then. Other files get the size-based estimate,
+    scaled by how far the recorded times were off from their estimates, so the
+    estimates follow the speed of this host. Only OCR that really ran is
+    recorded (the wrapped function sits beneath the OCR cache), and only for
+    files passed to `order_longest_first`, not for temporary page images.
+    Safe to share between threads.
+    """
+
+    def __init__(self, history_path: str):
+        """
+        Load the history
+
+        Args:
+            history_path: Path of the JSON file; a missing or unreadable file
+                starts an empty history
+        """
+        self.history_path = history_path
+        self._lock = threading.Lock()
+        self._scheduled: Dict[str, Dict] = {}
+        self._files: Dict[str, Dict] = {}
+        try:
+            with open(history_path, "r", encoding="utf-8") as f:
+                files = json.load(f).get("files", {})
+            self._files = {
+                path: entry for path, entry in files.items()
+                if isinstance(entry, dict) and {"size", "mtime_ns", "megapixels", "seconds"} <= entry.keys()
+            }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(f"Ignoring unreadable OCR timings {history_path}: {e}")
+        self._scale = self._get_scale()
+
+    def _get_scale(self) -> float:
+        """Ratio of recorded OCR times to their estimates, 1 without history"""
+        recorded = sum(entry["seconds"] for entry in self._files.values())
+        estimated = sum(estimate_ocr_seconds(entry["megapixels"], entry["size"]) for entry in self._files.values())
+        return recorded / estimated if recorded > 0 and estimated > 0 else 1.0
+
+    def estimate(self, image_path: Path, megapixels: Optional[float], stat: os.stat_result) -> float:
+        """
+        Expected OCR time of a file, remembering it so its real time is recorded
+
+        Args:
+            image_path: Path to image file
+            megapixels: Image size from the file header, or None if unknown
+            stat: Result of os.stat for the file
+
+        Returns:
+            float: Recorded seconds for an unchanged file, otherwise the scaled estimate
+        """
+        description = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "megapixels": megapixels}
+        with self._lock:
+            self._scheduled[str(image_path)] = description
+            entry = self._files.get(str(image_path))
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["seconds"]
+        return estimate_ocr_seconds(megapixels, stat.st_size) * self._scale
+
+    def record(self, image_path: Path, seconds: float) -> None:
+        """
+        Remember the OCR time of a scheduled file
+
+        Args:
+            image_path: Path to image file
+            seconds: OCR wall time
+        """
+        with self._lock:
+            description = self._scheduled.get(str(image_path))
+            if description is None:
+                return
+            # Re-inserted so the most recent files are the last ones dropped
+            self._files.pop(str(image_path), None)
+            self._files[str(image_path)] = dict(description, seconds=round(seconds, 3))
+
+    def wrap(self, ocr_func: Callable) -> Callable:
+        """
+        Record the time of every OCR call, and of batches if ocr_func is a batch function
+
+        Args:
+            ocr_func: Callable(image_path, output_path) -> (success, text, filename),
+                or Callable(image_paths, output_path) -> list of those
+
+        Returns:
+            Callable with the same signature
+        """
+        def timed_ocr(image_source, output_path=None):
+            start_time = time.perf_counter()
+            result = ocr_func(image_source, output_path)
+            elapsed = time.perf_counter() - start_time
+            if isinstance(image_source, list):
+                # A batch loads the engine once, its time is shared evenly
+                for image_path, (success, _, _) in zip(image_source, result):
+                    if success:
+                        self.record(image_path, elapsed / len(image_source))
+            elif result[0]:
+                self.record(image_source, elapsed)
+            return result
+
+        return timed_ocr
+
+    def save(self) -> None:
+        """Write the history, keeping the OCR_TIMINGS_MAX_FILES most recent files"""
+        with self._lock:
+            files = dict(list(self._files.items())[-OCR_TIMINGS_MAX_FILES:])
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.history_path)), exist_ok=True)
+            temp_path = f"{self.history_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"files": files}, f)
+            os.replace(temp_path, self.history_path)
+        except OSError as e:
+            logging.warning(f"Could not save OCR timings to {self.history_path}: {e}")
+
+
+def order_longest_first(image_files: Iterable[Path], history: Optional[OcrTimingHistory] = None) -> List[Path]:
+    """
+    Sort images by expected OCR time, longest first
+
+    Submitted in this order, the largest images start right away instead of
+    stretching the end of the run while the other workers sit idle. Only the
+    file headers are read.
+
+    Args:
+        image_files: Image file paths
+        history: Optional timings of earlier runs to weight the estimates with
+
+    Returns:
+        List[Path]: The images, most expensive first; equal estimates keep their order
+    """
+    costs = {}
+    for image_path in image_files:
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            costs[image_path] = 0.0
+            continue
+        megapixels = get_megapixels(image_path)
+        if history:
+            costs[image_path] = history.estimate(image_path, megapixels, stat)
+        else:
+            costs[image_path] = estimate_ocr_seconds(megapixels, stat.st_size)
+    return sorted(costs, key=costs.get, reverse=True)
+
+
+def iter_longest_first(
+    image_files: Iterable[Path],
+    history: Optional[OcrTimingHistory] = None,
+    first_window: int = OCR_SCHEDULE_FIRST_WINDOW,
+    window: int = OCR_SCHEDULE_WINDOW
+) -> Iterator[Path]:
+    """
+    Order a stream of images longest first, in windows of growing size
+
+    The first window is small, so the workers get their first images as soon
+    as the scan has found a few; every following window doubles, up to
+    `window` images, so larger runs are still ordered across many files.
+
+    Args:
+        image_files: Image file paths, consumed lazily
+        history: Optional timings of earlier runs to weight the estimates with
+        first_window: Number of images ordered together first, e.g. twice the workers
+        window: Largest number of images ordered together
+
+    Yields:
+        Path: The images, most expensive first within each window
+    """
+    image_files = iter(image_files)
+    size = max(1, min(first_window, window))
+    while True:
+        chunk = list(islice(image_files, size))
+        if not chunk:
+            return
+        yield from order_longest_first(chunk, history)
+        size = min(size * 2, max(1, window))
@@ -0,0 +1,271 @@
+"""
+OCR Timeouts Module for sizing tesseract timeouts to the image and retrying timed-out images
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from constants import (OCR_MAX_RETRIES, OCR_RETRY_SCALE,
+                       OCR_SECONDS_PER_MEGAPIXEL, OCR_THROUGHPUT_SMOOTHING,
+                       OCR_TIMEOUT_MAX_SECONDS, OCR_TIMEOUT_MIN_SECONDS,
+                       OCR_TIMEOUT_SAFETY_FACTOR, OCR_TIMEOUT_SECONDS)
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def get_megapixels(image_path: Path) -> Optional[float]:
+    """
+    Image size in megapixels, read from the file header
+
+    Args:
+        image_path: Path to image file
+
+    Returns:
+        Optional[float]: Megapixels, or None if Pillow cannot read the file
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(image_path) as image:
+            width, height = image.size
+        return width * height / 1_000_000
+    except Exception:
+        return None
+
+
+class AdaptiveOcrTimeouts:
+    """
+    Per-image OCR timeouts derived from image size and observed throughput.
+
+    The expected OCR time of an image is its megapixels times a seconds-per-
+    megapixel rate, an exponentially weighted moving average over the images
+    finished so far, so the timeouts follow the speed of the host under the
+    current load. An image that times out is retried a bounded number of times
+    with a cheaper configuration, at a lower resolution each time. Timeouts and
+    retries are counted per file for the run summary. Safe to share between
+    threads.
+    """
+
+    def __init__(
+        self,
+        seconds_per_megapixel: float = OCR_SECONDS_PER_MEGAPIXEL,
+        smoothing: float = OCR_THROUGHPUT_SMOOTHING,
+        safety_factor: float = OCR_TIMEOUT_SAFETY_FACTOR,
+        min_timeout: float = OCR_TIMEOUT_MIN_SECONDS,
+        max_timeout: float = OCR_TIMEOUT_MAX_SECONDS,
+        max_retries: int = OCR_MAX_RETRIES
+    ):
+        """
+        Initialize the timeout policy
+
+        Args:
+            seconds_per_megapixel: Initial estimate of the OCR rate
+            smoothing: Weight of the newest measurement in the moving average
+            safety_factor: Timeout as a multiple of the expected OCR time
+            min_timeout: Lower bound for any timeout in seconds
+            max_timeout: Upper bound for any timeout in seconds
+            max_retries: Retries after a timeout, each with a cheaper configuration
+        """
+        self.seconds_per_megapixel = seconds_per_megapixel
+        self.smoothing = smoothing
+        self.safety_factor = safety_factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.max_retries = max(0, max_retries)
+        self._lock = threading.Lock()
+        # image path -> {"timeouts": int, "retries": int, "recovered": bool}
+        self._files: Dict[str, Dict] = {}
+        # Whether the last OCR of each thread ran at a reduced resolution
+        self._local = threading.local()
+
+    def get_timeout(self, megapixels: Optional[float]) -> float:
+        """
+        Timeout for an image
+
+        Args:
+            megapixels: Image size, or None if unknown
+
+        Returns:
+            float: Timeout in seconds
+        """
+        if megapixels is None:
+            return OCR_TIMEOUT_SECONDS
+        expected = megapixels * self.seconds_per_megapixel
+        return min(self.max_timeout, max(self.min_timeout, expected * self.safety_factor))
+
+    def record(self, megapixels: Optional[float], seconds: float) -> None:
+        """
+        Feed an OCR duration into the throughput average
+
+        Args:
+            megapixels: Size of the image, or None if unknown (ignored)
+            seconds: OCR wall time; for a timeout, the timeout as a lower bound
+        """
+        if not megapixels:
+            return
+        rate = seconds / max(megapixels, 0.1)
+        with self._lock:
+            self.seconds_per_megapixel += self.smoothing * (rate - self.seconds_per_megapixel)
+
+    def _note(self, path: str, event: str) -> None:
+        """Count a timeout or retry of a file, or mark it as recovered"""
+        with self._lock:
+            counts = self._files.setdefault(path, {"timeouts": 0, "retries": 0, "recovered": False})
+            if event == "recovered":
+                counts["recovered"] = True
+            else:
+                counts[event] += 1
+
+    def wrap(
+        self,
+        ocr_func: Callable,
+        retry_func: Optional[Callable] = None,
+        megapixel_limit: Optional[float] = None
+    ) -> Callable:
+        """
+        Apply the policy to an OCR function
+
+        Args:
+            ocr_func: Callable(image_path, output_path, timeout=...) -> (success, text, filename)
+            retry_func: Cheaper OCR function used after a timeout, with the
+                signature ocr_func(image_path, output_path, timeout=..., max_megapixels=...);
+                None disables retries
+            megapixel_limit: Resolution ocr_func downscales images to, if any
+
+        Returns:
+            Callable with the signature of run_tesseract_optimized
+        """
+        def timed_ocr(image_path, output_path=None):
+            self._local.retried = False
+            filename = image_path.name
+            # Files are told apart by path, images in different directories may share a name
+            key = str(image_path)
+            megapixels = get_megapixels(image_path)
+            if megapixels is not None and megapixel_limit:
+                megapixels = min(megapixels, megapixel_limit)
+
+            timeout = self.get_timeout(megapixels)
+            result, timed_out = self._attempt(ocr_func, image_path, output_path, megapixels, timeout)
+            if not timed_out:
+                return result
+
+            for _ in range(self.max_retries if retry_func and megapixels else 0):
+                megapixels *= OCR_RETRY_SCALE
+                timeout = self.get_timeout(megapixels)
+                logging.warning(
+                    f"Retrying {filename} at {megapixels:.1f} megapixels with a {timeout:.0f}s timeout"
+                )
+                self._note(key, "retries")
+                self._local.retried = True
+                result, timed_out = self._attempt(
+                    retry_func, image_path, output_path, megapixels, timeout, max_megapixels=megapixels
+                )
+                if result[0]:
+                    self._note(key, "recovered")
+                if not timed_out:
+                    break
+            return result
+
+        return timed_ocr
+
+    def last_result_retried(self) -> bool:
+        """
+        Check if the last OCR on this thread returned the text of a reduced-resolution retry
+
+        That text is poorer than a full-resolution OCR of the image, so it must
+        not be cached as if it were one.
+
+        Returns:
+            bool: True if the last result of the wrapped function came from a retry
+        """
+        return getattr(self._local, "retried", False)
+
+    def wrap_batch(self, batch_func: Callable) -> Callable:
+        """
+        Give every image of a batch its own timeout, and the batch their sum
+
+        Batches are not retried; images of a batch that failed are OCR'd one by
+        one by batch_func, each with its own timeout.
+
+        Args:
+            batch_func: Callable(image_paths, output_path, timeouts=...) -> list of
+                (success, text, filename)
+
+        Returns:
+            Callable(image_paths, output_path) with the signature of run_tesseract_batch
+        """
+        def timed_batch(image_paths, output_path=None):
+            megapixels = [get_megapixels(image_path) for image_path in image_paths]
+            start_time = time.perf_counter()
+            results = batch_func(
+                image_paths, output_path, timeouts=[self.get_timeout(size) for size in megapixels]
+            )
+            elapsed = time.perf_counter() - start_time
+            # The rate is only learned from batches that were read in one go
+            if None not in megapixels and all(success for success, _, _ in results):
+                self.record(sum(megapixels), elapsed)
+            return results
+
+        return timed_batch
+
+    def _attempt(
+        self,
+        ocr_func: Callable,
+        image_path: Path,
+        output_path: Optional[str],
+        megapixels: Optional[float],
+        timeout: float,
+        **kwargs
+    ) -> Tuple[Tuple[bool, Optional[str], str], bool]:
+        """Run one OCR attempt, returning its result and whether it timed out"""
+        start_time = time.perf_counter()
+        result = ocr_func(image_path, output_path, timeout=timeout, **kwargs)
+        elapsed = time.perf_counter() - start_time
+        if result[0]:
+            self.record(megapixels, elapsed)
+            return result, False
+        # Other failures return early; only the timeout takes the full time
+        if elapsed < timeout:
+            return result, False
+        logging.warning(f"OCR of {image_path.name} timed out after {timeout:.0f}s")
+        self.record(megapixels, timeout)
+        self._note(str(image_path), "timeouts")
+        return result, True
+
+    def summary(self) -> str:
+        """
+        Describe the timeouts of the run
+
+        Returns:
+            str: Timeout, retry and recovery counts and the learned OCR rate
+        """
+        with self._lock:
+            timeouts = sum(counts["timeouts"] for counts in self._files.values())
+            retries = sum(counts["retries"] for counts in self._files.values())
+            recovered = sum(1 for counts in self._files.values() if counts["recovered"])
+            rate = self.seconds_per_megapixel
+        return (
+            f"{timeouts} timeout(s), {retries} retry(ies), {recovered} file(s) recovered; "
+            f"{rate:.2f}s per megapixel"
+        )
+
+    def file_report(self) -> List[str]:
+        """
+        Per-file timeout and retry counts
+
+        Returns:
+            List[str]: One line per file that timed out
+        """
+        with self._lock:
+            files = sorted(self._files.items())
+        return [
+            f"{path}: {counts['timeouts']} timeout(s), {counts['retries']} retry(ies), "
+            f"{'recovered' if counts['recovered'] else 'failed'}"
+            for path, counts in files
+        ]
@@ -0,0 +1,379 @@
+"""
+OCR Workers Module for sizing OCR parallelism to the host and running OCR in worker processes
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from constants import (DEFAULT_OCR_THREADS_PER_WORKER, OCR_PROFILE_FILENAME,
+                       OCR_PROFILE_PATH_VAR, OCR_THREAD_LIMIT_VAR,
+                       OCR_WORKER_MEMORY_MB)
+from ocr_engine import TesseractEnginePool, is_engine_pool_available
+
+# OCR function of the current worker process, set by _init_worker
+_worker_ocr_func = None
+
+
+def get_available_cores() -> int:
+    """
+    Number of CPU cores this process may run on
+
+    Returns:
+        int: Cores in the CPU affinity mask, or the total core count
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 4
+
+
+def get_available_memory_mb() -> Optional[int]:
+    """
+    Memory that can be used without swapping
+
+    Returns:
+        Optional[int]: Available memory in MB, or None if it cannot be determined
+    """
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def get_thread_limit(threads_per_worker: Optional[int] = None) -> int:
+    """
+    Resolve the number of OpenMP threads each Tesseract worker may use
+
+    Args:
+        threads_per_worker: Explicit limit, or None to use OMP_THREAD_LIMIT if set
+
+    Returns:
+        int: Threads per worker (at least 1)
+    """
+    if threads_per_worker:
+        return max(1, threads_per_worker)
+    try:
+        return max(1, int(os.environ[OCR_THREAD_LIMIT_VAR]))
+    except (KeyError, ValueError):
+        return DEFAULT_OCR_THREADS_PER_WORKER
+
+
+def plan_ocr_workers(
+    threads_per_worker: Optional[int] = None,
+    memory_per_worker_mb: int = OCR_WORKER_MEMORY_MB
+) -> int:
+    """
+    Number of OCR workers that fills the cores without oversubscribing them
+
+    Args:
+        threads_per_worker: OpenMP threads per worker (see get_thread_limit)
+        memory_per_worker_mb: Peak memory budgeted for one worker
+
+    Returns:
+        int: Number of workers, bounded by cores / threads and by available memory
+    """
+    threads = get_thread_limit(threads_per_worker)
+    workers = max(1, get_available_cores() // threads)
+
+    available_mb = get_available_memory_mb()
+    if available_mb is not None:
+        memory_workers = max(1, available_mb // memory_per_worker_mb)
+        if memory_workers < workers:
+            logging.debug(
+                f"Limiting OCR workers to {memory_workers} by available memory ({available_mb} MB)"
+            )
+            workers = memory_workers
+
+    return workers
+
+
+def get_tuning_candidates(
+    threads_options: Optional[List[int]] = None,
+    workers_options: Optional[List[int]] = None
+) -> List[Tuple[int, int]]:
+    """
+    Worker and thread combinations to measure when calibrating a host
+
+    Without explicit worker counts, each thread setting is tried at half, at
+    and above the planned worker count, so both under- and oversubscription
+    are measured.
+
+    Args:
+        threads_options: Threads per worker to try (default: 1, 2 and 4, up to the cores)
+        workers_options: Worker counts to try (default: derived from the plan)
+
+    Returns:
+        List[Tuple[int, int]]: (workers, threads_per_worker) pairs
+    """
+    cores = get_available_cores()
+    threads_options = threads_options or [t for t in (1, 2, 4) if t <= cores]
+
+    candidates = []
+    for threads in threads_options:
+        if workers_options:
+            options = workers_options
+        else:
+            planned = plan_ocr_workers(threads)
+            options = sorted({max(1, planned // 2), planned, planned + max(1, planned // 2)})
+        candidates.extend((workers, threads) for workers in options)
+    return candidates
+
+
+def get_profile_path() -> str:
+    """
+    Location of the OCR tuning profile
+
+    Returns:
+        str: MENU_OCR_PROFILE if set, otherwise ~/.menu_ocr_profile.json
+    """
+    return os.environ.get(OCR_PROFILE_PATH_VAR) or os.path.join(
+        os.path.expanduser("~"), OCR_PROFILE_FILENAME
+    )
+
+
+def _read_profile(profile_path: str) -> Dict:
+    """Read the profile file, returning an empty profile if it is missing or invalid"""
+    try:
+        with open(profile_path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+        return profile if isinstance(profile, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable OCR profile {profile_path}: {e}")
+        return {}
+
+
+def load_ocr_profile(engine: str) -> Optional[Dict]:
+    """
+    Tuned OCR settings for an engine on this host
+
+    A profile tuned on another host, or before the number of available cores
+    changed, is ignored.
+
+    Args:
+        engine: One of OCR_ENGINES
+
+    Returns:
+        Optional[Dict]: Settings with "workers" and "threads_per_worker", or None
+    """
+    profile_path = get_profile_path()
+    profile = _read_profile(profile_path)
+    if not profile:
+        return None
+    if profile.get("host") != platform.node() or profile.get("cores") != get_available_cores():
+        logging.debug(f"OCR profile {profile_path} was tuned for different hardware, ignoring it")
+        return None
+
+    settings = profile.get("engines", {}).get(engine)
+    if not settings or not settings.get("workers") or not settings.get("threads_per_worker"):
+        return None
+    return settings
+
+
+def save_ocr_profile(engine: str, settings: Dict) -> str:
+    """
+    Store tuned OCR settings for an engine, keeping those of other engines
+
+    Args:
+        engine: One of OCR_ENGINES
+        settings: Settings with at least "workers" and "threads_per_worker"
+
+    Returns:
+        str: Path of the profile file
+    """
+    profile_path = get_profile_path()
+    profile = _read_profile(profile_path)
+    if profile.get("host") != platform.node() or profile.get("cores") != get_available_cores():
+        profile = {}
+
+    profile["host"] = platform.node()
+    profile["cores"] = get_available_cores()
+    profile.setdefault("engines", {})[engine] = dict(settings, tuned_at=datetime.now().isoformat())
+
+    os.makedirs(os.path.dirname(os.path.abspath(profile_path)), exist_ok=True)
+    with open(profile_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    return profile_path
+
+
+@contextmanager
+def ocr_thread_limit(threads_per_worker: Optional[int] = None):
+    """
+    Limit the OpenMP threads of every Tesseract started inside the block
+
+    The limit is exported as OMP_THREAD_LIMIT, which tesseract child processes
+    and newly spawned worker processes inherit. The previous value is restored
+    on exit.
+
+    Args:
+        threads_per_worker: Threads per worker (see get_thread_limit)
+    """
+    previous = os.environ.get(OCR_THREAD_LIMIT_VAR)
+    os.environ[OCR_THREAD_LIMIT_VAR] = str(get_thread_limit(threads_per_worker))
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop(OCR_THREAD_LIMIT_VAR, None)
+        else:
+            os.environ[OCR_THREAD_LIMIT_VAR] = previous
+
+
+def get_worker_context(preload_module: Optional[str] = None):
+    """
+    Multiprocessing context for OCR workers
+
+    Workers are forked from a clean single-threaded fork server. The server
+    imports `preload_module` once, so workers inherit its (heavy) imports
+    instead of importing them again one by one. Platforms without a fork
+    server (Windows) spawn a fresh interpreter per worker.
+
+    Args:
+        preload_module: Module to import in the fork server
+
+    Returns:
+        multiprocessing context
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    if preload_module:
+        context.set_forkserver_preload([preload_module])
+    return context
+
+
+def get_module_name(func: Callable) -> Optional[str]:
+    """
+    Importable name of the module defining a function
+
+    Args:
+        func: Module-level function
+
+    Returns:
+        Optional[str]: Module name; for a script run as __main__ its file name
+    """
+    module = func.__module__
+    if module != "__main__":
+        return module
+    main_file = getattr(sys.modules["__main__"], "__file__", None)
+    return os.path.splitext(os.path.basename(main_file))[0] if main_file else None
+
+
+def _init_worker(fallback_ocr_func: Callable, threads_per_worker: int, preprocess: bool) -> None:
+    """Set up the OCR function of a newly started worker process"""
+    global _worker_ocr_func
+    os.environ[OCR_THREAD_LIMIT_VAR] = str(threads_per_worker)
+    if is_engine_pool_available():
+        _worker_ocr_func = TesseractEnginePool(preprocess=preprocess).run
+    else:
+        _worker_ocr_func = fallback_ocr_func
+
+
+def _run_in_worker(
+    image_path: Path,
+    output_path: Optional[str],
+    timeout: Optional[float]
+) -> Tuple[bool, Optional[str], str]:
+    """Run OCR for one image inside a worker process"""
+    if timeout is None:
+        return _worker_ocr_func(image_path, output_path)
+    return _worker_ocr_func(image_path, output_path, timeout=timeout)
+
+
+class OcrProcessPool:
+    """
+    Pool of OCR worker processes with a fixed OpenMP thread budget each.
+
+    Every worker keeps a warm in-process Tesseract engine when tesserocr is
+    installed and otherwise runs the fallback OCR function (one tesseract
+    subprocess per image). Workers never fork from the parent itself (see
+    get_worker_context), so they do not inherit its threads or network clients. OpenMP reads
+    OMP_THREAD_LIMIT when the library loads, so create and use the pool inside
+    `ocr_thread_limit` for the limit to reach an in-process engine as well.
+    `run` may be called from any number of threads; each call blocks until a
+    worker has processed the image.
+    """
+
+    def __init__(
+        self,
+        fallback_ocr_func: Callable,
+        workers: int,
+        threads_per_worker: Optional[int] = None,
+        preprocess: bool = False
+    ):
+        """
+        Start the worker pool
+
+        Args:
+            fallback_ocr_func: Picklable module-level OCR function used when
+                tesserocr is unavailable, with the signature
+                (image_path, output_path) -> (success, text, filename)
+            workers: Number of worker processes
+            threads_per_worker: OpenMP threads per worker (see get_thread_limit)
+            preprocess: Preprocess images in the in-process engine; the fallback
+                function is expected to preprocess on its own
+        """
+        self.workers = max(1, workers)
+        self.threads_per_worker = get_thread_limit(threads_per_worker)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=get_worker_context(get_module_name(fallback_ocr_func)),
+            initializer=_init_worker,
+            initargs=(fallback_ocr_func, self.threads_per_worker, preprocess)
+        )
+        logging.debug(
+            f"Started OCR process pool: {self.workers} worker(s), "
+            f"{self.threads_per_worker} thread(s) each"
+        )
+
+    def run(
+        self,
+        image_path: Path,
+        output_path: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[bool, Optional[str], str]:
+        """
+        OCR a single image in a worker process
+
+        Args:
+            image_path: Path to image file
+            output_path: Optional output directory
+            timeout: Tesseract timeout in seconds, passed to the fallback OCR
+                function (the in-process engine cannot be interrupted, so leave
+                it unset when tesserocr is installed)
+
+        Returns:
+            Tuple of (success, text_content, filename)
+        """
+        try:
+            return self._executor.submit(_run_in_worker, image_path, output_path, timeout).result()
+        except Exception as e:
+            logging.warning(f"OCR worker failed for {image_path.name}: {e}")
+            return False, None, image_path.name
+
+    def close(self) -> None:
+        """Stop the worker processes"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
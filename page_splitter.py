@@ -0,0 +1,469 @@
+"""
+Page Splitter Module for OCR'ing the pages of multi-page files and the tiles of oversized images in parallel
+"""
+
+import difflib
+import logging
+import math
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from constants import (MULTI_PAGE_EXTENSIONS, PDF_COUNT_WORKERS, PDF_RENDER_DPI,
+                       TESSERACT_PAGE_SEPARATOR, TILE_MEGAPIXELS,
+                       TILE_OVERLAP_MAX_LINES, TILE_OVERLAP_PIXELS,
+                       TILE_THRESHOLD_MEGAPIXELS)
+from image_formats import convert_to_png, needs_conversion
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+@lru_cache(maxsize=None)
+def is_pdf_rendering_available() -> bool:
+    """
+    Check if poppler's pdfinfo and pdftoppm are installed (warns once if they are not)
+
+    Returns:
+        bool: True if PDF pages can be counted and rendered, False otherwise
+    """
+    if shutil.which("pdftoppm") and shutil.which("pdfinfo"):
+        return True
+    logging.warning(
+        "PDF support requires poppler (pdfinfo and pdftoppm), PDF files are passed to tesseract as-is"
+    )
+    return False
+
+
+def _get_pdf_page_count(path: Path) -> int:
+    """Number of pages of a PDF according to pdfinfo"""
+    result = subprocess.run(["pdfinfo", str(path)], stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=30)
+    match = re.search(rb"^Pages:\s+(\d+)", result.stdout, re.MULTILINE)
+    if not match:
+        raise ValueError(result.stderr.decode(errors="replace").strip() or "no page count")
+    return int(match.group(1))
+
+
+def get_page_count(path: Path) -> int:
+    """
+    Number of pages of a PDF or TIFF file
+
+    Args:
+        path: Path to image file
+
+    Returns:
+        int: Page count; 1 for other formats and for files whose pages cannot be
+            split here (tesseract then receives the file as a whole)
+    """
+    suffix = path.suffix.lower()
+    if suffix not in MULTI_PAGE_EXTENSIONS:
+        return 1
+    try:
+        if suffix == ".pdf":
+            return max(1, _get_pdf_page_count(path)) if is_pdf_rendering_available() else 1
+        if Image is None:
+            return 1
+        with Image.open(path) as image:
+            return max(1, getattr(image, "n_frames", 1))
+    except Exception as e:
+        logging.warning(f"Could not count the pages of {path.name}: {e}")
+        return 1
+
+
+def render_page(path: Path, page_number: int, work_dir: str) -> Path:
+    """
+    Write one page of a PDF or TIFF file as a PNG image
+
+    Args:
+        path: Path to the PDF or TIFF file
+        page_number: Page to render, starting at 1
+        work_dir: Directory to write the page image to
+
+    Returns:
+        Path: Path of the page image
+    """
+    output_base = os.path.join(work_dir, f"{path.stem}-page{page_number:04d}")
+    if path.suffix.lower() == ".pdf":
+        subprocess.run(
+            [
+                "pdftoppm", "-r", str(PDF_RENDER_DPI), "-gray", "-png", "-singlefile",
+                "-f", str(page_number), "-l", str(page_number), str(path), output_base
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=120,
+            check=True
+        )
+    else:
+        with Image.open(path) as image:
+            image.seek(page_number - 1)
+            image.save(f"{output_base}.png", compress_level=1)
+    return Path(f"{output_base}.png")
+
+
+def get_tile_bands(
+    width: int,
+    height: int,
+    tile_megapixels: float = TILE_MEGAPIXELS,
+    overlap: int = TILE_OVERLAP_PIXELS
+) -> List[Tuple[int, int]]:
+    """
+    Split an image into overlapping full-width bands of about `tile_megapixels`
+
+    Bands span the whole width so no text line is cut sideways and the tile
+    texts can simply be stacked; the overlap keeps every line that crosses a
+    band boundary whole in at least one band.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        tile_megapixels: Target band size in megapixels
+        overlap: Rows shared by neighbouring bands
+
+    Returns:
+        List[Tuple[int, int]]: (top, bottom) rows of each band, top to bottom
+    """
+    band_count = math.ceil(width * height / (tile_megapixels * 1_000_000))
+    step = max(math.ceil(height / max(1, band_count)), 2 * overlap)
+    # A band starting within the overlap of the previous one would be redundant
+    return [(top, min(height, top + step + overlap)) for top in range(0, max(1, height - overlap), step)]
+
+
+def _normalize_line(line: str) -> str:
+    """Reduce a line to lowercase letters and digits, for comparing OCR output"""
+    return re.sub(r"[^a-z0-9]", "", line.lower())
+
+
+def merge_overlapping_texts(texts: List[str], max_lines: int = TILE_OVERLAP_MAX_LINES) -> str:
+    """
+    Stack the texts of overlapping bands, dropping lines read twice
+
+    The last lines of the text so far are aligned with the first lines of the
+    next band. Lines after the aligned block in the upper band and before it
+    in the lower band were cut by a band edge and are dropped as well.
+
+    Args:
+        texts: OCR texts of the bands, top to bottom
+        max_lines: Lines at each edge considered for the alignment
+
+    Returns:
+        str: Merged text
+    """
+    merged: List[str] = []
+    for text in texts:
+        lines = [line for line in text.strip(TESSERACT_PAGE_SEPARATOR).splitlines() if line.strip()]
+        tail_start = max(0, len(merged) - max_lines)
+        tail = [_normalize_line(line) for line in merged[tail_start:]]
+        head = [_normalize_line(line) for line in lines[:max_lines]]
+
+        match = difflib.SequenceMatcher(None, tail, head, autojunk=False).find_longest_match(
+            0, len(tail), 0, len(head)
+        )
+        # Short matches (a lone price, say) are too likely to be coincidences
+        if match.size and len("".join(head[match.b:match.b + match.size])) >= 8:
+            del merged[tail_start + match.a + match.size:]
+            lines = lines[match.b + match.size:]
+        merged.extend(lines)
+    return "\n".join(merged) + "\n"
+
+
+class MultiPageDocument:
+    """
+    A PDF or TIFF file whose pages are OCR'd as separate jobs.
+
+    Every page is rendered to its own temporary image, OCR'd and deleted again,
+    so pages of one document can run on all workers at once. `ocr_page` may be
+    called from any thread; the call that completes the last page returns the
+    text of the whole document with the pages in order.
+    """
+
+    part_name = "page"
+
+    def __init__(self, path: Path, page_count: int, work_dir: str):
+        """
+        Initialize the document
+
+        Args:
+            path: Path to the PDF or TIFF file
+            page_count: Number of pages
+            work_dir: Directory for the temporary page images
+        """
+        self.path = path
+        self.page_count = page_count
+        self.work_dir = work_dir
+        self._texts: List[Optional[str]] = [None] * page_count
+        self._pending = page_count
+        self._lock = threading.Lock()
+        # OCR time of all pages together
+        self.seconds = 0.0
+
+    def ocr_page(self, ocr_func: Callable, page_number: int) -> Optional[Tuple[bool, Optional[str]]]:
+        """
+        Render and OCR one page
+
+        Args:
+            ocr_func: Callable(image_path, output_path) -> (success, text, filename)
+            page_number: Page to OCR, starting at 1
+
+        Returns:
+            Optional[Tuple[bool, Optional[str]]]: None while other pages are
+                outstanding, otherwise (success, text) of the whole document, see
+                `join`; failed pages are left empty
+        """
+        text = None
+        start_time = time.perf_counter()
+        page_dir = tempfile.mkdtemp(dir=self.work_dir)
+        try:
+            success, text, _ = ocr_func(self.render(page_number, page_dir), None)
+            if not success:
+                text = None
+        except Exception as e:
+            logging.warning(f"Failed to OCR {self.part_name} {page_number} of {self.path.name}: {e}")
+        finally:
+            shutil.rmtree(page_dir, ignore_errors=True)
+
+        with self._lock:
+            self._texts[page_number - 1] = text
+            self.seconds += time.perf_counter() - start_time
+            self._pending -= 1
+            if self._pending:
+                return None
+
+        failed = [number for number, text in enumerate(self._texts, 1) if text is None]
+        if len(failed) == self.page_count:
+            return False, None
+        if failed:
+            logging.warning(
+                f"OCR failed for {self.part_name}(s) {', '.join(map(str, failed))} of {self.path.name}"
+            )
+        return True, self.join([text or "" for text in self._texts])
+
+    def render(self, page_number: int, page_dir: str) -> Path:
+        """
+        Write one page as an image file
+
+        Args:
+            page_number: Page to render, starting at 1
+            page_dir: Directory to write the image to
+
+        Returns:
+            Path: Path of the page image
+        """
+        return render_page(self.path, page_number, page_dir)
+
+    def join(self, texts: List[str]) -> str:
+        """
+        Combine the page texts into the document text
+
+        Args:
+            texts: OCR text of every page, in page order
+
+        Returns:
+            str: Pages separated by form feeds
+        """
+        return TESSERACT_PAGE_SEPARATOR.join(text.rstrip(TESSERACT_PAGE_SEPARATOR) for text in texts)
+
+
+class TiledImage(MultiPageDocument):
+    """
+    An oversized image OCR'd as overlapping bands (see get_tile_bands).
+
+    Each band is OCR'd as a separate job like the pages of a document, and the
+    band texts are merged into one page with duplicated lines removed.
+    """
+
+    part_name = "tile"
+
+    def __init__(self, path: Path, bands: List[Tuple[int, int]], work_dir: str):
+        """
+        Initialize the tiled image
+
+        Args:
+            path: Path to image file
+            bands: (top, bottom) rows of each band
+            work_dir: Directory for the temporary tile images
+        """
+        super().__init__(path, len(bands), work_dir)
+        self.bands = bands
+
+    def render(self, page_number: int, page_dir: str) -> Path:
+        """Crop one band to a PNG image"""
+        top, bottom = self.bands[page_number - 1]
+        tile_path = Path(page_dir, f"{self.path.stem}-tile{page_number:04d}.png")
+        with Image.open(self.path) as image:
+            image.crop((0, top, image.width, bottom)).save(tile_path, compress_level=1)
+        return tile_path
+
+    def join(self, texts: List[str]) -> str:
+        """Merge the band texts, dropping the lines read twice in the overlaps"""
+        return merge_overlapping_texts(texts)
+
+
+class ConvertedImage(MultiPageDocument):
+    """
+    An image in a format tesseract cannot read, OCR'd as one page converted to PNG.
+
+    The conversion runs as the page job, on an OCR worker, so it never holds up
+    the submission of other images.
+    """
+
+    part_name = "converted image"
+
+    def __init__(self, path: Path, work_dir: str):
+        """
+        Initialize the converted image
+
+        Args:
+            path: Path to image file
+            work_dir: Directory for the temporary PNG image
+        """
+        super().__init__(path, 1, work_dir)
+
+    def render(self, page_number: int, page_dir: str) -> Path:
+        """Convert the image to PNG"""
+        return convert_to_png(self.path, page_dir)
+
+
+def is_rendered_pdf(path: Path) -> bool:
+    """
+    Check if a file is a PDF whose pages are rendered to images for OCR
+
+    Args:
+        path: Path to image file
+
+    Returns:
+        bool: True for PDFs when poppler is installed
+    """
+    return path.suffix.lower() == ".pdf" and is_pdf_rendering_available()
+
+
+def get_image_bands(path: Path) -> List[Tuple[int, int]]:
+    """
+    Tile bands of an image larger than TILE_THRESHOLD_MEGAPIXELS
+
+    Args:
+        path: Path to image file
+
+    Returns:
+        List[Tuple[int, int]]: Bands, or an empty list if the image is not
+            tiled (small enough, or not readable by Pillow)
+    """
+    if Image is None:
+        return []
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+    except Exception:
+        return []
+    if width * height <= TILE_THRESHOLD_MEGAPIXELS * 1_000_000:
+        return []
+    return get_tile_bands(width, height)
+
+
+def open_document(
+    path: Path,
+    work_dir: str,
+    tile: bool = False,
+    convert: bool = False
+) -> Optional[MultiPageDocument]:
+    """
+    Split a file into page or tile jobs if it is a PDF, has more than one page or is oversized
+
+    Counting the pages of a PDF runs pdfinfo, so call this on a worker thread
+    (see iter_documents).
+
+    Args:
+        path: Path to image file
+        work_dir: Directory for the temporary page images
+        tile: Whether to split images above TILE_THRESHOLD_MEGAPIXELS into tiles
+        convert: Whether to convert images tesseract cannot read to PNG first
+            (see image_formats)
+
+    Returns:
+        Optional[MultiPageDocument]: The document, or None for images OCR'd as a whole;
+            a PDF without pages, or whose pages cannot be counted, is a document
+            with a page_count of 0 that callers report as failed
+    """
+    if convert and needs_conversion(path):
+        logging.debug(f"Converting {path.name} to PNG for OCR")
+        return ConvertedImage(path, work_dir)
+
+    if is_rendered_pdf(path):
+        try:
+            page_count = _get_pdf_page_count(path)
+        except Exception as e:
+            # Tesseract cannot read the PDF as a whole either
+            logging.error(f"❌ Could not count the pages of {path.name}: {e}")
+            return MultiPageDocument(path, 0, work_dir)
+        if page_count < 1:
+            logging.error(f"❌ {path.name} has no pages")
+            return MultiPageDocument(path, 0, work_dir)
+        # Tesseract cannot read PDFs, so even a single page is rendered
+        logging.debug(f"Splitting {path.name} into {page_count} pages")
+        return MultiPageDocument(path, page_count, work_dir)
+
+    page_count = get_page_count(path)
+    if page_count > 1:
+        logging.debug(f"Splitting {path.name} into {page_count} pages")
+        return MultiPageDocument(path, page_count, work_dir)
+
+    bands = get_image_bands(path) if tile else []
+    if len(bands) > 1:
+        logging.debug(f"Splitting {path.name} into {len(bands)} tiles")
+        return TiledImage(path, bands, work_dir)
+    return None
+
+
+
+def iter_documents(
+    image_files: Iterable[Path],
+    work_dir: str,
+    tile: bool = False,
+    convert: bool = False
+) -> Iterator[Tuple[Path, Optional[MultiPageDocument]]]:
+    """
+    Open the documents of a stream of files (see open_document)
+
+    PDFs are opened on PDF_COUNT_WORKERS background threads, so a slow pdfinfo
+    does not hold up the files behind it; they are yielded once counted.
+
+    Args:
+        image_files: Paths of the image files
+        work_dir: Directory for the temporary page images
+        tile: Whether to split oversized images into tiles
+        convert: Whether to convert images tesseract cannot read to PNG first
+
+    Yields:
+        Tuple[Path, Optional[MultiPageDocument]]: Each file with its document
+    """
+    def open_pdf(path: Path) -> Tuple[Path, Optional[MultiPageDocument]]:
+        return path, open_document(path, work_dir, tile, convert)
+
+    with ThreadPoolExecutor(max_workers=PDF_COUNT_WORKERS, thread_name_prefix="pdf-count") as executor:
+        pending = set()
+        for path in image_files:
+            if is_rendered_pdf(path) and not (convert and needs_conversion(path)):
+                if len(pending) >= PDF_COUNT_WORKERS * 2:
+                    wait(pending, return_when=FIRST_COMPLETED)
+                pending.add(executor.submit(open_pdf, path))
+            else:
+                yield path, open_document(path, work_dir, tile, convert)
+
+            for future in [future for future in pending if future.done()]:
+                pending.discard(future)
+                yield future.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
@@ -0,0 +1,321 @@
+"""
+Pipeline Module for streaming menu images through OCR, LLM conversion and export
+"""
+
+import logging
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from page_splitter import MultiPageDocument, iter_documents
+from run_journal import RunJournal
+
+# Marks the end of the work items on a stage queue
+_STOP = object()
+
+
+class MenuConversionPipeline:
+    """
+    Staged OCR -> LLM -> export pipeline connected by bounded queues.
+
+    OCR workers feed a bounded queue that the LLM workers drain, and the LLM
+    workers feed a bounded queue drained by the export workers, so all three
+    stages overlap. When a downstream stage falls behind, the full queue blocks
+    the stage before it and no new images are submitted for OCR, which keeps
+    memory flat regardless of how many images are in the input. The pages of
+    multi-page PDF and TIFF files are OCR'd as separate tasks and reach the
+    LLM stage as one text, with pages separated by form feeds. Duplicates of
+    an image are not OCR'd or converted; they are exported with its data, and
+    count as failed when it fails. A resumed image whose duplicates were not
+    all exported is converted again (from the caches) to export them.
+    """
+
+    def __init__(
+        self,
+        ocr_func: Callable,
+        convert_func: Callable,
+        export_func: Callable,
+        ocr_workers: int = 4,
+        llm_workers: int = 1,
+        export_workers: int = 1,
+        queue_size: int = 32,
+        tile: bool = False,
+        convert_formats: bool = False,
+        journal: Optional[RunJournal] = None,
+        duplicates: Optional[Dict[Path, List[Path]]] = None
+    ):
+        """
+        Initialize the pipeline
+
+        Args:
+            ocr_func: Callable(image_path, output_path) -> (success, text, filename);
+                if it has `run_batch` and `batch_size` attributes, images are
+                OCR'd in batches of that size
+            convert_func: Callable(ocr_text, image_path) -> (success, json_data, error)
+            export_func: Callable(image_path, json_data) -> bool
+            ocr_workers: Number of concurrent OCR workers
+            llm_workers: Number of concurrent LLM conversion workers
+            export_workers: Number of concurrent export workers
+            queue_size: Capacity of each queue between two stages
+            tile: Whether to OCR oversized images in tiles (see page_splitter)
+            convert_formats: Whether to convert images tesseract cannot read to PNG
+                (see image_formats)
+            journal: Optional run journal; finished stages are recorded in it and
+                files it reports as exported are skipped
+            duplicates: Optional image -> duplicate images exported with its data
+                (see image_dedup.find_duplicates)
+        """
+        self.ocr_func = ocr_func
+        self.batch_size = max(1, getattr(ocr_func, "batch_size", 1))
+        self.convert_func = convert_func
+        self.export_func = export_func
+        self.ocr_workers = max(1, ocr_workers)
+        self.llm_workers = max(1, llm_workers)
+        self.export_workers = max(1, export_workers)
+        self.queue_size = max(1, queue_size)
+        self.tile = tile
+        self.convert_formats = convert_formats
+        self.journal = journal
+        self.duplicates = duplicates or {}
+        # Exported images converted again only for the duplicates still missing
+        self._duplicates_only: Dict[Path, List[Path]] = {}
+
+        self._ocr_queue = queue.Queue(maxsize=self.queue_size)
+        self._export_queue = queue.Queue(maxsize=self.queue_size)
+        # Bounds the OCR tasks (images, batches or pages) submitted but not yet handed to the LLM stage
+        self._ocr_slots = threading.BoundedSemaphore(self.ocr_workers + self.queue_size)
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "images": 0,
+            "skipped": 0,
+            "ocr_succeeded": 0,
+            "ocr_failed": 0,
+            "llm_succeeded": 0,
+            "llm_failed": 0,
+            "export_succeeded": 0,
+            "export_failed": 0,
+            "duplicates_exported": 0,
+            "duplicates_failed": 0,
+        }
+
+    def _count(self, key: str) -> None:
+        """Increment a pipeline counter"""
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _get_duplicates(self, image_path) -> List[Path]:
+        """Duplicates still to be exported with the data of an image"""
+        if image_path in self._duplicates_only:
+            return self._duplicates_only[image_path]
+        return self.duplicates.get(image_path, [])
+    
+    def _fail_duplicates(self, image_path) -> None:
+        """Count the duplicates of a failed image as failed"""
+        duplicates = self._get_duplicates(image_path)
+        if not duplicates:
+            return
+        logging.error(
+            f"❌ {len(duplicates)} duplicate(s) of {image_path.name} not exported: "
+            f"{', '.join(path.name for path in duplicates)}"
+        )
+        with self._stats_lock:
+            self.stats["duplicates_failed"] += len(duplicates)
+    
+    def _record(self, image_path, stage: str) -> None:
+        """Record a finished stage in the run journal, if there is one"""
+        if self.journal:
+            self.journal.record(image_path, stage)
+
+    def _ocr_task(self, image_paths: List) -> None:
+        """Run OCR for one image or batch and hand the texts to the LLM stage"""
+        try:
+            if self.batch_size > 1:
+                results = self.ocr_func.run_batch(image_paths, None)
+            else:
+                results = [self.ocr_func(image_paths[0], None)]
+        except Exception as e:
+            logging.error(f"❌ OCR error for {', '.join(path.name for path in image_paths)}: {e}")
+            results = [(False, None, path.name) for path in image_paths]
+
+        try:
+            for image_path, (success, text, filename) in zip(image_paths, results):
+                if success and text and text.strip():
+                    self._count("ocr_succeeded")
+                    self._record(image_path, "ocr")
+                    self._ocr_queue.put((filename, text, image_path))
+                else:
+                    logging.error(f"❌ Failed to extract text from {image_path.name}")
+                    self._count("ocr_failed")
+                    self._fail_duplicates(image_path)
+        finally:
+            self._ocr_slots.release()
+
+    def _page_task(self, document: MultiPageDocument, page_number: int) -> None:
+        """Run OCR for one page and hand the document to the LLM stage after its last page"""
+        try:
+            finished = document.ocr_page(self.ocr_func, page_number)
+            if finished is None:
+                return
+            success, text = finished
+            if success and text and text.strip():
+                self._count("ocr_succeeded")
+                self._record(document.path, "ocr")
+                self._ocr_queue.put((document.path.name, text, document.path))
+            else:
+                logging.error(f"❌ Failed to extract text from {document.path.name}")
+                self._count("ocr_failed")
+                self._fail_duplicates(document.path)
+        finally:
+            self._ocr_slots.release()
+
+    def _llm_worker(self) -> None:
+        """Convert OCR text to structured data until the stop marker arrives"""
+        while True:
+            item = self._ocr_queue.get()
+            if item is _STOP:
+                return
+            filename, text, image_path = item
+            try:
+                success, json_data, error = self.convert_func(text, image_path)
+                if success and json_data:
+                    self._count("llm_succeeded")
+                    self._record(image_path, "llm")
+                    self._export_queue.put((filename, json_data, image_path))
+                else:
+                    logging.error(f"❌ Gemini conversion failed for {filename}: {error}")
+                    self._count("llm_failed")
+                    self._fail_duplicates(image_path)
+            except Exception as e:
+                logging.error(f"❌ Error processing {filename}: {e}")
+                self._count("llm_failed")
+                self._fail_duplicates(image_path)
+
+    def _export_worker(self) -> None:
+        """Export structured data until the stop marker arrives"""
+        while True:
+            item = self._export_queue.get()
+            if item is _STOP:
+                return
+            filename, json_data, image_path = item
+            # Exported by the interrupted run, only its duplicates are left
+            if image_path not in self._duplicates_only:
+                try:
+                    exported = self.export_func(image_path, json_data)
+                except Exception as e:
+                    logging.error(f"❌ Export failed for {filename}: {e}")
+                    exported = False
+                if not exported:
+                    self._count("export_failed")
+                    self._fail_duplicates(image_path)
+                    continue
+                self._count("export_succeeded")
+                self._record(image_path, "export")
+
+            for duplicate in self._get_duplicates(image_path):
+                try:
+                    exported = self.export_func(duplicate, json_data)
+                except Exception as e:
+                    logging.error(f"❌ Export failed for {duplicate.name}: {e}")
+                    exported = False
+                if exported:
+                    self._count("duplicates_exported")
+                    self._record(duplicate, "export")
+                else:
+                    self._count("duplicates_failed")
+
+    def _pending_images(self, image_files: Iterable[Path]) -> Iterator[Path]:
+        """
+        Images to convert, skipping the ones a previous run finished
+
+        Args:
+            image_files: Paths of the image files
+
+        Yields:
+            Path: Each image to convert
+        """
+        for image_path in image_files:
+            self.stats["images"] += 1
+            if self.journal and self.journal.is_done(image_path):
+                missing = [
+                    duplicate for duplicate in self.duplicates.get(image_path, [])
+                    if not self.journal.is_done(duplicate)
+                ]
+                if not missing:
+                    self.stats["skipped"] += 1
+                    continue
+                # Converted again, from the caches, to export the missing duplicates
+                self._duplicates_only[image_path] = missing
+            yield image_path
+
+    def run(self, image_files: Iterable) -> Dict[str, int]:
+        """
+        Stream images through all stages and wait for the last export
+
+        Args:
+            image_files: Iterable of image paths, consumed lazily
+
+        Returns:
+            Dict[str, int]: Per-stage success and failure counts
+        """
+        start_time = time.time()
+
+        llm_threads = [
+            threading.Thread(target=self._llm_worker, name=f"llm-{i}", daemon=True)
+            for i in range(self.llm_workers)
+        ]
+        export_threads = [
+            threading.Thread(target=self._export_worker, name=f"export-{i}", daemon=True)
+            for i in range(self.export_workers)
+        ]
+        for thread in llm_threads + export_threads:
+            thread.start()
+
+        logging.info(
+            f"Pipeline started: {self.ocr_workers} OCR, {self.llm_workers} LLM and "
+            f"{self.export_workers} export worker(s), queue size {self.queue_size}"
+        )
+
+        try:
+            with tempfile.TemporaryDirectory(prefix="menu-ocr-pages-") as work_dir, \
+                    ThreadPoolExecutor(max_workers=self.ocr_workers, thread_name_prefix="ocr") as executor:
+                chunk = []
+                documents = iter_documents(self._pending_images(image_files), work_dir, self.tile, self.convert_formats)
+                for image_path, document in documents:
+                    if document and not document.page_count:
+                        # Reported by open_document, there is no page to OCR
+                        self._count("ocr_failed")
+                        self._fail_duplicates(image_path)
+                        continue
+                    if document:
+                        for page_number in range(1, document.page_count + 1):
+                            self._ocr_slots.acquire()
+                            executor.submit(self._page_task, document, page_number)
+                        continue
+                    chunk.append(image_path)
+                    if len(chunk) >= self.batch_size:
+                        self._ocr_slots.acquire()
+                        executor.submit(self._ocr_task, chunk)
+                        chunk = []
+                if chunk:
+                    self._ocr_slots.acquire()
+                    executor.submit(self._ocr_task, chunk)
+        finally:
+            # Drain the stages in order so every accepted item is finished
+            for _ in llm_threads:
+                self._ocr_queue.put(_STOP)
+            for thread in llm_threads:
+                thread.join()
+            for _ in export_threads:
+                self._export_queue.put(_STOP)
+            for thread in export_threads:
+                thread.join()
+
+        total_time = time.time() - start_time
+        rate = self.stats["images"] / total_time if total_time > 0 else 0
+        logging.info(f"Pipeline completed in {total_time:.2f} seconds ({rate:.2f} images/sec)")
+
+        return dict(self.stats)
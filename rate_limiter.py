@@ -0,0 +1,179 @@
+"""
+Rate Limiter Module for keeping concurrent LLM requests under API quotas
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a per-minute rate.
+
+    The bucket holds at most one minute worth of tokens. Consumption may drive
+    the level negative (e.g. when the actual token usage of a request turns out
+    higher than estimated); callers then wait until the debt is refilled.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        """
+        Initialize a full bucket
+
+        Args:
+            rate_per_minute: Tokens added per minute, also the bucket capacity
+        """
+        self.capacity = float(rate_per_minute)
+        self.rate_per_minute = float(rate_per_minute)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last update"""
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate_per_minute / 60.0)
+        self._updated = now
+
+    def set_rate(self, rate_per_minute: float) -> None:
+        """
+        Change the refill rate (the capacity stays the same)
+
+        Args:
+            rate_per_minute: New refill rate
+        """
+        with self._lock:
+            self._refill()
+            self.rate_per_minute = max(float(rate_per_minute), 1e-6)
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Block until `amount` tokens are available, then take them
+
+        Args:
+            amount: Number of tokens to take (clamped to the bucket capacity)
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._level >= amount:
+                    self._level -= amount
+                    return waited
+                delay = (amount - self._level) * 60.0 / self.rate_per_minute
+            time.sleep(delay)
+            waited += delay
+
+    def consume(self, amount: float) -> None:
+        """
+        Take tokens without waiting, allowing the level to go negative
+
+        Args:
+            amount: Number of tokens to take (negative values give tokens back)
+        """
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level - amount)
+
+
+class AdaptiveRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter with adaptive backoff.
+
+    Every throttling error halves the effective rate and pauses all callers for
+    an exponentially growing cooldown; every successful request recovers a
+    small fraction of the configured rate (additive increase, multiplicative
+    decrease).
+    """
+
+    MIN_SCALE = 0.1
+    RECOVERY_STEP = 0.05
+    BASE_BACKOFF_SECONDS = 2.0
+    MAX_BACKOFF_SECONDS = 60.0
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: Optional[float] = None):
+        """
+        Initialize the limiter
+
+        Args:
+            requests_per_minute: Maximum requests per minute
+            tokens_per_minute: Optional maximum (prompt + response) tokens per minute
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._scale = 1.0
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    def acquire(self, estimated_tokens: int = 0) -> None:
+        """
+        Block until a request of the given size may be sent
+
+        Args:
+            estimated_tokens: Estimated prompt + response tokens of the request
+        """
+        with self._lock:
+            cooldown = self._cooldown_until - time.monotonic()
+        if cooldown > 0:
+            time.sleep(cooldown)
+
+        self._requests.acquire(1)
+        if self._tokens and estimated_tokens:
+            self._tokens.acquire(estimated_tokens)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """
+        Correct the token bucket once the real usage of a request is known
+
+        Args:
+            estimated_tokens: Tokens taken by `acquire`
+            actual_tokens: Tokens reported by the API, if any
+        """
+        if self._tokens and actual_tokens:
+            self._tokens.consume(actual_tokens - estimated_tokens)
+
+    def record_success(self) -> None:
+        """Recover part of the configured rate after a successful request"""
+        with self._lock:
+            if self._scale >= 1.0:
+                return
+            self._scale = min(1.0, self._scale + self.RECOVERY_STEP)
+            self._apply_scale()
+
+    def record_throttle(self, attempt: int) -> float:
+        """
+        Slow down after the API reported that a quota was exhausted
+
+        Args:
+            attempt: Zero-based retry attempt of the throttled request
+
+        Returns:
+            float: Seconds the caller should wait before retrying
+        """
+        delay = min(self.MAX_BACKOFF_SECONDS, self.BASE_BACKOFF_SECONDS * (2 ** attempt))
+        delay *= random.uniform(0.5, 1.0)
+        with self._lock:
+            self.throttled += 1
+            self._scale = max(self.MIN_SCALE, self._scale / 2)
+            self._apply_scale()
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+        logging.warning(
+            f"Gemini rate limit hit, backing off {delay:.1f}s "
+            f"(rate reduced to {self._scale * 100:.0f}% of configured limits)"
+        )
+        return delay
+
+    def _apply_scale(self) -> None:
+        """Push the current rate scale to the buckets"""
+        self._requests.set_rate(self.requests_per_minute * self._scale)
+        if self._tokens:
+            self._tokens.set_rate(self.tokens_per_minute * self._scale)
@@ -0,0 +1,162 @@
+"""
+Run Journal Module for checkpointing convert runs so an interrupted run can resume
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from disk_cache import hash_file
+
+# Stages a file passes through, in order
+JOURNAL_STAGES = ("ocr", "llm", "export")
+
+
+class RunJournal:
+    """
+    Append-only JSON Lines journal of the stages each file has finished.
+
+    Every finished stage appends one line with the file's path, size,
+    modification time and content hash, and is flushed right away, so a crash
+    loses at most the line being written. When resuming, the journal is
+    replayed: a file whose export was recorded for its current content is
+    skipped. Files that stopped halfway run again, and the OCR and Gemini
+    caches in the output directory make the stages they already finished
+    cheap. Safe to share between threads.
+    """
+
+    def __init__(self, journal_path: str, resume: bool = False, settings: Optional[Dict] = None):
+        """
+        Open the journal
+
+        Args:
+            journal_path: Path of the journal file
+            resume: Replay an existing journal and append to it; otherwise any
+                existing journal is replaced
+            settings: Run settings that affect the output, recorded at the start
+                of the run; resuming with different settings logs a warning
+        """
+        self.journal_path = journal_path
+        self._lock = threading.Lock()
+        # path -> {"size", "mtime_ns", "hash", "stages"} as recorded so far
+        self._files: Dict[str, Dict] = {}
+        self.skipped = 0
+
+        previous_settings = self._replay() if resume else None
+        if resume and previous_settings is not None and settings is not None and previous_settings != settings:
+            logging.warning(
+                "Resuming with different settings than the interrupted run, files it "
+                "already exported are not converted again"
+            )
+
+        os.makedirs(os.path.dirname(os.path.abspath(journal_path)), exist_ok=True)
+        self._file = open(journal_path, "a" if resume else "w", encoding="utf-8")
+        self._write({"event": "start", "time": time.time(), "settings": settings})
+
+    def _replay(self) -> Optional[Dict]:
+        """Load the recorded stages, returning the settings of the last run"""
+        settings = None
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash
+                        continue
+                    if record.get("event") == "start":
+                        settings = record.get("settings")
+                    elif record.get("stage") in JOURNAL_STAGES:
+                        entry = self._files.get(record["path"])
+                        if entry is None or entry["hash"] != record.get("hash"):
+                            entry = self._files[record["path"]] = {
+                                "size": record.get("size"),
+                                "mtime_ns": record.get("mtime_ns"),
+                                "hash": record.get("hash"),
+                                "stages": set(),
+                            }
+                        entry["stages"].add(record["stage"])
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logging.warning(f"Could not read run journal {self.journal_path}: {e}")
+            return None
+
+        exported = sum(1 for entry in self._files.values() if "export" in entry["stages"])
+        logging.info(f"Run journal: {exported} of {len(self._files)} recorded file(s) were exported")
+        return settings
+
+    def _write(self, record: Dict) -> None:
+        """Append one record and flush it to the operating system"""
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def _describe(self, image_path: Path) -> Dict:
+        """Size, modification time and content hash of a file, reusing the hash while the file is unchanged"""
+        stat = os.stat(image_path)
+        with self._lock:
+            entry = self._files.get(str(image_path))
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            content_hash = entry["hash"]
+        else:
+            content_hash = hash_file(image_path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": content_hash}
+
+    def is_done(self, image_path: Path) -> bool:
+        """
+        Check if a file was exported with its current content
+
+        Files with an unchanged size and modification time are trusted
+        without reading them; others are hashed.
+
+        Args:
+            image_path: Path to image file
+
+        Returns:
+            bool: True if the file can be skipped
+        """
+        with self._lock:
+            entry = self._files.get(str(image_path))
+        if not entry or "export" not in entry["stages"]:
+            return False
+        try:
+            done = self._describe(image_path)["hash"] == entry["hash"]
+        except OSError:
+            return False
+        if done:
+            with self._lock:
+                self.skipped += 1
+        return done
+
+    def record(self, image_path: Path, stage: str) -> None:
+        """
+        Record that a file finished a stage
+
+        Args:
+            image_path: Path to image file
+            stage: One of JOURNAL_STAGES
+        """
+        try:
+            description = self._describe(image_path)
+        except OSError as e:
+            logging.debug(f"Not journaling {image_path.name}: {e}")
+            return
+
+        with self._lock:
+            entry = self._files.get(str(image_path))
+            if entry is None or entry["hash"] != description["hash"]:
+                entry = self._files[str(image_path)] = dict(description, stages=set())
+            entry.update(description)
+            entry["stages"].add(stage)
+        self._write(dict(description, path=str(image_path), stage=stage, time=time.time()))
+
+    def close(self) -> None:
+        """Close the journal file"""
+        with self._lock:
+            self._file.close()